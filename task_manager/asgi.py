@@ -3,14 +3,75 @@ ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests are routed by ASGI_URLCONF: the views reading with the async ORM
+(the task list and detail, their API) run in the event loop; the other
+views, the ORM and template rendering run on a thread of the request.
+Database connections belong to that thread, so they are not kept past
+the request (CONN_MAX_AGE).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
 
 import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as BaseASGIHandler
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+os.environ.setdefault('CONN_MAX_AGE', '0')
+
+
+class ASGIHandler(BaseASGIHandler):
+    '''Routes the requests with ASGI_URLCONF, and reads streamed responses
+    on the thread of the request, a part at a time: Django 4.1 reads them
+    in the event loop, where the task export could not query the database.'''
+
+    def create_request(self, scope: Dict[str, Any],
+                       body_file: Any) -> Tuple[Optional[HttpRequest], Optional[HttpResponse]]:
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+    async def send_response(self, response: HttpResponseBase, send: Callable) -> None:
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.get_headers(response),
+        })
+        parts: Iterator[bytes] = iter(response)
+        read = sync_to_async(next, thread_sensitive=True)
+        part: Optional[bytes] = await read(parts, None)
+        while part is not None:
+            for chunk, _ in self.chunk_bytes(part):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            part = await read(parts, None)
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def get_headers(self, response: HttpResponseBase) -> List[Tuple[bytes, bytes]]:
+        '''The headers and cookies, as Django sends them.'''
+        headers: List[Tuple[bytes, bytes]] = [
+            (header.encode('ascii'), value.encode('latin1'))
+            for header, value in response.items()
+        ]
+        headers += [
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        ]
+        return headers
+
+
+def get_asgi_application() -> Any:
+    django.setup(set_prefix=False)
+    return ASGIHandler()
+
 
 application = get_asgi_application()
@@ -0,0 +1,20 @@
+"""URL configuration of the ASGI application (see asgi.py).
+
+The task pages and endpoints reading with the async ORM take the place of
+their sync versions, which the WSGI application keeps: under WSGI each
+coroutine view would run through async_to_sync() and every query on
+another thread, for nothing.
+"""
+from django.urls import path, include, URLPattern
+from typing import List
+
+from .urls import urlpatterns as wsgi_urlpatterns
+from .tasks.urls import asgi_urlpatterns as tasks_urlpatterns
+from .tasks.api_urls import asgi_urlpatterns as api_urlpatterns
+
+
+urlpatterns: List[URLPattern] = [
+    path('tasks/', include(tasks_urlpatterns)),
+    path('api/tasks/', include(api_urlpatterns)),
+    *wsgi_urlpatterns,
+]
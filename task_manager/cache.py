@@ -0,0 +1,206 @@
+"""Cache tiers, backends and namespaces.
+
+The default cache is a ``TieredCache``: a small LRU in the memory of each
+process in front of the shared cache (``CACHES['shared']``), which is
+local memory, files or Redis as ``CACHE_BACKEND`` says.
+Reads are served from memory when they can; writes go to both tiers.
+Values are kept in memory for ``LOCAL_TIMEOUT`` seconds at most, so a
+change made by another process shows up after that long.
+
+Keys are grouped in namespaces, one per model the cached data comes from.
+Invalidating a namespace moves it to a new version: its keys are not
+deleted but no longer read, and expire in time; the other namespaces
+keep theirs. Versions are read from the shared cache only, so an
+invalidation is seen by every process right away.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import transaction
+
+from .replicas import primary
+
+
+_MISSING = object()
+
+
+def seconds(cache: BaseCache, timeout: Any) -> Optional[float]:
+    '''The timeout in seconds from now: None for ever, 0 if already expired.'''
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = cache.default_timeout
+    return None if timeout is None else max(0, timeout)
+
+
+class LocalLRU:
+    '''A bounded map of values to their expiry times, dropping the least
+    recently used when full. Safe to share between threads.'''
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self.lock:
+            entry: Optional[Tuple[float, Any]] = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache(BaseCache):
+    '''A per-process LRU in front of the shared cache named by the
+    ``SHARED`` option. Values are copied into memory by pickling,
+    as other caches do, so callers can't change the cached ones.'''
+
+    def __init__(self, location: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        options: Dict[str, Any] = params.get('OPTIONS', {})
+        self.shared_alias: str = options.get('SHARED', 'shared')
+        self.local_timeout: float = options.get('LOCAL_TIMEOUT', 5)
+        self.local = LocalLRU(options.get('LOCAL_MAX_ENTRIES', 1000))
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.shared_alias]
+
+    def keep(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        '''Keeps the value in memory for the local timeout at most.'''
+        kept: Optional[float] = seconds(self, timeout)
+        if kept == 0:
+            self.local.delete(key)
+            return
+        kept = self.local_timeout if kept is None else min(kept, self.local_timeout)
+        self.local.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), kept)
+
+    def get(self, key: str, default: Any = None, version: Optional[int] = None) -> Any:
+        local_key: str = self.make_and_validate_key(key, version)
+        data: Any = self.local.get(local_key)
+        if data is not _MISSING:
+            return pickle.loads(data)
+        value: Any = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self.keep(local_key, value)
+        return value
+
+    def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT,
+            version: Optional[int] = None) -> None:
+        self.shared.set(key, value, timeout, version=version)
+        self.keep(self.make_and_validate_key(key, version), value, timeout)
+
+    def add(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT,
+            version: Optional[int] = None) -> bool:
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self.keep(self.make_and_validate_key(key, version), value, timeout)
+        return True
+
+    def touch(self, key: str, timeout: Any = DEFAULT_TIMEOUT,
+              version: Optional[int] = None) -> bool:
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key: str, version: Optional[int] = None) -> bool:
+        self.local.delete(self.make_and_validate_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def incr(self, key: str, delta: int = 1, version: Optional[int] = None) -> int:
+        '''Counts in the shared cache, where all the processes see it.'''
+        value: int = self.shared.incr(key, delta, version=version)
+        self.keep(self.make_and_validate_key(key, version), value)
+        return value
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+
+class Namespace:
+    '''Cache keys invalidated together, when the data they come from changes.'''
+
+    def __init__(self, name: str, alias: str = DEFAULT_CACHE_ALIAS) -> None:
+        self.name = name
+        self.alias = alias
+
+    def __repr__(self) -> str:
+        return '<Namespace {}>'.format(self.name)
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.alias]
+
+    @property
+    def versions(self) -> BaseCache:
+        '''Where the version is kept: the shared tier of a TieredCache, not
+        the memory of a process, so all of them see an invalidation at once.'''
+        return self.cache.shared if isinstance(self.cache, TieredCache) else self.cache
+
+    @property
+    def version_key(self) -> str:
+        return 'namespace:{}'.format(self.name)
+
+    def version(self) -> int:
+        '''Returns the current version. A version lost from the cache starts
+        again from the clock, past any version the keys were stored under.'''
+        version: Optional[int] = self.versions.get(self.version_key)
+        if version is None:
+            self.versions.add(self.version_key, time.time_ns() // 1000, None)
+            version = self.versions.get(self.version_key)
+        return version
+
+    def key(self, key: str) -> str:
+        return '{}:{}'.format(self.name, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(self.key(key), default, version=self.version())
+
+    def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        self.cache.set(self.key(key), value, timeout, version=self.version())
+
+    def get_or_set(self, key: str, default: Callable[[], Any],
+                   timeout: Any = DEFAULT_TIMEOUT) -> Any:
+        version: int = self.version()
+        value: Any = self.cache.get(self.key(key), _MISSING, version=version)
+        if value is _MISSING:
+            # A lagging replica would keep its rows cached past the invalidation.
+            with primary():
+                value = default()
+            self.cache.set(self.key(key), value, timeout, version=version)
+        return value
+
+    def bump(self) -> None:
+        try:
+            self.versions.incr(self.version_key)
+        except ValueError:
+            self.version()
+
+    def invalidate(self) -> None:
+        '''Moves to a new version now and once more after the commit,
+        so a request reading the old rows meanwhile can't keep them cached.'''
+        self.bump()
+        transaction.on_commit(self.bump)
@@ -2,7 +2,7 @@
 
 from django.utils.translation import gettext_lazy
 from django.urls import reverse_lazy
-from typing import Final
+from typing import Dict, Final, Tuple
 
 
 # Route names
@@ -23,6 +23,23 @@ MSG_LOGOUT: str = gettext_lazy('You are logged out')
 
 MSG_NO_PERMISSION = gettext_lazy('You are not authorized! Please sign in.')
 MSG_NOT_AUTHOR_FOR_DELETE_TASK = gettext_lazy("A task can only be deleted by its author.")
+MSG_INVALID_CURSOR = gettext_lazy('Invalid page cursor.')
+
+
+# Sorting of the lists showing usage
+SORT_KWARG: Final[str] = 'sort'
+SORT_BY_ID: Final[str] = 'id'
+SORT_BY_NAME: Final[str] = 'name'
+SORT_BY_USAGE: Final[str] = 'usage'
+SORT_ORDERINGS: Final[Dict[str, Tuple[str, ...]]] = {
+    SORT_BY_ID: ('id',),
+    SORT_BY_NAME: ('name', 'id'),
+    SORT_BY_USAGE: ('-usage', 'id'),
+}
+
+
+# Cookie pinning a client to the primary database after a write
+REPLICA_PIN_COOKIE: Final[str] = 'primary'
 
 
 # Templates
@@ -0,0 +1,153 @@
+"""Request-scoped identity map.
+
+Every row a request reads through the map is kept for the rest of the
+request, so the statuses, labels and users that form validation, choice
+rendering and model validation need are each read from the database at
+most once, and the signed in user is never read again. Outside a request
+(commands, the shell) there is no map and every lookup hits the database.
+
+Only unfiltered querysets go through the map: an object found in it is
+known to exist, not to match any filter.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from asgiref.sync import sync_to_async
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Model, QuerySet
+from django.forms.models import ModelChoiceIterator
+from django.http import HttpRequest, HttpResponse
+
+from .middleware import AsyncCapableMiddleware
+
+
+class IdentityMap:
+    '''The objects read by a request, by model and primary key,
+    and the rows of the whole tables it listed.'''
+
+    def __init__(self) -> None:
+        self.objects: Dict[Tuple[Type[Model], Any], Model] = {}
+        self.tables: Dict[Tuple[Type[Model], str], List[Model]] = {}
+
+    def add(self, *objects: Model) -> None:
+        for obj in objects:
+            self.objects[obj.__class__, obj.pk] = obj
+
+    def get(self, model: Type[Model], pk: Any) -> Optional[Model]:
+        return self.objects.get((model, pk))
+
+    def rows(self, queryset: QuerySet) -> List[Model]:
+        key: Tuple[Type[Model], str] = (queryset.model, str(queryset.query))
+        if key not in self.tables:
+            self.tables[key] = list(queryset)
+            self.add(*self.tables[key])
+        return self.tables[key]
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar('identity_map', default=None)
+
+
+def current() -> Optional[IdentityMap]:
+    '''Returns the map of the running request, if any.'''
+    return _current.get()
+
+
+def add(*objects: Model) -> None:
+    identity_map: Optional[IdentityMap] = current()
+    if identity_map is not None:
+        identity_map.add(*objects)
+
+
+def lookup(queryset: QuerySet, pk: Any) -> Optional[Model]:
+    '''Returns the object of the queryset with the primary key
+    if the request has read it already.'''
+    identity_map: Optional[IdentityMap] = current()
+    if identity_map is None or queryset.query.has_filters():
+        return None
+    try:
+        pk = queryset.model._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+    return identity_map.get(queryset.model, pk)
+
+
+def rows(queryset: QuerySet) -> List[Model]:
+    '''Returns all the objects of the queryset, reading them once per request.'''
+    identity_map: Optional[IdentityMap] = current()
+    if identity_map is None:
+        return list(queryset)
+    return identity_map.rows(queryset)
+
+
+class IdentityMapMiddleware(AsyncCapableMiddleware):
+    '''Gives each request its own map, starting with the signed in user.
+    Under ASGI the user is read on a thread, so async views find it loaded.'''
+
+    def call(self, request: HttpRequest) -> HttpResponse:
+        token = _current.set(IdentityMap())
+        try:
+            if request.user.is_authenticated:
+                add(request.user)
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = _current.set(IdentityMap())
+        try:
+            if await sync_to_async(lambda: request.user.is_authenticated)():
+                add(request.user)
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+
+class IdentityModelChoiceIterator(ModelChoiceIterator):
+    '''Lists the choices from the rows the request has read.'''
+
+    def __iter__(self) -> Iterator[Tuple[Any, str]]:
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in rows(self.queryset):
+            yield self.choice(obj)
+
+    def __len__(self) -> int:
+        return len(rows(self.queryset)) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self) -> bool:
+        return self.field.empty_label is not None or bool(rows(self.queryset))
+
+
+def by_pk(field: forms.ModelChoiceField) -> bool:
+    '''Whether the choices of the field are identified by primary key.'''
+    return field.to_field_name in (None, field.queryset.model._meta.pk.name)
+
+
+class IdentityModelChoiceField(forms.ModelChoiceField):
+    '''A ModelChoiceField looking up and listing its objects through the map.'''
+    iterator = IdentityModelChoiceIterator
+
+    def to_python(self, value: Any) -> Optional[Model]:
+        if value in self.empty_values or not by_pk(self):
+            return super().to_python(value)
+        obj: Optional[Model] = lookup(self.queryset, value)
+        if obj is None:
+            obj = super().to_python(value)
+            add(obj)
+        return obj
+
+
+class IdentityModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    '''A ModelMultipleChoiceField looking up and listing its objects through the map.'''
+    iterator = IdentityModelChoiceIterator
+
+    def _check_values(self, value: Iterable[Any]) -> Any:
+        if by_pk(self) and isinstance(value, (list, tuple)):
+            found: List[Optional[Model]] = [lookup(self.queryset, pk) for pk in value]
+            if found and None not in found:
+                return list(dict.fromkeys(found))
+        objects = super()._check_values(value)
+        add(*objects)
+        return objects
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LabelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.labels'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
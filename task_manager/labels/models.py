@@ -1,5 +1,23 @@
 from django.db import models
 from django.utils.translation import gettext_lazy
+from typing import List, Tuple
+
+from task_manager.cache import Namespace
+from .constants import CACHE_NAMESPACE, CHOICES_CACHE_KEY, CHOICES_CACHE_TIMEOUT
+
+
+# Invalidated whenever a label is created, renamed or deleted.
+cache_namespace: Namespace = Namespace(CACHE_NAMESPACE)
+
+
+class LabelManager(models.Manager):
+    def choices(self) -> List[Tuple[int, str]]:
+        '''Returns the (id, name) pairs of all labels, from the cache.'''
+        return cache_namespace.get_or_set(
+            CHOICES_CACHE_KEY,
+            lambda: list(self.order_by('name').values_list('id', 'name')),
+            CHOICES_CACHE_TIMEOUT,
+        )
 
 
 class Label(models.Model):
@@ -16,6 +34,8 @@ class Label(models.Model):
         auto_now=True
     )
 
+    objects = LabelManager()
+
     class Meta:
         verbose_name: str = gettext_lazy('label')
         verbose_name_plural: str = gettext_lazy('labels')
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from typing import Any, Type
+
+from .models import Label, cache_namespace
+
+
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+def invalidate_label_cache(sender: Type[Label], **kwargs: Any) -> None:
+    '''Whatever was cached from the labels has to be rebuilt once one is changed.'''
+    cache_namespace.invalidate()
@@ -6,14 +6,18 @@ from .models import Label
 from .constants import REVERSE_LABELS, NAME, \
     CONTEXT_LIST, CONTEXT_CREATE, CONTEXT_UPDATE, CONTEXT_DELETE, \
     MSG_CREATED, MSG_UPDATED, MSG_DELETED, LABEL_USED_IN_TASK
-from ..mixins import AuthorizationPermissionMixin, DeletionProtectionMixin
+from ..mixins import AuthorizationPermissionMixin, ConditionalGetMixin, \
+    DeletionProtectionMixin, ReplicaReadMixin, UsageListMixin
+from ..tasks.models import TaskCounter
 
 
-class LabelsListView(AuthorizationPermissionMixin, ListView):
-    '''Show the list of labels.'''
+class LabelsListView(AuthorizationPermissionMixin, ReplicaReadMixin, UsageListMixin,
+                     ConditionalGetMixin, ListView):
+    '''Show the list of labels with the number of tasks using each.'''
     model: Type[Label] = Label
     context_object_name: str = 'labels'
     extra_context: Dict = CONTEXT_LIST
+    usage_counter: str = TaskCounter.LABEL
 
 
 class LabelCreateView(AuthorizationPermissionMixin,
@@ -0,0 +1,177 @@
+import asyncio
+import importlib.util
+import itertools
+import os
+import socket
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test import Client
+from django.urls import reverse
+from time import perf_counter, sleep
+from typing import Any, Dict, Iterator, List, Tuple
+
+from task_manager.management.commands.benchmark_views import percentile
+from task_manager.tasks.constants import LIST_TASKS, DETAIL_TASK, API_TASKS, API_TASK
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+# How each server is started, given the number of processes and the port.
+SERVERS: Dict[str, Tuple[str, ...]] = {
+    'gunicorn': ('gunicorn', 'task_manager.wsgi:application', '--worker-class', 'sync',
+                 '--workers', '{workers}', '--bind', '127.0.0.1:{port}'),
+    'uvicorn': ('uvicorn', 'task_manager.asgi:application', '--workers', '{workers}',
+                '--host', '127.0.0.1', '--port', '{port}', '--no-access-log'),
+}
+# A request: its duration in milliseconds and whether it succeeded.
+Sample = Tuple[float, bool]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def fetch(port: int, request: bytes) -> bool:
+    '''Sends a request on a connection of its own; true if it succeeded.'''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status_line: bytes = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+    parts: List[bytes] = status_line.split()
+    return len(parts) > 1 and parts[1].isdigit() and int(parts[1]) < 400
+
+
+async def hammer(port: int, requests: Iterator[bytes], duration: float) -> List[Sample]:
+    '''Sends requests one after another for the duration.'''
+    samples: List[Sample] = []
+    deadline: float = perf_counter() + duration
+    while perf_counter() < deadline:
+        started: float = perf_counter()
+        try:
+            ok: bool = await fetch(port, next(requests))
+        except OSError:
+            ok = False
+        samples.append(((perf_counter() - started) * 1000, ok))
+    return samples
+
+
+async def run_clients(port: int, requests: List[bytes], concurrency: int,
+                      duration: float) -> List[Sample]:
+    '''Keeps that many requests in flight for the duration.'''
+    results = await asyncio.gather(*(
+        hammer(port, itertools.islice(itertools.cycle(requests), number, None), duration)
+        for number in range(concurrency)
+    ))
+    return [sample for samples in results for sample in samples]
+
+
+class Command(BaseCommand):
+    help = 'Starts the site under gunicorn sync workers and under uvicorn with the ' \
+        'same number of processes, sends the task list, task detail and API ' \
+        'requests of a signed in user with more and more requests in flight, and ' \
+        'reports the throughput, the latency and the failures of each server. ' \
+        'The servers use the settings and the database of this process; ' \
+        'uvicorn is not a dependency of the project and has to be installed.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes of each server.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128],
+                            help='Requests in flight at once, a run for each.')
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help='Seconds each run lasts.')
+        parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS),
+                            help='The servers to compare.')
+        parser.add_argument('--host', default='localhost',
+                            help='The host the requests are sent to, one of ALLOWED_HOSTS.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['workers'] < 1 or options['duration'] <= 0 \
+                or min(options['concurrency']) < 1:
+            raise CommandError('--workers, --concurrency and --duration must be positive.')
+        for server in options['servers']:
+            if importlib.util.find_spec(server) is None:
+                raise CommandError('{0} is not installed: pip install {0}'.format(server))
+        task: Any = Task.objects.order_by('-pk').first()
+        user: Any = User.objects.order_by('pk').first()
+        if task is None or user is None:
+            raise CommandError('The run needs a user and a task; run seed_perf first.')
+
+        requests: List[bytes] = self.requests(user, task, options['host'])
+        self.stdout.write('{:<10}{:>12}{:>10}{:>12}{:>9}{:>9}{:>8}'.format(
+            'server', 'concurrency', 'requests', 'requests/s', 'p50 ms', 'p95 ms', 'failed'
+        ))
+        for server in options['servers']:
+            self.benchmark(server, requests, options)
+
+    def benchmark(self, server: str, requests: List[bytes], options: Dict[str, Any]) -> None:
+        port: int = free_port()
+        process = self.start(server, options['workers'], port)
+        try:
+            self.wait_for(process, port)
+            asyncio.run(run_clients(port, requests, 1, 1.0))  # warm up
+            for concurrency in options['concurrency']:
+                started: float = perf_counter()
+                samples: List[Sample] = asyncio.run(
+                    run_clients(port, requests, concurrency, options['duration'])
+                )
+                # The requests in flight at the deadline are waited for.
+                self.report(server, concurrency, samples, perf_counter() - started)
+        finally:
+            process.terminate()
+            process.wait()
+
+    def requests(self, user: User, task: Task, host: str) -> List[bytes]:
+        '''The raw requests of a signed in user; each closes its connection.'''
+        client = Client()
+        client.force_login(user)
+        cookie: str = '{}={}'.format(
+            settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value
+        )
+        paths: List[str] = [
+            reverse(LIST_TASKS), reverse(DETAIL_TASK, args=[task.pk]),
+            reverse(API_TASKS), reverse(API_TASK, args=[task.pk]),
+        ]
+        return [
+            'GET {} HTTP/1.1\r\nHost: {}\r\nCookie: {}\r\nConnection: close\r\n\r\n'
+            .format(path, host, cookie).encode() for path in paths
+        ]
+
+    def start(self, server: str, workers: int, port: int) -> subprocess.Popen:
+        command: List[str] = [sys.executable, '-m'] + [
+            part.format(workers=workers, port=port) for part in SERVERS[server]
+        ]
+        return subprocess.Popen(
+            command, env=os.environ.copy(),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def wait_for(self, process: subprocess.Popen, port: int, timeout: float = 30.0) -> None:
+        deadline: float = perf_counter() + timeout
+        while perf_counter() < deadline:
+            if process.poll() is not None:
+                raise CommandError('The server exited with {}.'.format(process.returncode))
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                sleep(0.1)
+        raise CommandError('The server did not start in {:.0f} s.'.format(timeout))
+
+    def report(self, server: str, concurrency: int, samples: List[Sample],
+               elapsed: float) -> None:
+        times: List[float] = [ms for ms, _ in samples]
+        failed: int = sum(not ok for _, ok in samples)
+        self.stdout.write('{:<10}{:>12}{:>10}{:>12.1f}{:>9.1f}{:>9.1f}{:>8}'.format(
+            server, concurrency, len(samples), len(samples) / elapsed,
+            percentile(times, 0.5) if times else 0.0,
+            percentile(times, 0.95) if times else 0.0, failed,
+        ))
@@ -0,0 +1,190 @@
+import json
+import logging
+import math
+import re
+import subprocess
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from django.db.models import Model
+from django.http import HttpResponse
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Match, Optional, Pattern, Set, Tuple
+
+from task_manager.constants import LOGOUT
+from task_manager.tasks.constants import API_EXPORT
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+# Signing out would end the session of the benchmark.
+NEVER_RUN: Tuple[str, ...] = (LOGOUT,)
+QUERIES = re.compile(r'desc="(\d+) queries"')
+DB_TIME = re.compile(r'db;dur=([\d.]+)')
+
+
+def percentile(values: List[float], share: float) -> float:
+    '''The nearest-rank percentile.'''
+    ordered: List[float] = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * share) - 1)]
+
+
+def metric(pattern: Pattern, timing: str) -> float:
+    '''Reads a figure of the Server-Timing header.'''
+    match: Optional[Match] = pattern.search(timing)
+    return float(match.group(1)) if match else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Requests every named URL of the site as a signed in user and writes ' \
+        'the p50 and p95 latency and the query count of each to a JSON file. ' \
+        'Pass the file of an earlier run with --compare to see the changes.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Timed requests per URL.')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Untimed requests per URL run first.')
+        parser.add_argument('--output', default='benchmark.json',
+                            help='Where the results are written.')
+        parser.add_argument('--compare', help='The results of an earlier run.')
+        parser.add_argument('--exclude', nargs='*', default=[API_EXPORT],
+                            help='URL names not to run; the export streams every task.')
+        parser.add_argument('--host', default='localhost',
+                            help='The host the requests are sent to, one of ALLOWED_HOSTS.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+        user: Optional[User] = self.get_user()
+        if user is None:
+            raise CommandError('There are no tasks to benchmark; run seed_perf first.')
+        # One log line per request would drown the results.
+        timing_logger = logging.getLogger('task_manager.timing')
+        level: int = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(user)
+        try:
+            results: Dict[str, Dict[str, Any]] = {}
+            for name, url in self.get_urls(user, set(NEVER_RUN) | set(options['exclude'])):
+                results[name] = self.run(client, url, options['repeat'], options['warmup'])
+                self.stdout.write(self.format_row(name, results[name]))
+        finally:
+            client.logout()
+            timing_logger.setLevel(level)
+
+        report: Dict[str, Any] = {
+            'commit': self.get_commit(),
+            'date': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'tasks': Task.objects.count(),
+            'users': User.objects.count(),
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(self.style.SUCCESS('Results written to {}.'.format(options['output'])))
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def get_user(self) -> Optional[User]:
+        '''The author of the most recent task, so that every task page can be shown.'''
+        task: Optional[Task] = Task.objects.select_related('author').first()
+        return task.author if task else None
+
+    def get_urls(self, user: User, excluded: Set[str]) -> Iterator[Tuple[str, str]]:
+        '''Yields the name and the path of every named URL outside the admin
+        answering GET, with the primary keys of objects the user may see.'''
+        for name, pattern in self.walk(get_resolver().url_patterns):
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if name in excluded or view_class is not None and not hasattr(view_class, 'get'):
+                continue
+            if 'pk' not in pattern.pattern.converters:
+                yield name, reverse(name)
+                continue
+            obj: Optional[Model] = self.get_object(pattern, user)
+            if obj is not None:
+                yield name, reverse(name, args=[obj.pk])
+
+    def walk(self, patterns: List[Any]) -> Iterator[Tuple[str, URLPattern]]:
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace is None:
+                    yield from self.walk(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name, pattern
+
+    def get_object(self, pattern: URLPattern, user: User) -> Optional[Model]:
+        model = getattr(getattr(pattern.callback, 'view_class', None), 'model', None) or Task
+        if model is User:
+            return user
+        if model is Task:
+            return Task.objects.filter(author=user).first()
+        return model._default_manager.order_by('pk').first()
+
+    def run(self, client: Client, url: str, repeat: int, warmup: int) -> Dict[str, Any]:
+        for _ in range(warmup):
+            self.request(client, url)
+        times: List[float] = []
+        queries: List[int] = []
+        db_times: List[float] = []
+        status: int = 0
+        for _ in range(repeat):
+            started: float = perf_counter()
+            response: HttpResponse = self.request(client, url)
+            times.append((perf_counter() - started) * 1000)
+            status = response.status_code
+            timing: str = response.headers.get('Server-Timing', '')
+            queries.append(int(metric(QUERIES, timing)))
+            db_times.append(metric(DB_TIME, timing))
+        return {
+            'url': url,
+            'status': status,
+            'p50_ms': round(percentile(times, 0.5), 2),
+            'p95_ms': round(percentile(times, 0.95), 2),
+            'db_p50_ms': round(percentile(db_times, 0.5), 2),
+            'queries': max(queries),
+        }
+
+    def request(self, client: Client, url: str) -> HttpResponse:
+        response: HttpResponse = client.get(url)
+        # A streamed response is only done once it is read.
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def format_row(self, name: str, result: Dict[str, Any]) -> str:
+        return '{:<20} {:>4} p50 {:>9.2f} ms  p95 {:>9.2f} ms  {:>3} queries'.format(
+            name, result['status'], result['p50_ms'], result['p95_ms'], result['queries']
+        )
+
+    def get_commit(self) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, path: str, report: Dict[str, Any]) -> None:
+        with open(path, encoding='utf-8') as file:
+            earlier: Dict[str, Any] = json.load(file)
+        self.stdout.write('Compared with {} ({}):'.format(path, earlier.get('commit') or '?'))
+        self.stdout.write('{:<20}{:>12}{:>12}{:>12}'.format('url', 'p50', 'p95', 'queries'))
+        for name, result in report['results'].items():
+            before: Optional[Dict[str, Any]] = earlier.get('results', {}).get(name)
+            if before is None:
+                self.stdout.write('{:<20}{:>12}'.format(name, 'new'))
+                continue
+            self.stdout.write('{:<20}{:>+11.0%}{:>+12.0%}{:>+12d}'.format(
+                name,
+                result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0,
+                result['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0,
+                result['queries'] - before['queries'],
+            ))
@@ -0,0 +1,171 @@
+import logging
+import multiprocessing
+import random
+import uuid
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client
+from django.urls import reverse
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from task_manager.management.commands.benchmark_views import percentile
+from task_manager.statuses.models import Status
+from task_manager.tasks.constants import LIST_TASKS, CREATE_TASK, UPDATE_TASK
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+KINDS: Tuple[str, ...] = ('list', 'create', 'update')
+# A request: its kind, its duration in milliseconds and whether it succeeded.
+Sample = Tuple[str, float, bool]
+
+
+def task_prefix(run: str) -> str:
+    '''Starts the names of the tasks created by the run.'''
+    return 'Load test {} '.format(run)
+
+
+class Worker:
+    '''Sends a random mix of requests through the whole stack
+    for the duration, as a user of the run.'''
+
+    def __init__(self, number: int, run: str, options: Dict[str, Any]) -> None:
+        self.number = number
+        self.run = run
+        self.random = random.Random('{}-{}'.format(run, number))
+        self.weights: List[int] = [options[kind] for kind in KINDS]
+        self.duration: float = options['duration']
+        self.client = Client(HTTP_HOST=options['host'], raise_request_exception=False)
+        self.client.force_login(User.objects.order_by('pk').first())
+        self.status_ids: List[int] = list(Status.objects.values_list('id', flat=True))
+        self.tasks: List[Tuple[int, str]] = list(
+            Task.objects.order_by('-pk').values_list('id', 'name')[:100]
+        )
+        self.created: int = 0
+
+    def __call__(self) -> List[Sample]:
+        actions: Dict[str, Callable[[], HttpResponse]] = {
+            'list': self.list, 'create': self.create, 'update': self.update,
+        }
+        samples: List[Sample] = []
+        deadline: float = perf_counter() + self.duration
+        while perf_counter() < deadline:
+            kind: str = self.random.choices(KINDS, weights=self.weights)[0]
+            started: float = perf_counter()
+            response: HttpResponse = actions[kind]()
+            samples.append((kind, (perf_counter() - started) * 1000, response.status_code < 400))
+        return samples
+
+    def task_data(self, name: str) -> Dict[str, Any]:
+        return {
+            'name': name,
+            'description': 'Written by the load test {}.'.format(self.run),
+            'status': self.random.choice(self.status_ids),
+        }
+
+    def list(self) -> HttpResponse:
+        params: Dict[str, Any] = {}
+        if self.random.random() < 0.5:
+            params['status'] = self.random.choice(self.status_ids)
+        return self.client.get(reverse(LIST_TASKS), params)
+
+    def create(self) -> HttpResponse:
+        self.created += 1
+        name: str = '{}{}-{}'.format(task_prefix(self.run), self.number, self.created)
+        return self.client.post(reverse(CREATE_TASK), self.task_data(name))
+
+    def update(self) -> HttpResponse:
+        '''Changes the status and the description of one of the latest tasks.'''
+        if not self.tasks:
+            return self.create()
+        task_id, name = self.random.choice(self.tasks)
+        return self.client.post(reverse(UPDATE_TASK, args=[task_id]), self.task_data(name))
+
+
+def work(number: int, run: str, options: Dict[str, Any], results: Any) -> None:
+    '''Runs a worker in a process of its own.'''
+    # Errors are counted; their tracebacks would drown the results.
+    logging.disable(logging.CRITICAL)
+    try:
+        results.put(Worker(number, run, options)())
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Sends a mix of task list, create and update requests from several ' \
+        'processes at once, as web workers sharing the database would, and reports ' \
+        'the throughput, the failures and the latency of each kind. ' \
+        'The updates change the status of the latest tasks; the tasks created are ' \
+        'deleted at the end unless --keep is given.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--processes', type=int, default=4,
+                            help='Concurrent workers; 1 runs in this process.')
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Seconds each worker sends requests for.')
+        for kind, weight in zip(KINDS, (70, 15, 15)):
+            parser.add_argument('--' + kind, type=int, default=weight,
+                                help='Weight of the {} requests in the mix.'.format(kind))
+        parser.add_argument('--host', default='localhost',
+                            help='The host the requests are sent to, one of ALLOWED_HOSTS.')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the tasks created by the run.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['processes'] < 1 or options['duration'] <= 0:
+            raise CommandError('--processes and --duration must be positive.')
+        if not sum(options[kind] for kind in KINDS):
+            raise CommandError('At least one kind of request needs a weight.')
+        if not User.objects.exists() or not Status.objects.exists():
+            raise CommandError('The run needs a user and a status; run seed_perf first.')
+
+        run: str = uuid.uuid4().hex[:8]
+        started: float = perf_counter()
+        samples: List[Sample] = self.run_workers(run, options)
+        elapsed: float = perf_counter() - started
+        self.report(samples, elapsed)
+        if not options['keep']:
+            Task.objects.filter(name__startswith=task_prefix(run)).delete()
+
+    def run_workers(self, run: str, options: Dict[str, Any]) -> List[Sample]:
+        if options['processes'] == 1:
+            return Worker(0, run, options)()
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('Several processes need the fork start method.')
+        # The workers must open connections of their own.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [
+            context.Process(target=work, args=(number, run, options, results))
+            for number in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        samples: List[Sample] = []
+        for process in processes:
+            samples += results.get()
+        for process in processes:
+            process.join()
+        return samples
+
+    def report(self, samples: List[Sample], elapsed: float) -> None:
+        self.stdout.write('{:<8}{:>9}{:>9}{:>11}{:>11}'.format(
+            'kind', 'requests', 'failed', 'p50 ms', 'p95 ms'
+        ))
+        for kind in KINDS:
+            times: List[float] = [ms for name, ms, _ in samples if name == kind]
+            if times:
+                failed: int = sum(not ok for name, _, ok in samples if name == kind)
+                self.stdout.write('{:<8}{:>9}{:>9}{:>11.1f}{:>11.1f}'.format(
+                    kind, len(times), failed, percentile(times, 0.5), percentile(times, 0.95)
+                ))
+        failures: int = sum(not ok for _, _, ok in samples)
+        self.stdout.write(self.style.SUCCESS(
+            '{} requests in {:.1f} s: {:.1f} requests/s, {} failed.'.format(
+                len(samples), elapsed, len(samples) / elapsed, failures
+            )
+        ))
@@ -0,0 +1,50 @@
+import json
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from time import perf_counter
+from typing import Any, Dict
+
+from task_manager.seeding import PROFILES, USERNAME_PREFIX, Profile, ProfileError, Seeder, \
+    load_profile
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Fills an empty database with a synthetic dataset for performance tests. ' \
+        'The same profile and seed always give the same data.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='small',
+                            help='The size of the dataset.')
+        parser.add_argument('--config',
+                            help='A JSON file of profile fields overriding the profile, '
+                                 'e.g. {"profile": "large", "tasks": 2000000}.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='The seed of the random generator.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('The database does not return ids from bulk inserts.')
+        try:
+            profile: Profile = load_profile(options['profile'], options['config'])
+        except ProfileError as error:
+            raise CommandError(str(error))
+        except (OSError, ValueError, TypeError) as error:
+            raise CommandError('Invalid configuration: {}'.format(error))
+        if any(model.objects.exists() for model in (Task, Status, Label)) \
+                or User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError('The database already has tasks, statuses, labels or seeded '
+                               'users; seed an empty database to get a reproducible dataset.')
+
+        started: float = perf_counter()
+        used: Dict[str, Any] = Seeder(profile, options['seed'], self.report).run()
+        self.stdout.write(json.dumps({'seed': options['seed'], **used}))
+        self.stdout.write(self.style.SUCCESS(
+            'Done in {:.0f} s.'.format(perf_counter() - started)
+        ))
+
+    def report(self, name: str, written: int, total: int) -> None:
+        self.stdout.write('{}: {} of {}'.format(name, written, total))
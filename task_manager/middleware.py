@@ -0,0 +1,63 @@
+"""Middleware running in the mode of the handler.
+
+Under ASGI, Django runs a middleware that is not async capable, and every
+middleware and view after it, on a thread, so an async view behind it saves
+nothing. The middleware of the project await the next one under ASGI and
+call it under WSGI. The static files middleware of WhiteNoise is sync only;
+``StaticFilesMiddleware`` serves its files in either mode.
+"""
+
+import asyncio
+from abc import ABCMeta, abstractmethod
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from django.http import HttpRequest, HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+GetResponse = Callable[[HttpRequest], Union[HttpResponse, Awaitable[HttpResponse]]]
+
+
+class AsyncCapableMiddleware(metaclass=ABCMeta):
+    '''Calls __acall__() instead of call() when the next middleware
+    is a coroutine function, as Django's MiddlewareMixin does.'''
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: GetResponse) -> None:
+        self.get_response = get_response
+        self._is_coroutine: Optional[object] = None
+        if asyncio.iscoroutinefunction(get_response):
+            # Makes the handler await the instance.
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self._is_coroutine:
+            return self.__acall__(request)
+        return self.call(request)
+
+    @abstractmethod
+    def call(self, request: HttpRequest) -> HttpResponse:
+        '''Handles the request under WSGI.'''
+
+    @abstractmethod
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        '''Handles the request under ASGI.'''
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware, WhiteNoiseMiddleware):
+    '''WhiteNoise, async capable. Files are looked up in memory
+    (on disk only with autorefresh, i.e. in development).'''
+
+    def __init__(self, get_response: GetResponse) -> None:
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        AsyncCapableMiddleware.__init__(self, get_response)
+
+    def call(self, request: HttpRequest) -> HttpResponse:
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        response: Optional[HttpResponse] = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
@@ -1,11 +1,45 @@
+import hashlib
+import inspect
+import json
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from datetime import datetime
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import redirect
-from django.http import HttpResponse, HttpRequest, HttpResponseRedirect
-from django.db.models import ProtectedError
-from typing import Any, Union, Callable
+from django.http import HttpResponse, HttpRequest, HttpResponseRedirect, Http404, JsonResponse
+from django.db.models import Count, Max, Model, OuterRef, PROTECT, ProtectedError, Q, QuerySet, \
+    Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+from django.views.generic.detail import SingleObjectMixin
+from typing import Any, Awaitable, Dict, List, Optional, Union, Callable, Sequence, Tuple, Type
 
-from .constants import MSG_NO_PERMISSION, REVERSE_LOGIN, REVERSE_HOME
+from .constants import MSG_NO_PERMISSION, MSG_INVALID_CURSOR, REVERSE_LOGIN, REVERSE_HOME, \
+    SORT_KWARG, SORT_BY_ID, SORT_ORDERINGS
+from .pagination import KeysetPaginator, KeysetPage, InvalidCursor
+
+
+Paginated = Tuple[KeysetPaginator, KeysetPage, Any, bool]
+# What the ETag of a page is computed from, and the times of its validators.
+PageState = Tuple[List[Any], List[Optional[datetime]]]
+
+
+class AsyncViewMixin:
+    '''For views whose handlers are coroutines; put it first. Django awaits
+    what such a view returns, so a response the other mixins give at once,
+    e.g. when they deny access, is returned from a coroutine too.'''
+
+    async def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        response: Union[HttpResponse, Awaitable[HttpResponse]] = \
+            super().dispatch(request, *args, **kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
 
 
 class AuthorizationPermissionMixin(LoginRequiredMixin):
@@ -17,33 +51,316 @@ class AuthorizationPermissionMixin(LoginRequiredMixin):
         return redirect(REVERSE_LOGIN)
 
 
-class ModifyPermissionMixin(LoginRequiredMixin):
-    '''Sets access rules for an unauthenticated user.'''
+class ApiAuthorizationMixin(LoginRequiredMixin):
+    '''Sets access rules for unauthorized API clients.'''
+
+    def handle_no_permission(self) -> JsonResponse:
+        '''Answers with a JSON error instead of redirecting to the login page.'''
+        return JsonResponse({'detail': str(MSG_NO_PERMISSION)}, status=403)
+
+
+class CachedObjectMixin:
+    '''Loads the object of a single object view once per request.'''
 
+    def get_object(self, queryset: Optional[QuerySet] = None) -> Any:
+        '''Returns the object loaded by the first call.'''
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class ObjectPermissionMixin(CachedObjectMixin):
+    '''Lets only the owner of the object act on it.
+
+    The owner is compared by the ``owner_field`` column,
+    so the owner itself is never loaded.'''
+
+    owner_field: str = 'pk'
     unpermission_message: str = 'Access denied message'
     unpermission_url: Union[str, Callable[..., Any]] = REVERSE_LOGIN
 
     def dispatch(self, request: HttpRequest,
                  *args: Any, **kwargs: Any) -> HttpResponse:
-        '''Specifies access settings for the current user.
-        Provides access if the user is authenticated.'''
-        if request.user.id != self.get_object().id:
-            messages.error(self.request, self.unpermission_message)
-            return redirect(self.unpermission_url)
+        '''Checks the permission before the view handles the request.'''
+        if not self.has_object_permission(self.get_object()):
+            return self.handle_no_object_permission()
         return super().dispatch(request, *args, **kwargs)
 
+    def has_object_permission(self, obj: Any) -> bool:
+        return self.request.user.id == getattr(obj, self.owner_field)
+
+    def handle_no_object_permission(self) -> HttpResponseRedirect:
+        messages.error(self.request, self.unpermission_message)
+        return redirect(self.unpermission_url)
+
+
+class ModifyPermissionMixin(ObjectPermissionMixin, LoginRequiredMixin):
+    '''Lets users change only their own profile.'''
+
 
-class DeletionProtectionMixin:
+class DeletionProtectionMixin(CachedObjectMixin):
     '''Sets the rules for handling the case of the impossibility of deleting data
-    due to the protection of related data.'''
+    due to the protection of related data.
+
+    The rows referencing the object with ``on_delete=PROTECT`` are looked up
+    by their indexed foreign keys before the delete is tried, instead of
+    letting the deletion collector load all of them to raise ProtectedError.'''
 
     protected_data_message: str = 'Entity deletion forbidden message'
     protected_data_url: Union[str, Callable[..., Any]] = REVERSE_HOME
 
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Adds the number of rows keeping the object from being deleted.'''
+        context: Dict[str, Any] = super().get_context_data(**kwargs)
+        context['reference_count'] = sum(
+            model._base_manager.filter(condition).count()
+            for model, condition in self.get_protecting_filters().items()
+        )
+        return context
+
     def post(self, request: HttpRequest, *args: str, **kwargs: Any) -> HttpResponse:
         '''Sends data to the server with protection check.'''
+        if self.is_protected():
+            return self.handle_protected_data()
         try:
             return super().post(request, *args, **kwargs)
-        except ProtectedError:
-            messages.error(self.request, self.protected_data_message)
-            return redirect(self.protected_data_url)
+        except ProtectedError:  # referenced since the check
+            return self.handle_protected_data()
+
+    def handle_protected_data(self) -> HttpResponseRedirect:
+        messages.error(self.request, self.protected_data_message)
+        return redirect(self.protected_data_url)
+
+    def get_protecting_filters(self) -> Dict[Type[Model], Q]:
+        '''Returns the conditions on the rows referencing the object
+        with on_delete=PROTECT, one per referencing model.'''
+        obj: Model = self.get_object()
+        filters: Dict[Type[Model], Q] = {}
+        for relation in obj._meta.related_objects:
+            if relation.on_delete is PROTECT:
+                filters[relation.related_model] = \
+                    filters.get(relation.related_model, Q()) | Q(**{relation.field.name: obj})
+        return filters
+
+    def is_protected(self) -> bool:
+        return any(
+            model._base_manager.filter(condition).exists()
+            for model, condition in self.get_protecting_filters().items()
+        )
+
+
+class KeysetPaginationMixin:
+    '''Paginates a list view by cursor instead of by page number.'''
+
+    paginate_by: int = 50
+    keyset_ordering: Sequence[str] = ('-pk',)
+    cursor_kwarg: str = 'cursor'
+    paginated: Optional[Paginated] = None
+
+    def get_keyset_ordering(self) -> Sequence[str]:
+        '''Returns the columns the pages are cut on.'''
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> Paginated:
+        '''Selects the page addressed by the cursor from the request,
+        unless apaginate_queryset() has.'''
+        if self.paginated is not None:
+            return self.paginated
+        paginator = KeysetPaginator(queryset, page_size, self.get_keyset_ordering())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404(MSG_INVALID_CURSOR)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset: QuerySet, page_size: int) -> Paginated:
+        '''Reads the page with the async ORM, for paginate_queryset()
+        to return when the context is built.'''
+        paginator = KeysetPaginator(queryset, page_size, self.get_keyset_ordering())
+        try:
+            page = await paginator.apage(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404(MSG_INVALID_CURSOR)
+        self.paginated = (paginator, page, page.object_list, page.has_other_pages())
+        return self.paginated
+
+
+class UsageListMixin(KeysetPaginationMixin):
+    '''Lists the objects with the number of tasks using each as ``usage``,
+    sorted as asked by the ``sort`` parameter.
+
+    The usage is read from the ``usage_counter`` counters in the page query,
+    one indexed lookup per row, rather than counted over the tasks; being
+    kept along with the tasks, they also serve as the validators of it.
+    The counters are rows of ``counter_model``, looked up by name so this
+    module does not import the tasks app.'''
+
+    usage_counter: str
+    counter_model: str = 'tasks.TaskCounter'
+    sort_kwarg: str = SORT_KWARG
+
+    def get_sort(self) -> str:
+        sort: str = self.request.GET.get(self.sort_kwarg, SORT_BY_ID)
+        return sort if sort in SORT_ORDERINGS else SORT_BY_ID
+
+    def get_keyset_ordering(self) -> Sequence[str]:
+        return SORT_ORDERINGS[self.get_sort()]
+
+    def get_usage_counters(self) -> QuerySet:
+        counters: Type[Model] = apps.get_model(self.counter_model)
+        return counters.objects.filter(kind=self.usage_counter)
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> Any:
+        counts: QuerySet = self.get_usage_counters() \
+            .filter(object_id=OuterRef('pk')).values('count')[:1]
+        return super().paginate_queryset(
+            queryset.annotate(usage=Coalesce(Subquery(counts), 0)), page_size
+        )
+
+    def get_validators(self) -> Dict[str, Any]:
+        '''Adds one aggregate of the counters: any change of them moves
+        their latest ``date_modified``, however many there are.'''
+        validators: Dict[str, Any] = super().get_validators()
+        validators.update(self.get_usage_counters().order_by().aggregate(
+            usage_count=Count('pk'), usage_total=Sum('count'), stamp_usage=Max('date_modified'),
+        ))
+        return validators
+
+
+class ReplicaReadMixin:
+    '''Lets the GET and HEAD requests of the view read from a replica
+    (see task_manager.replicas). Clients who have just written are pinned
+    to the default database, so a view redirected to after a write may
+    use this too.'''
+    read_from_replica: bool = True
+
+
+class ConditionalGetMixin:
+    '''Answers GET with 304 Not Modified when the client's copy of the page
+    is current, before the objects are loaded and the template rendered.
+
+    The validators come from one query: the latest of the
+    ``last_modified_fields`` (related fields may be followed) and the number
+    of the rows they span. The viewer, the language and the CSRF cookie the
+    page was rendered with are part of the ETag. Views showing more may add
+    validators; those named ``stamp_*`` are times.'''
+
+    last_modified_fields: Sequence[str] = ('date_modified',)
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        # A page showing flash messages must be rendered to show them.
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+        validators: Dict[str, Any] = self.get_validators()
+        if self.is_single_object() and not validators['count']:
+            return super().get(request, *args, **kwargs)  # 404
+        return self.conditional_response(
+            *self.get_page_state(validators),
+            lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs),
+        )
+
+    def is_single_object(self) -> bool:
+        return isinstance(self, SingleObjectMixin)
+
+    def get_validator_queryset(self) -> QuerySet:
+        '''The objects the page shows.'''
+        queryset: QuerySet = self.get_queryset()
+        if self.is_single_object():
+            queryset = queryset.filter(pk=self.kwargs.get(self.pk_url_kwarg))
+        return queryset
+
+    def get_validator_aggregates(self) -> Dict[str, Any]:
+        # Not distinct: through to-many relations the count is that of the
+        # related rows, so removing one of them changes the validator too.
+        return {'count': Count('pk'), **{
+            'stamp_{}'.format(index): Max(field)
+            for index, field in enumerate(self.last_modified_fields)
+        }}
+
+    def get_validators(self) -> Dict[str, Any]:
+        return self.get_validator_queryset().order_by() \
+            .aggregate(**self.get_validator_aggregates())
+
+    def get_page_state(self, validators: Dict[str, Any]) -> PageState:
+        '''Returns what the ETag is computed from and the times of the validators.'''
+        stamps: List[Optional[datetime]] = [
+            value for name, value in validators.items() if name.startswith('stamp_')
+        ]
+        return [sorted(validators.items()), self.get_viewer_state()], stamps
+
+    def get_viewer_state(self) -> List[Any]:
+        user = self.request.user
+        return [
+            user.pk, getattr(user, 'date_modified', None), get_language(),
+            self.request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        ]
+
+    def conditional_response(self, state: Any, stamps: List[Optional[datetime]],
+                             respond: Callable[[], HttpResponse]) -> HttpResponse:
+        '''Answers 304 if the client has the representation of this state,
+        otherwise builds the response with respond().'''
+        etag, timestamp = self.get_etag(state), self.get_timestamp(stamps)
+        response: Optional[HttpResponse] = get_conditional_response(
+            self.request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = respond()
+        return self.add_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, state: Any, stamps: List[Optional[datetime]],
+                                    respond: Callable[[], Awaitable[HttpResponse]]
+                                    ) -> HttpResponse:
+        '''conditional_response() building the response with a coroutine.'''
+        etag, timestamp = self.get_etag(state), self.get_timestamp(stamps)
+        response: Optional[HttpResponse] = get_conditional_response(
+            self.request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = await respond()
+        return self.add_validators(response, etag, timestamp)
+
+    def get_etag(self, state: Any) -> str:
+        return quote_etag(hashlib.sha1(
+            json.dumps(state, cls=DjangoJSONEncoder).encode()
+        ).hexdigest())
+
+    def get_timestamp(self, stamps: List[Optional[datetime]]) -> Optional[int]:
+        last_modified: Optional[datetime] = max(filter(None, stamps), default=None)
+        return int(last_modified.timestamp()) if last_modified else None
+
+    def add_validators(self, response: HttpResponse, etag: str,
+                       timestamp: Optional[int]) -> HttpResponse:
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        # Clients may keep the response but have to revalidate it each time.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    '''ConditionalGetMixin for views whose get() is a coroutine (see
+    AsyncViewMixin). The validators are read with the async ORM;
+    the page is built by aget_page(), by default the sync get() of the
+    view on a thread.'''
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if len(messages.get_messages(request)):
+            return await self.aget_page()
+        validators: Dict[str, Any] = await self.aget_validators()
+        if self.is_single_object() and not validators['count']:
+            return await self.aget_page()  # 404
+        return await self.aconditional_response(
+            *self.get_page_state(validators), self.aget_page
+        )
+
+    async def aget_validators(self) -> Dict[str, Any]:
+        return await self.get_validator_queryset().order_by() \
+            .aaggregate(**self.get_validator_aggregates())
+
+    async def aget_page(self) -> HttpResponse:
+        return await sync_to_async(super(ConditionalGetMixin, self).get)(
+            self.request, *self.args, **self.kwargs
+        )
@@ -0,0 +1,216 @@
+"""Keyset (cursor) pagination.
+
+Pages are selected with a WHERE clause on the ordering columns of the last
+(or first) row shown instead of an OFFSET, so fetching a page costs the same
+however deep it is, and rows inserted or moved between page loads never
+shift the rows of the following pages. ``apage()`` reads the page with
+the async ORM.
+"""
+
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
+from django.db.models import Model, Q, QuerySet, prefetch_related_objects
+
+
+NEXT: str = 'n'
+PREVIOUS: str = 'p'
+# The integers the databases bind: signed 64 bits.
+MIN_INTEGER: int = -2 ** 63
+MAX_INTEGER: int = 2 ** 63 - 1
+
+
+class InvalidCursor(Exception):
+    '''The cursor is malformed or does not match the ordering.'''
+
+
+class KeysetPage:
+    '''A page of objects together with the cursors of its neighbours.'''
+
+    def __init__(self, object_list: Union[QuerySet, List[Model]], paginator: 'KeysetPaginator',
+                 has_next: bool, has_previous: bool) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return '<KeysetPage of {} objects>'.format(len(self))
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self) -> Iterator[Model]:
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(NEXT, list(self.object_list)[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(PREVIOUS, list(self.object_list)[0])
+
+
+async def fetch(queryset: QuerySet) -> List[Model]:
+    '''Reads the rows of the queryset with aiterator(). It can't prefetch
+    in Django 4.1: the related objects are prefetched after, on a thread.'''
+    rows: List[Model] = [obj async for obj in queryset.prefetch_related(None).aiterator()]
+    if rows and queryset._prefetch_related_lookups:
+        await sync_to_async(prefetch_related_objects)(
+            rows, *queryset._prefetch_related_lookups
+        )
+    return rows
+
+
+class KeysetPaginator:
+    '''Paginates a queryset by the values of its ordering columns.
+
+    The ordering must be total: its columns must not be nullable and
+    the last one must be unique (usually the primary key).'''
+
+    def __init__(self, queryset: QuerySet, per_page: int,
+                 ordering: Sequence[str]) -> None:
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields: Tuple[str, ...] = tuple(name.lstrip('-') for name in self.ordering)
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        '''Returns the first page, or the page adjacent to the cursor.'''
+        ordered: QuerySet = self.queryset.order_by(*self.ordering)
+        if not cursor:
+            return self._forward_page(ordered, ordered, has_previous=False)
+
+        direction, values = self.decode_cursor(cursor)
+        if direction == NEXT:
+            return self._forward_page(
+                ordered, ordered.filter(self._after(values)), has_previous=True
+            )
+        return self._backward_page(ordered, values)
+
+    def _forward_page(self, ordered: QuerySet, queryset: QuerySet,
+                      has_previous: bool) -> KeysetPage:
+        object_list: QuerySet = queryset[:self.per_page]
+        rows: List[Model] = list(object_list)
+        has_next: bool = len(rows) == self.per_page and \
+            ordered.filter(self._after(self._values(rows[-1]))).exists()
+        return KeysetPage(object_list, self, has_next, has_previous)
+
+    def _backward_page(self, ordered: QuerySet, values: List[Any]) -> KeysetPage:
+        object_list: QuerySet = ordered.filter(pk__in=self._before(values))
+        rows: List[Model] = list(object_list)
+        has_previous: bool = len(rows) == self.per_page and \
+            ordered.filter(self._after(self._values(rows[0]), reverse=True)).exists()
+        return KeysetPage(object_list, self, True, has_previous)
+
+    async def apage(self, cursor: Optional[str] = None) -> KeysetPage:
+        '''page() with the async ORM; the page holds a list of the rows.'''
+        ordered: QuerySet = self.queryset.order_by(*self.ordering)
+        if not cursor:
+            return await self._aforward_page(ordered, ordered, has_previous=False)
+
+        direction, values = self.decode_cursor(cursor)
+        if direction == NEXT:
+            return await self._aforward_page(
+                ordered, ordered.filter(self._after(values)), has_previous=True
+            )
+        return await self._abackward_page(ordered, values)
+
+    async def _aforward_page(self, ordered: QuerySet, queryset: QuerySet,
+                             has_previous: bool) -> KeysetPage:
+        rows: List[Model] = await fetch(queryset[:self.per_page])
+        has_next: bool = len(rows) == self.per_page and \
+            await ordered.filter(self._after(self._values(rows[-1]))).aexists()
+        return KeysetPage(rows, self, has_next, has_previous)
+
+    async def _abackward_page(self, ordered: QuerySet, values: List[Any]) -> KeysetPage:
+        rows: List[Model] = await fetch(ordered.filter(pk__in=self._before(values)))
+        has_previous: bool = len(rows) == self.per_page and \
+            await ordered.filter(self._after(self._values(rows[0]), reverse=True)).aexists()
+        return KeysetPage(rows, self, True, has_previous)
+
+    def _before(self, values: List[Any]) -> QuerySet:
+        '''The primary keys of the page before the ordering values.'''
+        # The rows right before the cursor are the first ones in reverse order;
+        # they are selected in a subquery to keep the page in display order.
+        reverse_ordering: Tuple[str, ...] = tuple(
+            name[1:] if name.startswith('-') else '-' + name for name in self.ordering
+        )
+        return self.queryset.order_by(*reverse_ordering) \
+            .filter(self._after(values, reverse=True)) \
+            .values('pk')[:self.per_page]
+
+    def _after(self, values: List[Any], reverse: bool = False) -> Q:
+        '''Builds the condition selecting the rows that follow the given
+        ordering values (or precede them if reverse is set).'''
+        condition: Q = Q()
+        for index, name in enumerate(self.ordering):
+            descending: bool = name.startswith('-')
+            lookup: str = 'lt' if descending != reverse else 'gt'
+            step: Q = Q(**{'{}__{}'.format(self.fields[index], lookup): values[index]})
+            for field, value in zip(self.fields[:index], values[:index]):
+                step &= Q(**{field: value})
+            condition |= step
+        return condition
+
+    def _values(self, obj: Model) -> List[Any]:
+        return [getattr(obj, field) for field in self.fields]
+
+    def encode_cursor(self, direction: str, obj: Model) -> str:
+        values: List[Any] = [
+            value.isoformat() if isinstance(value, (date, datetime)) else value
+            for value in self._values(obj)
+        ]
+        payload: bytes = json.dumps([direction, values]).encode()
+        return urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, List[Any]]:
+        try:
+            payload: bytes = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+        except (BinasciiError, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or \
+                not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        return direction, [
+            self._to_python(field, value) for field, value in zip(self.fields, values)
+        ]
+
+    def _to_python(self, field: str, value: Any) -> Any:
+        '''Converts a value of the cursor with the field it is compared to,
+        the output field for an annotation, rejecting what can't be bound.'''
+        annotation: Any = self.queryset.query.annotations.get(field)
+        opts = self.queryset.model._meta
+        try:
+            model_field = annotation.output_field if annotation is not None else \
+                opts.pk if field == 'pk' else opts.get_field(field)
+            value = model_field.to_python(value)
+        except (FieldDoesNotExist, FieldError, ValidationError,
+                TypeError, ValueError, OverflowError):
+            raise InvalidCursor(field)
+        if value is None or isinstance(value, (list, dict)) \
+                or isinstance(value, int) and not MIN_INTEGER <= value <= MAX_INTEGER \
+                or isinstance(value, float) and not math.isfinite(value):
+            raise InvalidCursor(field)
+        return value
@@ -0,0 +1,115 @@
+"""Read replicas.
+
+The databases named in ``DATABASE_REPLICAS`` hold copies of the default
+one. The GET and HEAD requests of the views marked with
+``ReplicaReadMixin`` read from one of them, picked at random; every other
+request, every write and everything outside a request (commands, the
+shell) go to the default database.
+
+Replicas lag behind. A client who has just changed something, e.g. created
+a task and been redirected to the list, must see the change: a request
+that may have written, an unsafe method or a changed session, pins the
+client to the default database for ``REPLICA_STICKINESS`` seconds with
+a cookie. Replicas are assumed to catch up within that time.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+
+from .constants import REPLICA_PIN_COOKIE
+from .middleware import AsyncCapableMiddleware
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_reading: ContextVar[bool] = ContextVar('replica_reading', default=False)
+
+
+def get_replicas() -> List[str]:
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+@contextmanager
+def primary() -> Iterator[None]:
+    '''Reads from the default database within the block, e.g. to fill
+    a cache other requests will read from.'''
+    token = _reading.set(False)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+class ReplicaRouter:
+    '''Sends the reads of the requests allowed to use a replica to one of them.'''
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        replicas: List[str] = get_replicas()
+        if replicas and _reading.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        '''The replicas hold the same rows as the default database.'''
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    '''Lets the marked views read from a replica unless the client is pinned
+    to the default database, and pins the clients that may have written.
+
+    The session and the signed in user are read before the view is known,
+    from the default database.'''
+
+    def call(self, request: HttpRequest) -> HttpResponse:
+        token = _reading.set(False)
+        try:
+            response: HttpResponse = self.get_response(request)
+        finally:
+            _reading.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = _reading.set(False)
+        try:
+            response: HttpResponse = await self.get_response(request)
+        finally:
+            _reading.reset(token)
+        return self.pin(request, response)
+
+    def process_view(self, request: HttpRequest, view_func: Callable[..., Any],
+                     view_args: Any, view_kwargs: Any) -> None:
+        '''Under ASGI this runs on a thread; the value set is carried
+        back to the request, as sync_to_async() does.'''
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            getattr(view_class, 'read_from_replica', False)
+            and request.method in ('GET', 'HEAD')
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            _reading.set(True)
+
+    def pin(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if get_replicas() and self.may_have_written(request):
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=settings.REPLICA_STICKINESS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def may_have_written(self, request: HttpRequest) -> bool:
+        session = getattr(request, 'session', None)
+        return request.method not in SAFE_METHODS \
+            or session is not None and session.modified
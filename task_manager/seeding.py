@@ -0,0 +1,184 @@
+"""Synthetic datasets for performance work.
+
+A profile sets the size of the dataset and the shape of its distributions;
+the same profile and seed always give the same rows. Statuses, labels,
+authors and executors are drawn with Zipf-like weights, so a few of them
+are used by most tasks, as in real projects. Rows are written in batches,
+with the task counters rebuilt and the caches invalidated once at the end.
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass, fields, replace
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from task_manager.labels.models import Label, cache_namespace as label_cache
+from task_manager.statuses.models import Status, cache_namespace as status_cache
+from task_manager.users.models import User
+from task_manager.tasks import counters
+from task_manager.tasks.models import Task, TaskLabel, cache_namespace as task_cache
+
+
+# The seeded users are named with it, followed by their number.
+USERNAME_PREFIX: str = 'perf-user-'
+
+
+@dataclass(frozen=True)
+class Profile:
+    '''The size and the shape of a dataset.'''
+    users: int
+    statuses: int
+    labels: int
+    tasks: int
+    # Share of the tasks per number of labels: 0, 1, 2, ...
+    labels_per_task: Sequence[float] = (0.3, 0.35, 0.2, 0.1, 0.05)
+    # Zipf exponents: the higher, the more the first ones are used.
+    label_skew: float = 1.0
+    status_skew: float = 0.8
+    user_skew: float = 0.6
+    # Share of the tasks without an executor.
+    unassigned: float = 0.2
+    password: str = 'perf-password'
+    batch_size: int = 5000
+
+
+PROFILES: Dict[str, Profile] = {
+    'tiny': Profile(users=20, statuses=5, labels=20, tasks=1000),
+    'small': Profile(users=1000, statuses=50, labels=200, tasks=100000),
+    'large': Profile(users=10000, statuses=200, labels=2000, tasks=5000000),
+}
+
+
+class ProfileError(ValueError):
+    '''The profile or the configuration is invalid.'''
+
+
+def load_profile(name: str, config: Optional[str] = None) -> Profile:
+    '''Returns the named profile, changed by the JSON configuration file if any.
+    The file holds profile fields and may name the base profile as "profile".'''
+    overrides: Dict[str, Any] = {}
+    if config is not None:
+        with open(config, encoding='utf-8') as file:
+            overrides = json.load(file)
+        if not isinstance(overrides, dict):
+            raise ProfileError('The configuration must be a JSON object.')
+        name = overrides.pop('profile', name)
+    if name not in PROFILES:
+        raise ProfileError('Unknown profile: {}.'.format(name))
+    known = {item.name for item in fields(Profile)}
+    unknown: List[str] = sorted(set(overrides) - known)
+    if unknown:
+        raise ProfileError('Unknown profile fields: {}.'.format(', '.join(unknown)))
+    profile: Profile = replace(PROFILES[name], **overrides)
+    if min(profile.users, profile.statuses, profile.tasks) < 1 or profile.labels < 0:
+        raise ProfileError('A dataset needs users, statuses and tasks.')
+    return profile
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    '''Cumulative weights of ranks 1..count, the weight of a rank r being 1 / r^skew.'''
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def batches(total: int, size: int) -> Iterator[int]:
+    while total > 0:
+        yield min(total, size)
+        total -= size
+
+
+class Seeder:
+    '''Writes the dataset of a profile, reporting the progress to ``progress``.'''
+
+    def __init__(self, profile: Profile, seed: int = 0,
+                 progress: Callable[[str, int, int], None] = lambda *args: None) -> None:
+        self.profile = profile
+        self.random = random.Random(seed)
+        self.progress = progress
+
+    def run(self) -> Dict[str, Any]:
+        '''Seeds the database and returns the profile used.'''
+        user_ids: List[int] = self.seed_users()
+        status_ids: List[int] = self.seed_named(Status, 'Status', self.profile.statuses)
+        label_ids: List[int] = self.seed_named(Label, 'Label', self.profile.labels)
+        self.seed_tasks(user_ids, status_ids, label_ids)
+        counters.rebuild()
+        for namespace in (status_cache, label_cache, task_cache):
+            namespace.invalidate()
+        return asdict(self.profile)
+
+    def seed_users(self) -> List[int]:
+        # Password hashing is slow by design: the users share one hash.
+        password: str = make_password(self.profile.password)
+        width: int = len(str(self.profile.users))
+        users: List[User] = [
+            User(username='{}{:0{}}'.format(USERNAME_PREFIX, number, width), password=password,
+                 first_name='User', last_name=str(number))
+            for number in range(1, self.profile.users + 1)
+        ]
+        return self.write(User, users, 'users')
+
+    def seed_named(self, model: Any, prefix: str, count: int) -> List[int]:
+        width: int = len(str(count))
+        objects = [model(name='{} {:0{}}'.format(prefix, number, width))
+                   for number in range(1, count + 1)]
+        return self.write(model, objects, model._meta.verbose_name_plural)
+
+    def write(self, model: Any, objects: List[Any], name: str) -> List[int]:
+        ids: List[int] = []
+        for start in range(0, len(objects), self.profile.batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    objects[start:start + self.profile.batch_size]
+                )
+            ids += [obj.pk for obj in created]
+            self.progress(str(name), len(ids), len(objects))
+        return ids
+
+    def seed_tasks(self, user_ids: List[int], status_ids: List[int],
+                   label_ids: List[int]) -> None:
+        profile: Profile = self.profile
+        user_weights: List[float] = zipf_weights(len(user_ids), profile.user_skew)
+        status_weights: List[float] = zipf_weights(len(status_ids), profile.status_skew)
+        label_weights: List[float] = zipf_weights(len(label_ids), profile.label_skew)
+        label_counts: List[int] = list(range(len(profile.labels_per_task)))
+        written: int = 0
+        for size in batches(profile.tasks, profile.batch_size):
+            rng = self.random
+            authors = rng.choices(user_ids, cum_weights=user_weights, k=size)
+            executors = rng.choices(user_ids, cum_weights=user_weights, k=size)
+            statuses = rng.choices(status_ids, cum_weights=status_weights, k=size)
+            tasks: List[Task] = [
+                Task(
+                    name='Task {}'.format(written + number + 1),
+                    description='Generated task {} for performance tests.'.format(
+                        written + number + 1
+                    ),
+                    status_id=statuses[number], author_id=authors[number],
+                    executor_id=None if rng.random() < profile.unassigned
+                    else executors[number],
+                )
+                for number in range(size)
+            ]
+            numbers = rng.choices(label_counts, weights=profile.labels_per_task, k=size) \
+                if label_ids else [0] * size
+            with transaction.atomic():
+                created: List[Task] = Task.objects.bulk_create(tasks)
+                TaskLabel.objects.bulk_create(
+                    TaskLabel(task_id=task.pk, label_id=label_id)
+                    for task, number in zip(created, numbers)
+                    for label_id in self.pick_labels(label_ids, label_weights, number)
+                )
+            written += size
+            self.progress('tasks', written, profile.tasks)
+
+    def pick_labels(self, label_ids: List[int], weights: List[float], count: int) -> List[int]:
+        '''Draws up to count distinct labels.'''
+        if not count:
+            return []
+        return list(dict.fromkeys(
+            self.random.choices(label_ids, cum_weights=weights, k=min(count, len(label_ids)))
+        ))
@@ -64,13 +64,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_manager.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'task_manager.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'task_manager.replicas.ReplicaMiddleware',
+    'task_manager.identity.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware'
@@ -78,6 +81,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'task_manager.urls'
 
+# The ASGI application routes the task views to their coroutine versions.
+ASGI_URLCONF = 'task_manager.asgi_urls'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -100,17 +106,157 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# SQLite runs on task_manager.db.sqlite3: WAL, pragmas and write transactions
+# taking the lock as they begin (SQLITE_TRANSACTION_MODE), so that several
+# workers can share the file.
+SQLITE_ENGINE = 'task_manager.db.sqlite3'
+SQLITE_OPTIONS = {
+    'transaction_mode': os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': SQLITE_ENGINE,
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
+# Seconds a connection is kept between requests; ASGI (see asgi.py) sets 0.
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 500))
+
 if not DEBUG:  # pragma: no cover
-    DATABASES["default"] = dj_database_url.config(conn_max_age=500)
+    DATABASES["default"] = dj_database_url.config(
+        conn_max_age=CONN_MAX_AGE, default='sqlite:///{}'.format(BASE_DIR / 'db.sqlite3')
+    )
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES['default'].update(ENGINE=SQLITE_ENGINE, OPTIONS=SQLITE_OPTIONS)
+
+# Read replicas of the default database, REPLICA_DATABASE_URLS separated by
+# commas. The pages that only read use them unless the client has written
+# in the last REPLICA_STICKINESS seconds (see task_manager.replicas).
+for number, url in enumerate(filter(None, os.getenv('REPLICA_DATABASE_URLS', '').split(',')), 1):
+    replica = dj_database_url.parse(url.strip(), conn_max_age=CONN_MAX_AGE)
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica.update(ENGINE=SQLITE_ENGINE, OPTIONS=SQLITE_OPTIONS)
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica{}'.format(number)] = replica
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['task_manager.replicas.ReplicaRouter']
+REPLICA_STICKINESS = int(os.getenv('REPLICA_STICKINESS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# The default cache keeps what each process reads most in its memory,
+# in front of the shared cache chosen by CACHE_BACKEND: locmem (one per
+# process), filesystem (CACHE_LOCATION, a directory) or redis (CACHE_LOCATION,
+# a redis:// or rediss:// URL, with the credentials if the server needs them).
+SHARED_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Room for the rendered task rows of a few thousand tasks.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'filesystem': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / '.cache'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/0'),
+    },
+}
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'task_manager.cache.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', 1000)),
+            # How long a process may serve what another one has changed.
+            'LOCAL_TIMEOUT': int(os.getenv('CACHE_LOCAL_TIMEOUT', 5)),
+        },
+    },
+    'shared': SHARED_CACHES[CACHE_BACKEND],
+}
 
 
+# Sessions and messages
+# https://docs.djangoproject.com/en/4.1/topics/http/sessions/#configuring-the-session-engine
+
+# SESSION_BACKEND: cached_db (read from the shared cache, written through to
+# the database), db, or signed_cookies (no rows at all). Sessions are cached
+# only in a cache the processes share: signing out must end them everywhere.
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    os.getenv('SESSION_BACKEND', 'db' if CACHE_BACKEND == 'locmem' else 'cached_db')
+]
+SESSION_CACHE_ALIAS = 'shared'
+
+# MESSAGE_BACKEND: cookie keeps the messages out of the session, so showing
+# one doesn't write the session; fallback moves those overflowing the cookie
+# to the session.
+MESSAGE_STORAGES = {
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+}
+MESSAGE_STORAGE = MESSAGE_STORAGES[os.getenv('MESSAGE_BACKEND', 'cookie')]
+
+
+# Performance budgets by URL name, in milliseconds and queries.
+# Requests going over them are logged on task_manager.slow_requests.
+PERFORMANCE_BUDGETS = {
+    'default': {'total': 300, 'db': 150, 'queries': 20},
+    # Streams every matching task.
+    'api_tasks_export': {'total': 5000, 'db': 5000, 'queries': 20},
+    # Changes up to BULK_MAX_TASKS tasks.
+    'tasks_bulk': {'total': 2000, 'db': 1500, 'queries': 50},
+    # Update a task counter per status, executor and label they change;
+    # an edit moving the status, the executor and two labels runs 24 queries.
+    'task_create': {'total': 300, 'db': 150, 'queries': 30},
+    'task_update': {'total': 300, 'db': 150, 'queries': 30},
+    'task_delete': {'total': 300, 'db': 150, 'queries': 30},
+}
+
+# The share of the slow requests logged.
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv('SLOW_REQUEST_SAMPLE_RATE', '1'))
+
+
+# Logging
+# https://docs.djangoproject.com/en/4.1/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # One line per request at INFO; off unless TIMING_LOG_LEVEL=INFO.
+        'task_manager.timing': {
+            'handlers': ['console'],
+            'level': os.getenv('TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'task_manager.slow_requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Deployment:
 # https://developer.mozilla.org/en-US/docs/Learn/Server-side/Django/Deployment
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StatusesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.statuses'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -71,6 +71,12 @@ UPDATE_BUTTON: str = gettext_lazy('Update')
 DELETE_BUTTON: str = gettext_lazy('Yes, delete')
 
 
+# Cache
+CACHE_NAMESPACE: Final[str] = 'statuses'
+CHOICES_CACHE_KEY: Final[str] = 'choices'
+CHOICES_CACHE_TIMEOUT: Final[int] = 60 * 60 * 24
+
+
 # Contexts
 CONTEXT_LIST: Dict = {
     PAGE_TITLE: LIST_TITLE,
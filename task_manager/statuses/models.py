@@ -1,5 +1,23 @@
 from django.db import models
 from django.utils.translation import gettext_lazy
+from typing import List, Tuple
+
+from task_manager.cache import Namespace
+from .constants import CACHE_NAMESPACE, CHOICES_CACHE_KEY, CHOICES_CACHE_TIMEOUT
+
+
+# Invalidated whenever a status is created, renamed or deleted.
+cache_namespace: Namespace = Namespace(CACHE_NAMESPACE)
+
+
+class StatusManager(models.Manager):
+    def choices(self) -> List[Tuple[int, str]]:
+        '''Returns the (id, name) pairs of all statuses, from the cache.'''
+        return cache_namespace.get_or_set(
+            CHOICES_CACHE_KEY,
+            lambda: list(self.order_by('name').values_list('id', 'name')),
+            CHOICES_CACHE_TIMEOUT,
+        )
 
 
 class Status(models.Model):
@@ -16,6 +34,8 @@ class Status(models.Model):
         auto_now=True
     )
 
+    objects = StatusManager()
+
     class Meta:
         verbose_name: str = gettext_lazy('status')
         verbose_name_plural: str = gettext_lazy('statuses')
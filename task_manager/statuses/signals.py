@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from typing import Any, Type
+
+from .models import Status, cache_namespace
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def invalidate_status_cache(sender: Type[Status], **kwargs: Any) -> None:
+    '''Whatever was cached from the statuses has to be rebuilt once one is changed.'''
+    cache_namespace.invalidate()
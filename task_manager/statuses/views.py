@@ -6,14 +6,18 @@ from .models import Status
 from .constants import REVERSE_STATUSES, NAME, \
     CONTEXT_LIST, CONTEXT_CREATE, CONTEXT_UPDATE, CONTEXT_DELETE, \
     MSG_CREATED, MSG_UPDATED, MSG_DELETED, STATUS_USED_IN_TASK
-from ..mixins import AuthorizationPermissionMixin, DeletionProtectionMixin
+from ..mixins import AuthorizationPermissionMixin, ConditionalGetMixin, \
+    DeletionProtectionMixin, ReplicaReadMixin, UsageListMixin
+from ..tasks.models import TaskCounter
 
 
-class StatusesListView(AuthorizationPermissionMixin, ListView):
-    '''Show the list of statuses.'''
+class StatusesListView(AuthorizationPermissionMixin, ReplicaReadMixin, UsageListMixin,
+                       ConditionalGetMixin, ListView):
+    '''Show the list of statuses with the number of tasks using each.'''
     model: Type[Status] = Status
     context_object_name: str = 'statuses'
     extra_context: Dict = CONTEXT_LIST
+    usage_counter: str = TaskCounter.STATUS
 
 
 class StatusCreateView(AuthorizationPermissionMixin,
@@ -0,0 +1,366 @@
+"""Read-only JSON API for tasks.
+
+The list accepts the TasksFilter parameters and is paginated by cursor like
+the HTML list; the export streams all the tasks matching them. The list and
+detail endpoints take ``fields=name,status,...`` to return (and
+load) only some of the fields, and answer conditional requests: the ETag and
+Last-Modified validators are computed from ``date_modified`` of the tasks
+shown before anything else is loaded, so an unchanged page costs a single
+narrow query and a 304.
+
+The ASGI application serves the list and detail from coroutine versions
+reading with the async ORM (see task_manager.asgi_urls); under WSGI they
+would only add a thread hop per query. The export has none, Django 4.1
+streaming only from sync iterators.
+"""
+
+import csv
+import inspect
+import json
+from datetime import datetime
+from io import StringIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Model, Prefetch, QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from task_manager.labels.models import Label
+from task_manager.mixins import ApiAuthorizationMixin, AsyncViewMixin, ConditionalGetMixin, \
+    PageState, ReplicaReadMixin
+from task_manager.pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+from .constants import API_FIELDS, API_PAGE_SIZE, FIELDS_KWARG, FORMAT_KWARG, \
+    EXPORT_CHUNK_SIZE, EXPORT_CSV, EXPORT_FORMATS, \
+    MSG_API_INVALID_FILTER, MSG_API_NOT_FOUND, MSG_API_UNKNOWN_FIELDS, \
+    MSG_API_UNKNOWN_FORMAT, MSG_INVALID_CURSOR
+from .filters import TasksFilter
+from .models import Task
+
+
+# The columns and relations each field needs.
+FIELD_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'status': ('status', 'status__name'),
+    'author': ('author', 'author__first_name', 'author__last_name'),
+    'executor': ('executor', 'executor__first_name', 'executor__last_name'),
+    'labels': (),
+}
+RELATIONS: Tuple[str, ...] = ('status', 'author', 'executor')
+
+# Renaming these does not touch the tasks, so they take part in the validators.
+RELATED_STAMPS: Dict[str, Type[Model]] = {
+    'status': Status,
+    'labels': Label,
+    'author': User,
+    'executor': User,
+}
+
+
+def stamped_models(fields: Sequence[str]) -> List[Type[Model]]:
+    '''The models whose changes the fields show, each once.'''
+    models: List[Type[Model]] = []
+    for name, model in RELATED_STAMPS.items():
+        if name in fields and model not in models:
+            models.append(model)
+    return models
+
+
+class ApiError(Exception):
+    '''Stops the request with a JSON error response.'''
+
+    def __init__(self, status: int, detail: str, **extra: Any) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.data: Dict[str, Any] = {'detail': detail, **extra}
+
+    def response(self) -> JsonResponse:
+        return JsonResponse(self.data, status=self.status)
+
+
+def user_data(user: Optional[User]) -> Optional[Dict[str, Any]]:
+    if user is None:
+        return None
+    return {'id': user.id, 'name': user.get_full_name()}
+
+
+SERIALIZERS: Dict[str, Callable[[Task], Any]] = {
+    'status': lambda task: {'id': task.status_id, 'name': task.status.name},
+    'author': lambda task: user_data(task.author),
+    'executor': lambda task: user_data(task.executor),
+    'labels': lambda task: [{'id': label.id, 'name': label.name} for label in task.labels.all()],
+}
+
+# CSV cells are flat: relations are written by name, datetimes in ISO 8601.
+CSV_FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    'status': lambda status: status['name'],
+    'author': lambda user: user['name'],
+    'executor': lambda user: user['name'] if user else '',
+    'labels': lambda labels: ', '.join(label['name'] for label in labels),
+    'date_created': lambda value: value.isoformat(),
+    'date_modified': lambda value: value.isoformat(),
+}
+
+
+class TaskApiView(ApiAuthorizationMixin, ConditionalGetMixin, View):
+    '''Base of the task endpoints: field selection, errors and validators.'''
+    http_method_names: List[str] = ['get', 'head', 'options']
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        try:
+            response: Any = super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return error.response()
+        if self.view_is_async:
+            return self.answer_errors(response)
+        return response
+
+    async def answer_errors(self, response: Any) -> HttpResponse:
+        '''Awaits the response of a coroutine handler, answering its errors.'''
+        try:
+            return await response if inspect.isawaitable(response) else response
+        except ApiError as error:
+            return error.response()
+
+    def get_fields(self) -> List[str]:
+        '''Returns the requested fields in the API order, all by default.'''
+        value: str = self.request.GET.get(FIELDS_KWARG, '')
+        if not value:
+            return list(API_FIELDS)
+        requested: List[str] = [name.strip() for name in value.split(',') if name.strip()]
+        unknown: List[str] = [name for name in requested if name not in API_FIELDS]
+        if unknown:
+            raise ApiError(400, str(MSG_API_UNKNOWN_FIELDS) % {'fields': ', '.join(unknown)})
+        return [name for name in API_FIELDS if name in requested]
+
+    def get_filterset(self) -> TasksFilter:
+        '''Returns the TasksFilter of the request parameters if they are valid.
+        Validating them reads their choices.'''
+        filterset = TasksFilter(
+            self.request.GET, queryset=Task.objects.all(), request=self.request
+        )
+        if not filterset.is_valid():
+            raise ApiError(400, str(MSG_API_INVALID_FILTER),
+                           errors=filterset.errors.get_json_data())
+        return filterset
+
+    def with_fields(self, queryset: QuerySet, fields: Sequence[str]) -> QuerySet:
+        '''Loads only what the fields are serialized from.'''
+        columns: List[str] = ['id']
+        for name in fields:
+            columns += FIELD_COLUMNS.get(name, (name,))
+        queryset = queryset.select_related(
+            *(name for name in RELATIONS if name in fields)
+        ).only(*columns)
+        if 'labels' in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch('labels', queryset=Label.objects.only('id', 'name'))
+            )
+        return queryset
+
+    def serialize(self, task: Task, fields: Sequence[str]) -> Dict[str, Any]:
+        return {
+            name: SERIALIZERS[name](task) if name in SERIALIZERS else getattr(task, name)
+            for name in fields
+        }
+
+    def related_stamps(self, fields: Sequence[str]) -> List[Optional[datetime]]:
+        return [
+            model.objects.aggregate(stamp=Max('date_modified'))['stamp']
+            for model in stamped_models(fields)
+        ]
+
+    async def arelated_stamps(self, fields: Sequence[str]) -> List[Optional[datetime]]:
+        return [
+            (await model.objects.aaggregate(stamp=Max('date_modified')))['stamp']
+            for model in stamped_models(fields)
+        ]
+
+
+class TaskListApiView(ReplicaReadMixin, TaskApiView):
+    '''List the tasks matching the TasksFilter parameters, a page at a time.'''
+    page_size: int = API_PAGE_SIZE
+    keyset_ordering: Tuple[str, ...] = ('-date_modified', '-id')
+    search_keyset_ordering: Tuple[str, ...] = ('-search_rank', '-id')
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fields: List[str] = self.get_fields()
+        paginator: KeysetPaginator = self.get_paginator(self.get_filterset())
+        try:
+            page: KeysetPage = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError(400, str(MSG_INVALID_CURSOR))
+        rows: List[Task] = list(page)
+        return self.conditional_response(
+            *self.get_page_state(fields, page, rows, self.related_stamps(fields)),
+            lambda: self.respond(page, rows, fields),
+        )
+
+    def get_paginator(self, filterset: TasksFilter) -> KeysetPaginator:
+        ordering = self.search_keyset_ordering if filterset.is_search else self.keyset_ordering
+        # Only the validators are loaded until the page turns out to be stale.
+        return KeysetPaginator(filterset.qs.only('id', 'date_modified'), self.page_size, ordering)
+
+    def get_page_state(self, fields: List[str], page: KeysetPage, rows: List[Task],
+                       stamps: List[Optional[datetime]]) -> PageState:
+        state: List[Any] = [
+            fields, [[task.id, task.date_modified] for task in rows], stamps,
+            page.has_next(), page.has_previous(),
+        ]
+        return state, [task.date_modified for task in rows] + stamps
+
+    def respond(self, page: KeysetPage, rows: List[Task], fields: List[str]) -> JsonResponse:
+        tasks: Dict[int, Task] = self.with_fields(Task.objects.all(), fields) \
+            .in_bulk([task.id for task in rows])
+        return self.page_response(page, rows, tasks, fields)
+
+    def page_response(self, page: KeysetPage, rows: List[Task], tasks: Dict[int, Task],
+                      fields: List[str]) -> JsonResponse:
+        return JsonResponse({
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+            'results': [
+                self.serialize(tasks[task.id], fields) for task in rows if task.id in tasks
+            ],
+        })
+
+    def page_url(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri('?' + query.urlencode())
+
+
+class AsyncTaskListApiView(AsyncViewMixin, TaskListApiView):
+    '''TaskListApiView reading with the async ORM, for the ASGI application.'''
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        fields: List[str] = self.get_fields()
+        filterset: TasksFilter = await sync_to_async(self.get_filterset)()
+        paginator: KeysetPaginator = self.get_paginator(filterset)
+        try:
+            page: KeysetPage = await paginator.apage(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError(400, str(MSG_INVALID_CURSOR))
+        rows: List[Task] = list(page)
+        return await self.aconditional_response(
+            *self.get_page_state(fields, page, rows, await self.arelated_stamps(fields)),
+            lambda: self.arespond(page, rows, fields),
+        )
+
+    async def arespond(self, page: KeysetPage, rows: List[Task],
+                       fields: List[str]) -> JsonResponse:
+        tasks: Dict[int, Task] = await self.with_fields(Task.objects.all(), fields) \
+            .ain_bulk([task.id for task in rows])
+        return self.page_response(page, rows, tasks, fields)
+
+
+class TaskExportApiView(TaskApiView):
+    '''Stream every task matching the TasksFilter parameters as CSV or NDJSON.
+
+    The rows are read from a server-side cursor (on PostgreSQL) a chunk at
+    a time and written out as they come, so memory use does not grow with
+    the number of rows and the first chunk is sent before the last row is
+    read; the CSV header even before the query runs.'''
+    chunk_size: int = EXPORT_CHUNK_SIZE
+    ordering: Tuple[str, ...] = ('-date_modified', '-id')
+    search_ordering: Tuple[str, ...] = ('-search_rank', '-id')
+
+    def get(self, request: HttpRequest) -> StreamingHttpResponse:
+        export_format: str = request.GET.get(FORMAT_KWARG, EXPORT_CSV)
+        if export_format not in EXPORT_FORMATS:
+            raise ApiError(400, str(MSG_API_UNKNOWN_FORMAT) % {'format': export_format})
+        fields: List[str] = self.get_fields()
+        filterset: TasksFilter = self.get_filterset()
+        queryset: QuerySet = self.with_fields(filterset.qs, fields).order_by(
+            *(self.search_ordering if filterset.is_search else self.ordering)
+        )
+        rows: Iterator[str] = getattr(self, 'stream_' + export_format)(queryset, fields)
+        response = StreamingHttpResponse(rows, content_type=EXPORT_FORMATS[export_format])
+        response.headers['Content-Disposition'] = \
+            'attachment; filename="tasks.{}"'.format(export_format)
+        return response
+
+    def chunks(self, queryset: QuerySet) -> Iterator[List[Task]]:
+        chunk: List[Task] = []
+        for task in queryset.iterator(chunk_size=self.chunk_size):
+            chunk.append(task)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def stream_csv(self, queryset: QuerySet, fields: List[str]) -> Iterator[str]:
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> str:
+            value: str = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        writer.writerow(fields)
+        yield flush()
+        for chunk in self.chunks(queryset):
+            writer.writerows(
+                [CSV_FORMATTERS.get(name, str)(value) for name, value in
+                 self.serialize(task, fields).items()]
+                for task in chunk
+            )
+            yield flush()
+
+    def stream_ndjson(self, queryset: QuerySet, fields: List[str]) -> Iterator[str]:
+        for chunk in self.chunks(queryset):
+            yield ''.join(
+                json.dumps(self.serialize(task, fields), cls=DjangoJSONEncoder) + '\n'
+                for task in chunk
+            )
+
+
+class TaskDetailApiView(ReplicaReadMixin, TaskApiView):
+    '''Show a task.'''
+
+    def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        fields: List[str] = self.get_fields()
+        modified: Optional[datetime] = Task.objects.filter(pk=pk) \
+            .values_list('date_modified', flat=True).first()
+        if modified is None:
+            raise ApiError(404, str(MSG_API_NOT_FOUND))
+        stamps: List[Optional[datetime]] = self.related_stamps(fields)
+        return self.conditional_response(
+            [fields, pk, modified, stamps], [modified] + stamps,
+            lambda: self.respond(pk, fields),
+        )
+
+    def respond(self, pk: int, fields: List[str]) -> JsonResponse:
+        task: Optional[Task] = self.with_fields(Task.objects.filter(pk=pk), fields).first()
+        if task is None:
+            raise ApiError(404, str(MSG_API_NOT_FOUND))
+        return JsonResponse(self.serialize(task, fields))
+
+
+class AsyncTaskDetailApiView(AsyncViewMixin, TaskDetailApiView):
+    '''TaskDetailApiView reading with the async ORM, for the ASGI application.'''
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        fields: List[str] = self.get_fields()
+        modified: Optional[datetime] = await Task.objects.filter(pk=pk) \
+            .values_list('date_modified', flat=True).afirst()
+        if modified is None:
+            raise ApiError(404, str(MSG_API_NOT_FOUND))
+        stamps: List[Optional[datetime]] = await self.arelated_stamps(fields)
+        return await self.aconditional_response(
+            [fields, pk, modified, stamps], [modified] + stamps,
+            lambda: self.arespond(pk, fields),
+        )
+
+    async def arespond(self, pk: int, fields: List[str]) -> JsonResponse:
+        task: Optional[Task] = await self.with_fields(Task.objects.filter(pk=pk), fields).afirst()
+        if task is None:
+            raise ApiError(404, str(MSG_API_NOT_FOUND))
+        return JsonResponse(self.serialize(task, fields))
@@ -0,0 +1,20 @@
+from django.urls import path, URLPattern
+from typing import List
+
+from .api import TaskListApiView, TaskDetailApiView, TaskExportApiView, \
+    AsyncTaskListApiView, AsyncTaskDetailApiView
+from .constants import API_TASKS, API_TASK, API_EXPORT
+
+
+urlpatterns: List[URLPattern] = [
+    path('', TaskListApiView.as_view(), name=API_TASKS),
+    path('export/', TaskExportApiView.as_view(), name=API_EXPORT),
+    path('<int:pk>/', TaskDetailApiView.as_view(), name=API_TASK),
+]
+
+# The ASGI application reads the list and the detail with the async ORM.
+asgi_urlpatterns: List[URLPattern] = [
+    path('', AsyncTaskListApiView.as_view(), name=API_TASKS),
+    path('<int:pk>/', AsyncTaskDetailApiView.as_view(), name=API_TASK),
+    *urlpatterns,
+]
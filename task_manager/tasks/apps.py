@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+from typing import Any
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.tasks'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
+        post_migrate.connect(restore_search_index, sender=self)
+
+
+def restore_search_index(using: str, **kwargs: Any) -> None:
+    '''SQLite drops the search triggers whenever a migration rebuilds the task
+    table, so they are put back after every migrate.'''
+    from . import search
+
+    connection = connections[using]
+    if search.is_installed(connection):
+        search.install(connection)
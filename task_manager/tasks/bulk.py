@@ -0,0 +1,128 @@
+"""Changes applied to many tasks at once.
+
+Each operation locks the selected tasks, writes the change with one UPDATE,
+INSERT or DELETE (a DELETE per batch of tasks where the database limits
+the query parameters) and bumps ``date_modified`` of the tasks it actually
+changed, all in one transaction. The counters are applied and the task
+cache invalidated in the same transaction since the model signals don't
+fire for these queries.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import counters
+from .models import Task, TaskLabel, TaskCounter, cache_namespace
+
+
+def lock_tasks(task_ids: Iterable[int]) -> List[Tuple[int, int, Optional[int]]]:
+    '''Locks the tasks till the end of the transaction and returns
+    their ids, status ids and executor ids.'''
+    return list(
+        Task.objects.select_for_update().filter(pk__in=task_ids).order_by('pk')
+        .values_list('id', 'status_id', 'executor_id')
+    )
+
+
+def set_status(task_ids: Iterable[int], status_id: int) -> int:
+    '''Moves the tasks to the status. Returns the number of tasks changed.'''
+    with transaction.atomic():
+        changed: List[Tuple[int, int, Optional[int]]] = [
+            row for row in lock_tasks(task_ids) if row[1] != status_id
+        ]
+        if not changed:
+            return 0
+        Task.objects.filter(pk__in=[row[0] for row in changed]) \
+            .update(status_id=status_id, date_modified=timezone.now())
+        deltas: Dict[counters.Key, int] = Counter(
+            {(TaskCounter.STATUS, status_id): len(changed)}
+        )
+        deltas.subtract((TaskCounter.STATUS, row[1]) for row in changed)
+        counters.apply(deltas)
+        cache_namespace.invalidate()
+    return len(changed)
+
+
+def set_executor(task_ids: Iterable[int], executor_id: Optional[int]) -> int:
+    '''Assigns the tasks to the executor, or to nobody if it is None.
+    Returns the number of tasks changed.'''
+    with transaction.atomic():
+        changed: List[Tuple[int, int, Optional[int]]] = [
+            row for row in lock_tasks(task_ids) if row[2] != executor_id
+        ]
+        if not changed:
+            return 0
+        Task.objects.filter(pk__in=[row[0] for row in changed]) \
+            .update(executor_id=executor_id, date_modified=timezone.now())
+        deltas: Dict[counters.Key, int] = Counter()
+        if executor_id is not None:
+            deltas[TaskCounter.EXECUTOR, executor_id] = len(changed)
+        deltas.subtract((TaskCounter.EXECUTOR, row[2]) for row in changed if row[2] is not None)
+        counters.apply(deltas)
+        cache_namespace.invalidate()
+    return len(changed)
+
+
+def add_labels(task_ids: Iterable[int], label_ids: Iterable[int]) -> int:
+    '''Adds the labels to the tasks. Returns the number of tasks changed.'''
+    label_ids = set(label_ids)
+    with transaction.atomic():
+        locked: List[int] = [row[0] for row in lock_tasks(task_ids)]
+        existing: Set[Tuple[int, int]] = set(
+            TaskLabel.objects.filter(task__in=locked, label__in=label_ids)
+            .values_list('task_id', 'label_id')
+        )
+        missing: List[TaskLabel] = [
+            TaskLabel(task_id=task_id, label_id=label_id)
+            for task_id in locked for label_id in label_ids
+            if (task_id, label_id) not in existing
+        ]
+        if not missing:
+            return 0
+        TaskLabel.objects.bulk_create(missing)
+        changed: Set[int] = {link.task_id for link in missing}
+        Task.objects.filter(pk__in=changed).update(date_modified=timezone.now())
+        counters.apply(Counter(counters.label_keys(link.label_id for link in missing)))
+        cache_namespace.invalidate()
+    return len(changed)
+
+
+def remove_labels(task_ids: Iterable[int], label_ids: Iterable[int]) -> int:
+    '''Removes the labels from the tasks. Returns the number of tasks changed.'''
+    label_ids = set(label_ids)
+    with transaction.atomic():
+        locked: List[int] = [row[0] for row in lock_tasks(task_ids)]
+        links = TaskLabel.objects.filter(task__in=locked, label__in=label_ids)
+        changed: List[int] = list(links.values_list('task_id', flat=True).distinct())
+        if not changed:
+            return 0
+        removed: Dict[counters.Key, int] = {
+            (TaskCounter.LABEL, label_id): -count
+            for label_id, count in links.order_by().values_list('label_id')
+            .annotate(count=Count('*'))
+        }
+        # Plain DELETEs, bypassing the signals: QuerySet.delete() would fetch
+        # the links and send post_delete for each of them to the counter
+        # receiver. The counters are applied below, for all of them at once.
+        delete_links(changed, label_ids)
+        Task.objects.filter(pk__in=changed).update(date_modified=timezone.now())
+        counters.apply(removed)
+        cache_namespace.invalidate()
+    return len(changed)
+
+
+def delete_links(task_ids: Iterable[int], label_ids: Iterable[int]) -> None:
+    '''Deletes the links between the tasks and the labels, a DELETE per batch
+    of tasks small enough for the query parameter limit of the database.'''
+    task_ids, label_ids = list(task_ids), list(label_ids)
+    using: str = router.db_for_write(TaskLabel)
+    limit: Optional[int] = connections[using].features.max_query_params
+    size: int = max(1, len(task_ids) if limit is None else limit - len(label_ids))
+    for start in range(0, len(task_ids), size):
+        TaskLabel.objects.filter(
+            task_id__in=task_ids[start:start + size], label_id__in=label_ids
+        )._raw_delete(using)
@@ -2,10 +2,11 @@
 
 from django.utils.translation import gettext_lazy
 from django.urls import reverse_lazy
-from typing import Dict, Final
+from typing import Dict, Final, List, Tuple
 
 from task_manager.constants import \
-    REVERSE_LOGIN, MSG_NO_PERMISSION, MSG_NOT_AUTHOR_FOR_DELETE_TASK  # noqa: F401
+    REVERSE_LOGIN, MSG_NO_PERMISSION, MSG_NOT_AUTHOR_FOR_DELETE_TASK, \
+    MSG_INVALID_CURSOR  # noqa: F401
 
 
 # Route names
@@ -14,11 +15,16 @@ CREATE_TASK: Final[str] = 'task_create'
 UPDATE_TASK: Final[str] = 'task_update'
 DELETE_TASK: Final[str] = 'task_delete'
 DETAIL_TASK: Final[str] = 'task_detail'
+BULK_TASKS: Final[str] = 'tasks_bulk'
+API_TASKS: Final[str] = 'api_tasks'
+API_TASK: Final[str] = 'api_task'
+API_EXPORT: Final[str] = 'api_tasks_export'
 
 
 # Reverses
 REVERSE_TASKS: Final = reverse_lazy(LIST_TASKS)
 REVERSE_CREATE: Final = reverse_lazy(CREATE_TASK)
+REVERSE_BULK: Final = reverse_lazy(BULK_TASKS)
 
 
 # Templates
@@ -30,6 +36,13 @@ TEMPLATE_DELETE: Final[str] = 'tasks/task_confirm_delete.html'
 TEMPLATE_DETAIL: Final[str] = 'tasks/task_detail.html'
 
 
+# Rendered task rows are cached under everything they show, so a change
+# of a task or of its status or users makes a new entry.
+ROW_CACHE_TIMEOUT: Final[int] = 60 * 60 * 24
+# Whatever sums up all the tasks is cached in their namespace.
+CACHE_NAMESPACE: Final[str] = 'tasks'
+
+
 # Context Fields
 PAGE_TITLE: Final[str] = 'page_title'
 PAGE_DESCRIPTION: Final[str] = 'page_description'
@@ -64,6 +77,12 @@ DELETE_H1: str = gettext_lazy('Delete task')
 MSG_CREATED: str = gettext_lazy('Task created successfully')
 MSG_UPDATED: str = gettext_lazy('Task changed successfully')
 MSG_DELETED: str = gettext_lazy('Task deleted successfully')
+MSG_BULK_UPDATED: str = gettext_lazy('Tasks changed: %(count)s')
+MSG_BULK_FAILED: str = gettext_lazy('Tasks were not changed: %(errors)s')
+MSG_API_UNKNOWN_FIELDS: str = gettext_lazy('Unknown fields: %(fields)s.')
+MSG_API_INVALID_FILTER: str = gettext_lazy('Invalid filter parameters.')
+MSG_API_NOT_FOUND: str = gettext_lazy('Task not found.')
+MSG_API_UNKNOWN_FORMAT: str = gettext_lazy('Unknown export format: %(format)s.')
 
 
 # Forms
@@ -73,6 +92,40 @@ STATUS: Final[str] = 'status'
 DESCRIPTION: Final[str] = 'description'
 EXECUTOR: Final[str] = 'executor'
 LABELS: Final[str] = 'labels'
+TASKS: Final[str] = 'tasks'
+ACTION: Final[str] = 'action'
+NEXT: Final[str] = 'next'
+
+# Bulk actions
+SET_STATUS: Final[str] = 'set_status'
+SET_EXECUTOR: Final[str] = 'set_executor'
+ADD_LABELS: Final[str] = 'add_labels'
+REMOVE_LABELS: Final[str] = 'remove_labels'
+BULK_ACTIONS: Final[List[Tuple[str, str]]] = [
+    (SET_STATUS, gettext_lazy('Change status')),
+    (SET_EXECUTOR, gettext_lazy('Change executor')),
+    (ADD_LABELS, gettext_lazy('Add labels')),
+    (REMOVE_LABELS, gettext_lazy('Remove labels')),
+]
+BULK_MAX_TASKS: Final[int] = 1000
+
+
+# API
+API_PAGE_SIZE: Final[int] = 50
+FIELDS_KWARG: Final[str] = 'fields'
+API_FIELDS: Final[Tuple[str, ...]] = (
+    'id', 'name', 'description', 'status', 'author', 'executor', 'labels',
+    'date_created', 'date_modified',
+)
+FORMAT_KWARG: Final[str] = 'format'
+EXPORT_CSV: Final[str] = 'csv'
+EXPORT_NDJSON: Final[str] = 'ndjson'
+# Formats with their content types.
+EXPORT_FORMATS: Final[Dict[str, str]] = {
+    EXPORT_CSV: 'text/csv; charset=utf-8',
+    EXPORT_NDJSON: 'application/x-ndjson',
+}
+EXPORT_CHUNK_SIZE: Final[int] = 2000
 
 
 # Buttons
@@ -80,6 +133,9 @@ CREATION_BUTTON: str = gettext_lazy('Create')
 UPDATE_BUTTON: str = gettext_lazy('Update')
 DELETE_BUTTON: str = gettext_lazy('Yes, delete')
 FILTER_BUTTON: str = gettext_lazy('Search')
+BULK_BUTTON: str = gettext_lazy('Apply to selected')
+EXPORT_CSV_BUTTON: str = gettext_lazy('Export CSV')
+EXPORT_NDJSON_BUTTON: str = gettext_lazy('Export NDJSON')
 
 
 # Contexts
@@ -0,0 +1,69 @@
+"""Maintenance of the denormalized task counters (see TaskCounter)."""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Task, TaskLabel, TaskCounter
+
+
+Key = Tuple[str, int]
+
+
+def apply(deltas: Dict[Key, int]) -> None:
+    '''Adds the deltas to the counters, creating the missing ones.
+    Must run in the transaction of the change being counted.'''
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    TaskCounter.objects.bulk_create(
+        (TaskCounter(kind=kind, object_id=object_id) for kind, object_id in deltas),
+        ignore_conflicts=True,
+    )
+    # One UPDATE per kind and delta: a task change touches at most a few.
+    now: datetime = timezone.now()
+    grouped: Dict[Tuple[str, int], List[int]] = {}
+    for (kind, object_id), delta in deltas.items():
+        grouped.setdefault((kind, delta), []).append(object_id)
+    for (kind, delta), object_ids in grouped.items():
+        TaskCounter.objects.filter(kind=kind, object_id__in=object_ids) \
+            .update(count=F('count') + delta, date_modified=now)
+
+
+def label_keys(label_ids: Iterable[int]) -> List[Key]:
+    return [(TaskCounter.LABEL, label_id) for label_id in label_ids]
+
+
+def compute() -> Dict[Key, int]:
+    '''Counts the tasks from scratch.'''
+    counts: Dict[Key, int] = Counter()
+    for kind, rows in (
+        (TaskCounter.STATUS, Task.objects.values_list('status')),
+        (TaskCounter.EXECUTOR, Task.objects.exclude(executor=None).values_list('executor')),
+        (TaskCounter.LABEL, TaskLabel.objects.values_list('label')),
+    ):
+        for object_id, count in rows.order_by().annotate(total=Count('*')):
+            counts[kind, object_id] = count
+    return counts
+
+
+def stored() -> Dict[Key, int]:
+    return {
+        (kind, object_id): count
+        for kind, object_id, count in TaskCounter.objects.filter(count__gt=0)
+        .values_list('kind', 'object_id', 'count')
+    }
+
+
+def rebuild() -> None:
+    '''Replaces every counter with a fresh count.'''
+    with transaction.atomic():
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create(
+            TaskCounter(kind=kind, object_id=object_id, count=count)
+            for (kind, object_id), count in compute().items()
+        )
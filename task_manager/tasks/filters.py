@@ -1,18 +1,28 @@
 """Filters for task list view."""
 
 from django import forms
+from django.db import models
+from django.db.models import QuerySet
 from django.utils.translation import gettext_lazy
 
-from django_filters import FilterSet, BooleanFilter, ChoiceFilter
+from django_filters import FilterSet, BooleanFilter, ChoiceFilter, CharFilter, ModelChoiceFilter
 
+from task_manager.identity import IdentityModelChoiceField
 from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
 from task_manager.tasks.models import Task
 
 
+class IdentityModelChoiceFilter(ModelChoiceFilter):
+    """Reads its choices once per request."""
+    field_class = IdentityModelChoiceField
+
+
 class TasksFilter(FilterSet):
     """Define filers for tasks list."""
-    labels_query = Label.objects.values_list('id', 'name')
-    labels = ChoiceFilter(label=gettext_lazy('Label'), choices=labels_query)
+    q = CharFilter(label=gettext_lazy('Text search'), method='search')
+    status = ChoiceFilter(label=gettext_lazy('Status'), choices=Status.objects.choices)
+    labels = ChoiceFilter(label=gettext_lazy('Label'), choices=Label.objects.choices)
     self_tasks = BooleanFilter(
         label=gettext_lazy('Current user tasks'),
         widget=forms.CheckboxInput(),
@@ -22,9 +32,26 @@ class TasksFilter(FilterSet):
     class Meta:
         model = Task
         fields = ['status', 'executor']
+        filter_overrides = {
+            models.ForeignKey: {
+                'filter_class': IdentityModelChoiceFilter,
+                'extra': lambda field: {
+                    'queryset': field.remote_field.model._default_manager.all(),
+                },
+            },
+        }
 
     def get_self_tasks(self, queryset, name, value):
         """Filter current user tasks."""
         if value:
             queryset = queryset.filter(author=self.request.user)
         return queryset
+
+    def search(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """Full-text search over task names and descriptions."""
+        return queryset.search(value)
+
+    @property
+    def is_search(self) -> bool:
+        """Whether the tasks are filtered by a text search."""
+        return self.is_bound and self.is_valid() and bool(self.form.cleaned_data.get('q'))
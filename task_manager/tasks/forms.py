@@ -0,0 +1,64 @@
+from django import forms
+from django.db.models import BLANK_CHOICE_DASH
+from django.utils.translation import gettext_lazy
+from typing import Any, Dict
+
+from task_manager.identity import IdentityModelChoiceField, IdentityModelMultipleChoiceField
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+from .models import Task
+from .constants import BULK_ACTIONS, BULK_MAX_TASKS, \
+    SET_STATUS, ADD_LABELS, REMOVE_LABELS, NAME, STATUS, DESCRIPTION, EXECUTOR, LABELS
+
+
+class TaskForm(forms.ModelForm):
+    '''Creates and changes a task; the related rows are read once per request.'''
+
+    class Meta:
+        model = Task
+        fields = (NAME, STATUS, DESCRIPTION, EXECUTOR, LABELS)
+        field_classes = {
+            STATUS: IdentityModelChoiceField,
+            EXECUTOR: IdentityModelChoiceField,
+            LABELS: IdentityModelMultipleChoiceField,
+        }
+
+
+class TaskBulkForm(forms.Form):
+    '''An action applied to the tasks selected in the list.'''
+    tasks = forms.ModelMultipleChoiceField(
+        queryset=Task.objects.only('id'), widget=forms.MultipleHiddenInput
+    )
+    action = forms.ChoiceField(label=gettext_lazy('Action'), choices=BULK_ACTIONS)
+    status = forms.TypedChoiceField(
+        choices=lambda: BLANK_CHOICE_DASH + Status.objects.choices(), coerce=int,
+        required=False, label=gettext_lazy('Status')
+    )
+    executor = IdentityModelChoiceField(
+        queryset=User.objects.all(), required=False, label=gettext_lazy('Executor'),
+        empty_label=gettext_lazy('Nobody')
+    )
+    labels = forms.TypedMultipleChoiceField(
+        choices=Label.objects.choices, coerce=int, required=False,
+        label=gettext_lazy('Labels')
+    )
+    next = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_tasks(self) -> Any:
+        tasks = self.cleaned_data['tasks']
+        if len(tasks) > BULK_MAX_TASKS:
+            raise forms.ValidationError(
+                gettext_lazy('Select at most %(max)s tasks.'), params={'max': BULK_MAX_TASKS}
+            )
+        return tasks
+
+    def clean(self) -> Dict[str, Any]:
+        '''The chosen action needs its value; an empty executor unassigns.'''
+        cleaned_data: Dict[str, Any] = super().clean()
+        action: str = cleaned_data.get('action')
+        if action == SET_STATUS and not cleaned_data.get(STATUS):
+            self.add_error(STATUS, gettext_lazy('Choose a status.'))
+        if action in (ADD_LABELS, REMOVE_LABELS) and not cleaned_data.get(LABELS):
+            self.add_error(LABELS, gettext_lazy('Choose at least one label.'))
+        return cleaned_data
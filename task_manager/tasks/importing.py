@@ -0,0 +1,199 @@
+"""Bulk import of tasks from CSV or JSON Lines.
+
+Rows are read one at a time and written in batches: one INSERT for the
+tasks of a batch, one for their labels and a few counter updates, in one
+transaction per batch. Statuses, users and labels are resolved by name
+from maps loaded once; with ``create_missing`` the statuses and labels
+missing are created in the transaction of the batch using them, once
+all its rows are valid. A row that can't be imported is handed to the
+reject callback and the import goes on.
+
+The columns are those of the CSV export: name, description, status (name),
+author and executor (username or full name), labels (names separated by
+commas, or a list in JSON Lines). Other columns are ignored.
+"""
+
+import csv
+import json
+from collections import Counter
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+from . import counters
+from .models import Task, TaskLabel, TaskCounter, cache_namespace
+
+
+CSV: str = 'csv'
+JSONL: str = 'jsonl'
+FORMATS: Tuple[str, ...] = (CSV, JSONL)
+
+Row = Dict[str, Any]
+Reject = Callable[[int, Any, str], None]
+# A valid row: its task, without the status, the status name and the label names.
+Parsed = Tuple[Task, str, List[str]]
+
+
+class RowError(ValueError):
+    '''The row can't be imported; the message says why.'''
+
+
+def read_rows(file: IO[str], file_format: str, reject: Reject) -> Iterator[Tuple[int, Row]]:
+    '''Yields the line number and the fields of every row of the file.'''
+    if file_format == CSV:
+        reader = csv.DictReader(file)
+        return ((reader.line_num, row) for row in reader)
+    return read_json_lines(file, reject)
+
+
+def read_json_lines(file: IO[str], reject: Reject) -> Iterator[Tuple[int, Row]]:
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            reject(number, line.rstrip('\n'), 'Invalid JSON: {}'.format(error))
+            continue
+        if not isinstance(row, dict):
+            reject(number, row, 'A row must be a JSON object.')
+            continue
+        yield number, row
+
+
+def user_lookup() -> Dict[str, Optional[int]]:
+    '''Maps usernames and full names to user ids;
+    a full name shared by several users maps to None.'''
+    lookup: Dict[str, Optional[int]] = {}
+    full_names: Counter = Counter()
+    rows = list(User.objects.values_list('id', 'username', 'first_name', 'last_name'))
+    for _, _, first_name, last_name in rows:
+        full_names['{} {}'.format(first_name, last_name).strip()] += 1
+    for user_id, _, first_name, last_name in rows:
+        full_name: str = '{} {}'.format(first_name, last_name).strip()
+        lookup[full_name] = user_id if full_names[full_name] == 1 else None
+    lookup.update((username, user_id) for user_id, username, _, _ in rows)
+    return lookup
+
+
+class TaskImporter:
+    '''Imports rows of task fields in batches.'''
+
+    def __init__(self, batch_size: int, reject: Reject,
+                 create_missing: bool = False) -> None:
+        self.batch_size = batch_size
+        self.reject = reject
+        self.create_missing = create_missing
+        self.statuses: Dict[str, int] = dict(Status.objects.values_list('name', 'id'))
+        self.labels: Dict[str, int] = dict(Label.objects.values_list('name', 'id'))
+        self.users: Dict[str, Optional[int]] = user_lookup()
+        self.name_length: int = Task._meta.get_field('name').max_length
+        self.description_length: int = Task._meta.get_field('description').max_length
+
+    def run(self, rows: Iterable[Tuple[int, Row]]) -> Iterator[int]:
+        '''Imports the rows, yielding the number of tasks created by each batch.'''
+        batch: List[Parsed] = []
+        for number, row in rows:
+            try:
+                batch.append(self.parse(row))
+            except RowError as error:
+                self.reject(number, row, str(error))
+                continue
+            if len(batch) == self.batch_size:
+                yield self.write(batch)
+                batch = []
+        if batch:
+            yield self.write(batch)
+
+    def parse(self, row: Row) -> Parsed:
+        '''Checks the whole row and builds its task; nothing is written.'''
+        name: str = self.text(row, 'name', self.name_length)
+        description: str = self.text(row, 'description', self.description_length)
+        status: str = self.text(row, 'status')
+        self.check_name(Status, self.statuses, status)
+        task = Task(
+            name=name, description=description,
+            author_id=self.user_id(self.text(row, 'author'), 'author'),
+            executor_id=self.user_id(self.text(row, 'executor', required=False), 'executor'),
+        )
+        labels: List[str] = self.label_names(row.get('labels'))
+        for label in labels:
+            self.check_name(Label, self.labels, label)
+        return task, status, labels
+
+    def text(self, row: Row, field: str, max_length: Optional[int] = None,
+             required: bool = True) -> str:
+        value: Any = row.get(field)
+        value = '' if value is None else str(value).strip()
+        if required and not value:
+            raise RowError('{} is required.'.format(field))
+        if max_length is not None and len(value) > max_length:
+            raise RowError('{} is longer than {} characters.'.format(field, max_length))
+        return value
+
+    def user_id(self, name: str, field: str) -> Optional[int]:
+        if not name:
+            return None
+        if name not in self.users:
+            raise RowError('Unknown {}: {}.'.format(field, name))
+        if self.users[name] is None:
+            raise RowError('Several users are named {}; use the username.'.format(name))
+        return self.users[name]
+
+    def label_names(self, value: Any) -> List[str]:
+        if not value:
+            return []
+        names = value.split(',') if isinstance(value, str) else value
+        if not isinstance(names, list):
+            raise RowError('labels must be a list or a comma separated string.')
+        return list(dict.fromkeys(str(name).strip() for name in names if str(name).strip()))
+
+    def check_name(self, model: Any, known: Dict[str, int], name: str) -> None:
+        '''Checks that the status or label exists, or may be created.'''
+        if name in known:
+            return
+        if not self.create_missing:
+            raise RowError('Unknown {}: {}.'.format(model._meta.model_name, name))
+        max_length: int = model._meta.get_field('name').max_length
+        if len(name) > max_length:
+            raise RowError('{} name {} is longer than {} characters.'.format(
+                model._meta.model_name, name, max_length
+            ))
+
+    def resolve(self, model: Any, known: Dict[str, int], names: Iterable[str]) -> Dict[str, int]:
+        '''Maps the names to ids, creating the missing rows.'''
+        return {
+            name: known[name] if name in known else model.objects.create(name=name).id
+            for name in dict.fromkeys(names)
+        }
+
+    def write(self, batch: List[Parsed]) -> int:
+        '''Inserts a batch of tasks with their labels and counts them.'''
+        deltas: Dict[counters.Key, int] = Counter()
+        with transaction.atomic():
+            statuses: Dict[str, int] = self.resolve(
+                Status, self.statuses, (status for _, status, _ in batch)
+            )
+            labels: Dict[str, int] = self.resolve(
+                Label, self.labels, (label for _, _, names in batch for label in names)
+            )
+            for task, status, _ in batch:
+                task.status_id = statuses[status]
+            tasks: List[Task] = Task.objects.bulk_create(task for task, _, _ in batch)
+            links: List[TaskLabel] = [
+                TaskLabel(task_id=task.id, label_id=labels[label])
+                for task, (_, _, names) in zip(tasks, batch) for label in names
+            ]
+            TaskLabel.objects.bulk_create(links)
+            for task in tasks:
+                deltas.update(TaskCounter.keys(task.status_id, task.executor_id))
+            deltas.update(counters.label_keys(link.label_id for link in links))
+            counters.apply(deltas)
+            cache_namespace.invalidate()
+        # Known only once committed.
+        self.statuses.update(statuses)
+        self.labels.update(labels)
+        return len(tasks)
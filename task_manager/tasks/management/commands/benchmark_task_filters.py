@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.db.models import Count
+from django.http import QueryDict
+from django.test import RequestFactory
+from statistics import median
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from task_manager.pagination import KeysetPaginator
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Task, TaskLabel
+from task_manager.tasks.views import TasksListView
+
+
+class Command(BaseCommand):
+    help = 'Times the first page of the task list for every TasksFilter combination, ' \
+        'with and without the composite task filter indexes. ' \
+        'The indexes are dropped inside a transaction that is rolled back; ' \
+        'do not run it against a live database.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per filter combination; the median is reported.')
+        parser.add_argument('--with-indexes-only', action='store_true',
+                            help='Skip the run without the indexes.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        total: int = Task.objects.count()
+        if not total:
+            self.stderr.write('There are no tasks to benchmark.')
+            return
+        combinations: List[Tuple[str, Dict[str, Any]]] = self.get_combinations()
+        self.stdout.write('{} tasks, median of {} runs, ms'.format(total, options['repeat']))
+
+        after: Dict[str, float] = self.run(combinations, options['repeat'])
+        before: Dict[str, Optional[float]] = dict.fromkeys(after)
+        if not options['with_indexes_only']:
+            with transaction.atomic():
+                self.drop_indexes()
+                before = self.run(combinations, options['repeat'])
+                transaction.set_rollback(True)
+
+        self.stdout.write('{:<36}{:>12}{:>12}'.format('filter', 'before', 'after'))
+        for name, _ in combinations:
+            self.stdout.write('{:<36}{:>12}{:>12.2f}'.format(
+                name, '-' if before[name] is None else '{:.2f}'.format(before[name]), after[name]
+            ))
+
+    def get_combinations(self) -> List[Tuple[str, Dict[str, Any]]]:
+        '''Filters by the most used status, executor, author and label.'''
+        def most_used(model, field: str) -> Any:
+            row = model.objects.exclude(**{field: None}).values(field) \
+                .annotate(used=Count('pk')).order_by('-used').first()
+            return row and row[field]
+
+        status, executor = most_used(Task, 'status'), most_used(Task, 'executor')
+        author, label = most_used(Task, 'author'), most_used(TaskLabel, 'label')
+        return [
+            ('no filter', {}),
+            ('status', {'status': status}),
+            ('executor', {'executor': executor}),
+            ('self_tasks', {'self_tasks': 'on', '_user': author}),
+            ('labels', {'labels': label}),
+            ('status + executor', {'status': status, 'executor': executor}),
+            ('status + labels', {'status': status, 'labels': label}),
+            ('executor + self_tasks', {'executor': executor, 'self_tasks': 'on', '_user': author}),
+            ('status + executor + labels + self', {
+                'status': status, 'executor': executor, 'labels': label,
+                'self_tasks': 'on', '_user': author,
+            }),
+        ]
+
+    def run(self, combinations: List[Tuple[str, Dict[str, Any]]],
+            repeat: int) -> Dict[str, float]:
+        return {
+            name: median(self.time_first_page(dict(params)) for _ in range(repeat))
+            for name, params in combinations
+        }
+
+    def time_first_page(self, params: Dict[str, Any]) -> float:
+        request = RequestFactory().get('/tasks/')
+        request.user = Task.author.field.related_model(pk=params.pop('_user', None))
+        data = QueryDict(mutable=True)
+        data.update({key: str(value) for key, value in params.items()})
+
+        started: float = perf_counter()
+        filterset = TasksFilter(data, queryset=Task.objects.for_list(), request=request)
+        paginator = KeysetPaginator(
+            filterset.qs, TasksListView.paginate_by, TasksListView.keyset_ordering
+        )
+        list(paginator.page())
+        return (perf_counter() - started) * 1000
+
+    def drop_indexes(self) -> None:
+        '''Drops the filter indexes; the implicit foreign key indexes stay.'''
+        with connection.cursor() as cursor:
+            for model in (Task, TaskLabel):
+                for index in model._meta.indexes:
+                    cursor.execute('DROP INDEX {}'.format(connection.ops.quote_name(index.name)))
@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from time import perf_counter
+from typing import Any, IO, Optional
+
+from task_manager.tasks.importing import FORMATS, CSV, JSONL, TaskImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Imports tasks from a CSV or JSON Lines file in batches. ' \
+        'Rows that can not be imported are written to the reject file.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help='The file to import, - for the standard input.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='The file format; guessed from the extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Tasks written per transaction.')
+        parser.add_argument('--rejects', default='rejects.jsonl',
+                            help='Where rejected rows are written as JSON Lines.')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Create the statuses and labels that do not exist.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('The database does not return ids from bulk inserts.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        path: str = options['path']
+        file_format: Optional[str] = options['format'] or \
+            {'.csv': CSV, '.jsonl': JSONL, '.ndjson': JSONL}.get(os.path.splitext(path)[1])
+        if file_format is None:
+            raise CommandError('Can not guess the format of {}; use --format.'.format(path))
+
+        self.rejected: int = 0
+        with open(options['rejects'], 'w', encoding='utf-8') as rejects:
+            self.rejects: IO[str] = rejects
+            if path == '-':
+                self.run(sys.stdin, file_format, options)
+            else:
+                with open(path, newline='', encoding='utf-8') as file:
+                    self.run(file, file_format, options)
+        if not self.rejected:
+            os.remove(options['rejects'])
+
+    def run(self, file: IO[str], file_format: str, options: Any) -> None:
+        importer = TaskImporter(options['batch_size'], self.reject, options['create_missing'])
+        started: float = perf_counter()
+        imported: int = 0
+        for created in importer.run(read_rows(file, file_format, self.reject)):
+            imported += created
+            self.stdout.write(self.summary(imported, started))
+        self.stdout.write(self.style.SUCCESS('Done: {}.'.format(self.summary(imported, started))))
+        if self.rejected:
+            self.stdout.write('Rejected rows are in {}.'.format(options['rejects']))
+
+    def reject(self, line: int, row: Any, error: str) -> None:
+        self.rejected += 1
+        self.rejects.write(json.dumps({'line': line, 'error': error, 'row': row},
+                                      ensure_ascii=False) + '\n')
+
+    def summary(self, imported: int, started: float) -> str:
+        elapsed: float = perf_counter() - started
+        return '{} tasks imported, {} rejected, {:.0f} rows/s'.format(
+            imported, self.rejected, (imported + self.rejected) / elapsed if elapsed else 0
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from typing import Any, Dict, List
+
+from task_manager.tasks import counters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the tasks per status, executor and label from scratch.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare the stored counters with a fresh count '
+                                 'and fail if they differ.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not options['verify']:
+            counters.rebuild()
+            self.stdout.write(self.style.SUCCESS('Task counters rebuilt.'))
+            return
+
+        expected: Dict[counters.Key, int] = counters.compute()
+        stored: Dict[counters.Key, int] = counters.stored()
+        mismatches: List[counters.Key] = sorted(
+            key for key in expected.keys() | stored.keys()
+            if expected.get(key, 0) != stored.get(key, 0)
+        )
+        for kind, object_id in mismatches:
+            self.stderr.write('{} {}: stored {}, counted {}'.format(
+                kind, object_id,
+                stored.get((kind, object_id), 0), expected.get((kind, object_id), 0)
+            ))
+        if mismatches:
+            raise CommandError('{} task counters are wrong.'.format(len(mismatches)))
+        self.stdout.write(self.style.SUCCESS('Task counters are correct.'))
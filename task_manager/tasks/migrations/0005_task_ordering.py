@@ -0,0 +1,23 @@
+# Generated by Django 4.1.3 on 2026-10-18 02:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_tasklabel_task_labels'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-date_modified', '-id'], 'verbose_name': 'task', 'verbose_name_plural': 'tasks'},
+        ),
+        migrations.AlterField(
+            model_name='tasklabel',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.task'),
+        ),
+    ]
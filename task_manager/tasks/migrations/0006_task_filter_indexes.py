@@ -0,0 +1,52 @@
+# Generated by Django 4.1.3 on 2026-10-18 02:57
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_task_labels(apps, schema_editor):
+    TaskLabel = apps.get_model('tasks', 'TaskLabel')
+    duplicates = TaskLabel.objects.values('task', 'label') \
+        .annotate(first_id=Min('id'), copies=Count('id')).filter(copies__gt=1)
+    for duplicate in list(duplicates):
+        TaskLabel.objects.filter(task=duplicate['task'], label=duplicate['label']) \
+            .exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_ordering'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-date_modified', '-id'], name='task_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', '-date_modified', '-id'], name='task_status_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', '-date_modified', '-id'], name='task_executor_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', '-date_modified', '-id'], name='task_author_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'status', '-date_modified', '-id'], name='task_executor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=models.Index(fields=['label', 'task'], name='task_label_label_task_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_task_labels, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasklabel',
+            constraint=models.UniqueConstraint(fields=('task', 'label'), name='task_label_unique'),
+        ),
+    ]
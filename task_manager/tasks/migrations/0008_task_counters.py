@@ -0,0 +1,43 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:08
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_tasks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskLabel = apps.get_model('tasks', 'TaskLabel')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    for kind, rows in (
+        ('status', Task.objects.values_list('status')),
+        ('executor', Task.objects.exclude(executor=None).values_list('executor')),
+        ('label', TaskLabel.objects.values_list('label')),
+    ):
+        TaskCounter.objects.bulk_create(
+            TaskCounter(kind=kind, object_id=object_id, count=count)
+            for object_id, count in rows.order_by().annotate(total=Count('*'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('status', 'status'), ('executor', 'executor'), ('label', 'label')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskcounter',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='task_counter_unique'),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
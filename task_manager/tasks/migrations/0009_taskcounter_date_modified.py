@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskcounter',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,9 +1,41 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.utils.translation import gettext_lazy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from task_manager import identity
+from task_manager.cache import Namespace
 from task_manager.users.models import User
 from task_manager.statuses.models import Status
 from task_manager.labels.models import Label
+from .constants import CACHE_NAMESPACE
+from .search import FTS_TABLE, FullTextField, search as full_text_search
+
+
+# Invalidated whenever a task is created, changed or deleted,
+# one by one (see signals) or many at once (see bulk and importing).
+cache_namespace: Namespace = Namespace(CACHE_NAMESPACE)
+
+
+class TaskQuerySet(models.QuerySet):
+    def for_list(self) -> 'TaskQuerySet':
+        '''Joins the relations rendered by the task list and loads only
+        the columns it shows, so the page costs the same number of queries
+        whatever the number of rows.'''
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related(
+            models.Prefetch('labels', queryset=Label.objects.only('id', 'name'))
+        ).only(
+            'id', 'name', 'date_modified',
+            'status', 'status__name',
+            'author', 'author__first_name', 'author__last_name',
+            'executor', 'executor__first_name', 'executor__last_name',
+        )
+
+    def search(self, text: str) -> 'TaskQuerySet':
+        '''Full-text search over names and descriptions,
+        annotated with the relevance as ``search_rank``.'''
+        return full_text_search(self, text)
 
 
 class Task(models.Model):
@@ -53,14 +85,126 @@ class Task(models.Model):
         )
     )
 
+    objects = TaskQuerySet.as_manager()
+
+    # Counter keys of the stored row, read when it is saved or deleted, see TaskCounter.
+    _counted_keys: Optional[List[Tuple[str, int]]] = None
+
     class Meta:
         verbose_name: str = gettext_lazy('task')
         verbose_name_plural: str = gettext_lazy('tasks')
+        ordering: List[str] = ['-date_modified', '-id']
+        # Every TasksFilter combination can walk an index in list order.
+        indexes: List[models.Index] = [
+            models.Index(fields=['-date_modified', '-id'], name='task_modified_idx'),
+            models.Index(fields=['status', '-date_modified', '-id'],
+                         name='task_status_modified_idx'),
+            models.Index(fields=['executor', '-date_modified', '-id'],
+                         name='task_executor_modified_idx'),
+            models.Index(fields=['author', '-date_modified', '-id'],
+                         name='task_author_modified_idx'),
+            models.Index(fields=['executor', 'status', '-date_modified', '-id'],
+                         name='task_executor_status_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    def clean_fields(self, exclude: Optional[Iterable[str]] = None) -> None:
+        '''Skips the existence check of the related rows the request has read.'''
+        exclude = set(exclude or ())
+        exclude.update(
+            field.name for field in self._meta.concrete_fields
+            if field.many_to_one and identity.lookup(
+                field.related_model._base_manager.all(), getattr(self, field.attname)
+            ) is not None
+        )
+        super().clean_fields(exclude)
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        '''Saves the task and its counters in one transaction.'''
+        using: str = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class TaskLabel(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
     label = models.ForeignKey(Label, on_delete=models.PROTECT)
+
+    class Meta:
+        constraints: List[models.BaseConstraint] = [
+            models.UniqueConstraint(fields=['task', 'label'], name='task_label_unique'),
+        ]
+        indexes: List[models.Index] = [
+            models.Index(fields=['label', 'task'], name='task_label_label_task_idx'),
+        ]
+
+
+class TaskSearchEntry(models.Model):
+    '''A row of the SQLite full-text index of tasks, maintained by triggers.'''
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', related_name='search_entry'
+    )
+    document = FullTextField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed: bool = False
+        db_table: str = FTS_TABLE
+
+
+class TaskCounterManager(models.Manager):
+    def get_count(self, kind: str, object_id: int) -> int:
+        '''Returns the number of tasks with the given status, executor or label.'''
+        return self.filter(kind=kind, object_id=object_id) \
+            .values_list('count', flat=True).first() or 0
+
+    def get_counts(self, kind: str) -> Dict[int, int]:
+        '''Returns the task counts of every status, executor or label.'''
+        return dict(self.filter(kind=kind, count__gt=0).values_list('object_id', 'count'))
+
+
+class TaskCounter(models.Model):
+    '''The number of tasks per status, executor and label.
+
+    The counters are changed in the transaction of every task save and delete
+    and every change of its label set, see signals.py. Bulk writes that skip
+    the signals (QuerySet.update(), bulk_create()) must apply the changes
+    themselves with counters.apply(). ``date_modified`` moves with every
+    change, for the lists showing the counts to be revalidated cheaply.'''
+    STATUS: str = 'status'
+    EXECUTOR: str = 'executor'
+    LABEL: str = 'label'
+    KINDS: List[Tuple[str, str]] = [
+        (STATUS, gettext_lazy('status')),
+        (EXECUTOR, gettext_lazy('executor')),
+        (LABEL, gettext_lazy('label')),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    count = models.BigIntegerField(default=0)
+    date_modified = models.DateTimeField(auto_now=True)
+
+    objects = TaskCounterManager()
+
+    class Meta:
+        constraints: List[models.BaseConstraint] = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='task_counter_unique'),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {}: {}'.format(self.kind, self.object_id, self.count)
+
+    @classmethod
+    def keys(cls, status_id: Optional[int],
+             executor_id: Optional[int]) -> List[Tuple[str, int]]:
+        '''Returns the counters a task with these relations is counted in.'''
+        keys: List[Tuple[str, int]] = []
+        if status_id is not None:
+            keys.append((cls.STATUS, status_id))
+        if executor_id is not None:
+            keys.append((cls.EXECUTOR, executor_id))
+        return keys
@@ -0,0 +1,161 @@
+"""Full-text search over task names and descriptions.
+
+SQLite keeps an FTS5 index in the external-content table ``tasks_task_fts``,
+maintained by triggers on ``tasks_task`` and joined to the tasks through the
+unmanaged ``TaskSearchEntry`` model. PostgreSQL matches a ``tsvector``
+expression covered by a GIN expression index. Other databases fall back to
+a case-insensitive substring match.
+"""
+
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import BooleanField, F, FloatField, Lookup, Q, QuerySet, TextField, Value
+from django.db.models.sql.compiler import SQLCompiler
+from django.db.models.expressions import RawSQL
+from django.db.migrations.recorder import MigrationRecorder
+
+
+APP_LABEL: str = 'tasks'
+MIGRATION: str = '0007_task_search'
+FTS_TABLE: str = 'tasks_task_fts'
+
+SQLITE_INSTALL: List[str] = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5("
+    "name, description, content='tasks_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update "
+    "AFTER UPDATE OF name, description ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO tasks_task_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+]
+SQLITE_REBUILD: str = "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')"
+SQLITE_UNINSTALL: List[str] = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+# The query has to repeat the indexed expression for the index to be used.
+POSTGRES_VECTOR: str = "to_tsvector('simple', coalesce({table}name, '') " \
+    "|| ' ' || coalesce({table}description, ''))"
+POSTGRES_INSTALL: str = 'CREATE INDEX IF NOT EXISTS tasks_task_search_idx ' \
+    'ON tasks_task USING gin ({})'.format(POSTGRES_VECTOR.format(table=''))
+POSTGRES_UNINSTALL: str = 'DROP INDEX IF EXISTS tasks_task_search_idx'
+POSTGRES_QUERY: str = "to_tsquery('simple', %s)"
+POSTGRES_MATCH: str = '{} @@ {}'.format(
+    POSTGRES_VECTOR.format(table='"tasks_task".'), POSTGRES_QUERY
+)
+POSTGRES_RANK: str = 'ts_rank({}, {})'.format(
+    POSTGRES_VECTOR.format(table='"tasks_task".'), POSTGRES_QUERY
+)
+
+
+class FullTextField(TextField):
+    '''The hidden FTS5 column named after its table, which MATCH runs on.'''
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name: str = 'match'
+
+    def as_sql(self, compiler: SQLCompiler,
+               connection: BaseDatabaseWrapper) -> Tuple[str, List[Any]]:
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return '{} MATCH {}'.format(lhs, rhs), lhs_params + rhs_params
+
+
+@lru_cache(maxsize=None)
+def has_fts5() -> bool:
+    '''Whether the SQLite library the app is linked against has FTS5.'''
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.execute('CREATE VIRTUAL TABLE fts USING fts5(text)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+    return True
+
+
+def uses_fts5(connection: BaseDatabaseWrapper) -> bool:
+    return connection.vendor == 'sqlite' and has_fts5()
+
+
+def is_installed(connection: BaseDatabaseWrapper) -> bool:
+    '''Whether the migration creating the search index has been applied.'''
+    return (APP_LABEL, MIGRATION) in MigrationRecorder(connection).applied_migrations()
+
+
+def install(connection: BaseDatabaseWrapper) -> None:
+    '''Creates the search index for the connection's database if it is missing.'''
+    if uses_fts5(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            created: bool = cursor.fetchone() is None
+            for statement in SQLITE_INSTALL:
+                cursor.execute(statement)
+            if created:
+                cursor.execute(SQLITE_REBUILD)
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_INSTALL)
+
+
+def uninstall(connection: BaseDatabaseWrapper) -> None:
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for statement in SQLITE_UNINSTALL:
+                cursor.execute(statement)
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_UNINSTALL)
+
+
+def to_fts5_query(words: List[str]) -> str:
+    '''Builds an FTS5 query matching every word as a prefix.'''
+    return ' '.join('"{}"*'.format(word) for word in words)
+
+
+def to_tsquery(words: List[str]) -> str:
+    '''Builds a tsquery matching every word as a prefix.'''
+    return ' & '.join('{}:*'.format(word) for word in words)
+
+
+def search(queryset: QuerySet, text: str) -> QuerySet:
+    '''Filters the tasks matching the text and annotates them with
+    ``search_rank``, the higher the more relevant.'''
+    connection: BaseDatabaseWrapper = connections[queryset.db]
+    words: List[str] = re.findall(r'\w+', text)
+    params: List[Any]
+    if not words:
+        return queryset.none()
+    if uses_fts5(connection):
+        # FTS5 ranks with bm25, where lower is better.
+        return queryset.filter(
+            search_entry__document__match=to_fts5_query(words)
+        ).annotate(search_rank=-F('search_entry__rank'))
+    if connection.vendor == 'postgresql':
+        params = [to_tsquery(words)]
+        return queryset.annotate(
+            search_rank=RawSQL(POSTGRES_RANK, params, output_field=FloatField())
+        ).filter(RawSQL(POSTGRES_MATCH, params, output_field=BooleanField()))
+    return queryset.annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    ).filter(Q(name__icontains=text) | Q(description__icontains=text))
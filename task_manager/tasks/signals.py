@@ -0,0 +1,86 @@
+"""Keep TaskCounter in step with task saves, deletions and label changes,
+and drop what was cached from the tasks."""
+
+from collections import Counter
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from typing import Any, Dict, List, Set, Type
+
+from . import counters
+from .models import Task, TaskLabel, TaskCounter, cache_namespace
+
+
+def stored_keys(instance: Task, using: str) -> List[counters.Key]:
+    '''Reads what the stored task is counted in, locking its row until the
+    end of the transaction: the copy being saved or deleted may be stale,
+    and a concurrent change must wait for these counters to be applied.'''
+    stored = Task._base_manager.using(using).select_for_update() \
+        .filter(pk=instance.pk).values_list('status_id', 'executor_id').first()
+    return TaskCounter.keys(*stored) if stored else []
+
+
+@receiver(pre_save, sender=Task)
+def remember_counted_keys(sender: Type[Task], instance: Task, using: str,
+                          **kwargs: Any) -> None:
+    '''Runs in the transaction of Task.save().'''
+    if instance.pk is None:
+        instance._counted_keys = []
+    else:
+        instance._counted_keys = stored_keys(instance, using)
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender: Type[Task], instance: Task, **kwargs: Any) -> None:
+    keys: List[counters.Key] = TaskCounter.keys(instance.status_id, instance.executor_id)
+    deltas: Dict[counters.Key, int] = Counter(keys)
+    deltas.subtract(instance._counted_keys or [])
+    counters.apply(deltas)
+    instance._counted_keys = None
+
+
+@receiver(pre_delete, sender=Task)
+def remember_deleted_keys(sender: Type[Task], instance: Task, using: str,
+                          **kwargs: Any) -> None:
+    '''Runs in the transaction of the deletion.'''
+    instance._counted_keys = stored_keys(instance, using)
+
+
+@receiver(post_delete, sender=Task)
+def uncount_deleted_task(sender: Type[Task], instance: Task, **kwargs: Any) -> None:
+    '''A task deleted meanwhile by another request is not counted twice.'''
+    counters.apply({key: -1 for key in instance._counted_keys or []})
+    instance._counted_keys = None
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender: Type[Task], **kwargs: Any) -> None:
+    cache_namespace.invalidate()
+
+
+@receiver(post_save, sender=TaskLabel)
+def count_saved_task_label(sender: Type[TaskLabel], instance: TaskLabel,
+                           created: bool, **kwargs: Any) -> None:
+    if created:
+        counters.apply({(TaskCounter.LABEL, instance.label_id): 1})
+
+
+@receiver(post_delete, sender=TaskLabel)
+def uncount_deleted_task_label(sender: Type[TaskLabel], instance: TaskLabel,
+                               **kwargs: Any) -> None:
+    '''Covers removals from the label sets and task deletions alike,
+    as both delete the links one by one while this receiver is connected.'''
+    counters.apply({(TaskCounter.LABEL, instance.label_id): -1})
+
+
+@receiver(m2m_changed, sender=TaskLabel)
+def count_added_labels(sender: Type[TaskLabel], instance: Any, action: str,
+                       reverse: bool, pk_set: Set[int], **kwargs: Any) -> None:
+    '''Adding to a label set bulk creates the links without post_save.
+    pk_set only holds the ids that were not linked yet.'''
+    if action != 'post_add':
+        return
+    if reverse:
+        counters.apply({(TaskCounter.LABEL, instance.pk): len(pk_set)})
+    else:
+        counters.apply({key: 1 for key in counters.label_keys(pk_set)})
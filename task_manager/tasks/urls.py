@@ -1,14 +1,24 @@
 from django.urls import path, URLPattern
 from typing import List
 
-from .views import TasksListView, TaskCreateView, TaskUpdateView, TaskDeleteView, TaskDetailView
-from .constants import LIST_TASKS, CREATE_TASK, UPDATE_TASK, DELETE_TASK, DETAIL_TASK
+from .views import TasksListView, TaskCreateView, TaskUpdateView, TaskDeleteView, TaskDetailView, \
+    TaskBulkView, AsyncTasksListView, AsyncTaskDetailView
+from .constants import LIST_TASKS, CREATE_TASK, UPDATE_TASK, DELETE_TASK, DETAIL_TASK, \
+    BULK_TASKS
 
 
 urlpatterns: List[URLPattern] = [
     path('', TasksListView.as_view(), name=LIST_TASKS),
     path('create/', TaskCreateView.as_view(), name=CREATE_TASK),
+    path('bulk/', TaskBulkView.as_view(), name=BULK_TASKS),
     path('<int:pk>/', TaskDetailView.as_view(), name=DETAIL_TASK),
     path('<int:pk>/update/', TaskUpdateView.as_view(), name=UPDATE_TASK),
     path('<int:pk>/delete/', TaskDeleteView.as_view(), name=DELETE_TASK)
 ]
+
+# The ASGI application reads the list and the detail with the async ORM.
+asgi_urlpatterns: List[URLPattern] = [
+    path('', AsyncTasksListView.as_view(), name=LIST_TASKS),
+    path('<int:pk>/', AsyncTaskDetailView.as_view(), name=DETAIL_TASK),
+    *urlpatterns,
+]
@@ -1,28 +1,101 @@
-from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
+from asgiref.sync import sync_to_async
+from django.views.generic import CreateView, UpdateView, DeleteView, DetailView, FormView
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import redirect
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q, QuerySet
 from django.forms.forms import BaseForm
-from django.http import HttpResponse
-from typing import Dict, Any, Tuple, Union, Callable, Type
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from typing import Dict, Any, List, Tuple, Union, Callable, Type
 
 from django_filters.views import FilterView
 
+from . import bulk
 from .filters import TasksFilter
-from .models import Task, User
-from .constants import REVERSE_TASKS, \
+from .forms import TaskBulkForm, TaskForm
+from .models import Task, TaskQuerySet
+from .constants import REVERSE_TASKS, REVERSE_BULK, \
     CONTEXT_LIST, CONTEXT_CREATE, CONTEXT_UPDATE, CONTEXT_DELETE, CONTEXT_DETAIL, \
     MSG_CREATED, MSG_UPDATED, MSG_DELETED, MSG_NOT_AUTHOR_FOR_DELETE_TASK, \
-    NAME, STATUS, DESCRIPTION, EXECUTOR, LABELS
-from ..mixins import AuthorizationPermissionMixin
+    MSG_BULK_UPDATED, MSG_BULK_FAILED, BULK_BUTTON, EXPORT_CSV_BUTTON, EXPORT_NDJSON_BUTTON, \
+    STATUS, EXECUTOR, LABELS, TASKS, ACTION, NEXT, \
+    SET_STATUS, SET_EXECUTOR, ADD_LABELS, REMOVE_LABELS, ROW_CACHE_TIMEOUT
+from ..mixins import AsyncConditionalGetMixin, AsyncViewMixin, AuthorizationPermissionMixin, \
+    ConditionalGetMixin, KeysetPaginationMixin, ObjectPermissionMixin, ReplicaReadMixin
 
 
-class TasksListView(AuthorizationPermissionMixin, FilterView):
+class TasksListView(AuthorizationPermissionMixin, ReplicaReadMixin,
+                    KeysetPaginationMixin, FilterView):
     '''Show the list of tasks.'''
     model: Type[Task] = Task
     context_object_name: str = 'tasks'
     extra_context: Dict = CONTEXT_LIST
     filterset_class: Type[TasksFilter] = TasksFilter
+    paginate_by: int = 50
+    keyset_ordering: Tuple[str, ...] = ('-date_modified', '-id')
+    search_keyset_ordering: Tuple[str, ...] = ('-search_rank', '-id')
+
+    def get_keyset_ordering(self) -> Tuple[str, ...]:
+        '''Search results are ranked by relevance.'''
+        if self.filterset.is_search:
+            return self.search_keyset_ordering
+        return self.keyset_ordering
+
+    def get_queryset(self) -> TaskQuerySet:
+        '''The viewer's authorship is part of the row cache key.'''
+        return Task.objects.for_list().annotate(viewer_is_author=ExpressionWrapper(
+            Q(author=self.request.user.id), output_field=BooleanField()
+        ))
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Adds the form applying an action to the selected tasks.'''
+        context: Dict[str, Any] = super().get_context_data(**kwargs)
+        context['row_cache_timeout'] = ROW_CACHE_TIMEOUT
+        context['bulk_form'] = TaskBulkForm(initial={NEXT: self.request.get_full_path()})
+        context['bulk_url'] = REVERSE_BULK
+        context['bulk_button_text'] = BULK_BUTTON
+        context['export_csv_text'] = EXPORT_CSV_BUTTON
+        context['export_ndjson_text'] = EXPORT_NDJSON_BUTTON
+        return context
+
+
+class TaskBulkView(AuthorizationPermissionMixin, FormView):
+    '''Apply an action to the tasks selected in the list.
+    Any signed in user may change any task, so access is checked once
+    for the whole batch.'''
+    form_class: Type[TaskBulkForm] = TaskBulkForm
+    http_method_names: List[str] = ['post']
+    actions: Dict[str, Callable[[List[int], Dict[str, Any]], int]] = {
+        SET_STATUS: lambda ids, data: bulk.set_status(ids, data[STATUS]),
+        SET_EXECUTOR: lambda ids, data: bulk.set_executor(
+            ids, data[EXECUTOR].id if data[EXECUTOR] else None
+        ),
+        ADD_LABELS: lambda ids, data: bulk.add_labels(ids, data[LABELS]),
+        REMOVE_LABELS: lambda ids, data: bulk.remove_labels(ids, data[LABELS]),
+    }
+
+    def form_valid(self, form: TaskBulkForm) -> HttpResponseRedirect:
+        data: Dict[str, Any] = form.cleaned_data
+        count: int = self.actions[data[ACTION]]([task.id for task in data[TASKS]], data)
+        messages.success(self.request, MSG_BULK_UPDATED % {'count': count})
+        return redirect(self.get_success_url())
+
+    def form_invalid(self, form: TaskBulkForm) -> HttpResponseRedirect:
+        errors: str = '; '.join(
+            error for field_errors in form.errors.values() for error in field_errors
+        )
+        messages.error(self.request, MSG_BULK_FAILED % {'errors': errors})
+        return redirect(self.get_success_url())
+
+    def get_success_url(self) -> str:
+        '''Goes back to the list page the tasks were selected on.'''
+        url: str = self.request.POST.get(NEXT, '')
+        if url_has_allowed_host_and_scheme(url, allowed_hosts={self.request.get_host()},
+                                           require_https=self.request.is_secure()):
+            return url
+        return REVERSE_TASKS
 
 
 class TaskCreateView(AuthorizationPermissionMixin,
@@ -30,14 +103,15 @@ class TaskCreateView(AuthorizationPermissionMixin,
     '''Create a task.'''
     model: Type[Task] = Task
     extra_context: Dict = CONTEXT_CREATE
-    fields: Tuple = (NAME, STATUS, DESCRIPTION, EXECUTOR, LABELS)
+    form_class: Type[TaskForm] = TaskForm
     success_url: Union[str, Callable[..., Any]] = REVERSE_TASKS
     success_message: str = MSG_CREATED
 
+    @transaction.atomic
     def form_valid(self, form: BaseForm) -> HttpResponse:
-        '''Sets the author of the task by the ID of the current user.'''
-        user: User = self.request.user
-        form.instance.author: BaseForm[User] = User.objects.get(id=user.id)
+        '''Makes the signed in user, already loaded, the author of the task.
+        The task and its labels are saved in one transaction.'''
+        form.instance.author = self.request.user
         return super(TaskCreateView, self).form_valid(form)
 
 
@@ -46,30 +120,80 @@ class TaskUpdateView(AuthorizationPermissionMixin,
     '''Change a task.'''
     model: Type[Task] = Task
     extra_context: Dict = CONTEXT_UPDATE
-    fields: Tuple = (NAME, STATUS, DESCRIPTION, EXECUTOR, LABELS)
+    form_class: Type[TaskForm] = TaskForm
     success_url: Union[str, Callable[..., Any]] = REVERSE_TASKS
     success_message: str = MSG_UPDATED
 
+    @transaction.atomic
+    def form_valid(self, form: BaseForm) -> HttpResponse:
+        '''Saves the task and its labels in one transaction.'''
+        return super().form_valid(form)
+
 
-class TaskDeleteView(AuthorizationPermissionMixin,
+class TaskDeleteView(ObjectPermissionMixin, AuthorizationPermissionMixin,
                      SuccessMessageMixin, DeleteView):
-    '''Delete a task.'''
+    '''Delete a task. Only its author may do it.'''
     model: Type[Task] = Task
     context_object_name: str = 'task'
     extra_context: Dict = CONTEXT_DELETE
     success_url: Union[str, Callable[..., Any]] = REVERSE_TASKS
     success_message: str = MSG_DELETED
+    owner_field: str = 'author_id'
+    unpermission_message: str = MSG_NOT_AUTHOR_FOR_DELETE_TASK
+    unpermission_url: Union[str, Callable[..., Any]] = REVERSE_TASKS
 
-    def dispatch(self, request, *args, **kwargs):
-        '''Specifies access settings for the current user.
-        Provides access if the user is authenticated.'''
-        if request.user.id != self.get_object().author.id:
-            if request.user.is_authenticated:
-                messages.error(self.request, MSG_NOT_AUTHOR_FOR_DELETE_TASK)
-            return redirect(REVERSE_TASKS)
-        return super().dispatch(request, *args, **kwargs)
+    def handle_no_object_permission(self) -> HttpResponseRedirect:
+        '''Anonymous users are sent to the list without the author message.'''
+        if not self.request.user.is_authenticated:
+            return redirect(self.unpermission_url)
+        return super().handle_no_object_permission()
 
 
-class TaskDetailView(AuthorizationPermissionMixin, DetailView):
+class TaskDetailView(AuthorizationPermissionMixin, ReplicaReadMixin,
+                     ConditionalGetMixin, DetailView):
     model: Type[Task] = Task
+    last_modified_fields: Tuple[str, ...] = (
+        'date_modified', 'status__date_modified', 'labels__date_modified',
+        'author__date_modified', 'executor__date_modified',
+    )
     extra_context: Dict = CONTEXT_DETAIL
+
+    def get_queryset(self) -> TaskQuerySet:
+        return Task.objects.select_related('status', 'author', 'executor')
+
+
+# The views below read with the async ORM. The ASGI application serves them
+# in place of their sync versions, see task_manager.asgi_urls.
+
+
+class AsyncTasksListView(AsyncViewMixin, TasksListView):
+    '''TasksListView reading the page with the async ORM; the template is
+    rendered on a thread, as are all templates.'''
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        self.filterset: TasksFilter = self.get_filterset(self.get_filterset_class())
+        self.object_list: QuerySet = await sync_to_async(self.get_filtered_queryset)()
+        page_size: int = self.get_paginate_by(self.object_list)
+        await self.apaginate_queryset(self.object_list, page_size)
+        context: Dict[str, Any] = self.get_context_data(
+            filter=self.filterset, object_list=self.object_list
+        )
+        return self.render_to_response(context)
+
+    def get_filtered_queryset(self) -> QuerySet:
+        '''The tasks matching the filters, as FilterView.get() selects them.
+        Validating the filters reads their choices.'''
+        if not self.filterset.is_bound or self.filterset.is_valid() or not self.get_strict():
+            return self.filterset.qs
+        return self.filterset.queryset.none()
+
+
+class AsyncTaskDetailView(AsyncViewMixin, AsyncConditionalGetMixin, TaskDetailView):
+    '''TaskDetailView reading the task with the async ORM.'''
+
+    async def aget_page(self) -> HttpResponse:
+        try:
+            self.object: Task = await self.get_queryset().aget(pk=self.kwargs[self.pk_url_kwarg])
+        except Task.DoesNotExist:
+            raise Http404
+        return self.render_to_response(self.get_context_data(object=self.object))
@@ -0,0 +1,19 @@
+from django import template
+from django.template.context import RequestContext
+from typing import Any
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def query_string(context: RequestContext, **kwargs: Any) -> str:
+    '''Returns the current query string with the given parameters replaced.
+    Parameters set to None are dropped.'''
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return query.urlencode()
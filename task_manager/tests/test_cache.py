@@ -0,0 +1,289 @@
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.conf import settings
+from django.core.cache import cache, caches
+from redis.exceptions import RedisError
+
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import PropertyMock, patch
+
+from task_manager.cache import LocalLRU, Namespace, TieredCache
+from task_manager.tasks.models import Task, cache_namespace as task_cache
+from task_manager.statuses.models import Status, cache_namespace as status_cache
+from task_manager.labels.models import Label, cache_namespace as label_cache
+
+
+class StandInRedis(socketserver.ThreadingTCPServer):
+    '''Speaks enough of the Redis protocol for Django's RedisCache,
+    on a free port. Set a password to require AUTH.'''
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.password: Optional[bytes] = None
+        self.lock = threading.Lock()
+
+    def url(self, credentials: str = '') -> str:
+        return 'redis://{}127.0.0.1:{}/1'.format(credentials, self.server_address[1])
+
+    def lookup(self, key: bytes) -> Optional[bytes]:
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def run(self, command: bytes, *args: bytes) -> Any:
+        with self.lock:
+            return getattr(self, 'do_' + command.decode().lower())(*args)
+
+    def do_select(self, db: bytes) -> bytes:
+        return b'+OK'
+
+    def do_get(self, key: bytes) -> Optional[bytes]:
+        return self.lookup(key)
+
+    def do_set(self, key: bytes, value: bytes, *options: bytes) -> Optional[bytes]:
+        options = tuple(option.upper() for option in options)
+        if b'NX' in options and self.lookup(key) is not None:
+            return None
+        expires: Optional[float] = None
+        if b'EX' in options:
+            expires = time.monotonic() + int(options[options.index(b'EX') + 1])
+        self.data[key] = (value, expires)
+        return b'+OK'
+
+    def do_del(self, *keys: bytes) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def do_exists(self, key: bytes) -> int:
+        return int(self.lookup(key) is not None)
+
+    def do_incrby(self, key: bytes, delta: bytes) -> Any:
+        value: Optional[bytes] = self.lookup(key)
+        if value is not None and not value.lstrip(b'-').isdigit():
+            return StandInError('ERR value is not an integer or out of range')
+        count: int = int(value or 0) + int(delta)
+        self.data[key] = (str(count).encode(), self.data.get(key, (None, None))[1])
+        return count
+
+    def do_flushdb(self) -> bytes:
+        self.data.clear()
+        return b'+OK'
+
+
+class StandInError(Exception):
+    '''An error reply.'''
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        authenticated: bool = False
+        while True:
+            line: bytes = self.rfile.readline()
+            if not line:
+                return
+            args: List[bytes] = []
+            for _ in range(int(line[1:])):
+                length: int = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            reply: Any
+            if args[0].upper() == b'AUTH':
+                authenticated = args[-1] == self.server.password
+                reply = b'+OK' if authenticated else StandInError('WRONGPASS invalid password')
+            elif self.server.password is not None and not authenticated:
+                reply = StandInError('NOAUTH Authentication required.')
+            else:
+                reply = self.server.run(*args)
+            self.wfile.write(self.encode(reply))
+
+    def encode(self, reply: Any) -> bytes:
+        if reply is None:
+            return b'$-1\r\n'
+        if isinstance(reply, StandInError):
+            return b'-%s\r\n' % str(reply).encode()
+        if isinstance(reply, int):
+            return b':%d\r\n' % reply
+        if reply.startswith(b'+'):
+            return reply + b'\r\n'
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+
+
+class LocalLRUTest(SimpleTestCase):
+
+    def test_least_recently_used_are_dropped(self) -> None:
+        lru = LocalLRU(2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual([lru.get(key) for key in 'ac'], [1, 3])
+        self.assertIsNot(lru.get('b'), 2)
+
+    def test_entries_expire(self) -> None:
+        lru = LocalLRU(2)
+        lru.set('a', 1, 60)
+        with patch('task_manager.cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNot(lru.get('a'), 1)
+        self.assertEqual(lru.entries, {})
+
+
+class TieredCacheTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_reads_are_served_from_memory(self) -> None:
+        cache.set('key', {'value': 1})
+        caches['shared'].delete('key')
+        self.assertEqual(cache.get('key'), {'value': 1})
+
+        cache.local.clear()
+        self.assertIsNone(cache.get('key'))
+
+    def test_memory_is_filled_from_the_shared_cache(self) -> None:
+        caches['shared'].set('key', 'shared')
+        self.assertEqual(cache.get('key'), 'shared')
+        caches['shared'].set('key', 'changed')
+        self.assertEqual(cache.get('key'), 'shared')
+
+        with patch('task_manager.cache.time.monotonic',
+                   return_value=time.monotonic() + cache.local_timeout + 1):
+            self.assertEqual(cache.get('key'), 'changed')
+
+    def test_cached_values_are_copies(self) -> None:
+        value: List[int] = [1]
+        cache.set('key', value)
+        value.append(2)
+        cache.get('key').append(3)
+        self.assertEqual(cache.get('key'), [1])
+
+    def test_writes_go_to_both_tiers(self) -> None:
+        cache.set('key', 1)
+        self.assertTrue(cache.add('other', 2))
+        self.assertFalse(cache.add('other', 3))
+        self.assertEqual(caches['shared'].get_many(['key', 'other']), {'key': 1, 'other': 2})
+
+        self.assertEqual(cache.incr('key'), 2)
+        self.assertEqual(caches['shared'].get('key'), 2)
+
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+        self.assertIsNone(caches['shared'].get('key'))
+
+
+class NamespaceTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.namespaces: List[Namespace] = [status_cache, label_cache, task_cache]
+        for namespace in self.namespaces:
+            namespace.set('key', namespace.name)
+
+    def cached(self) -> List[Optional[str]]:
+        return [namespace.get('key') for namespace in self.namespaces]
+
+    def test_changes_only_invalidate_their_namespace(self) -> None:
+        Label.objects.get(pk=1).save()
+        self.assertEqual(self.cached(), ['statuses', None, 'tasks'])
+
+        Status.objects.create(name='Reviewed')
+        self.assertEqual(self.cached(), [None, None, 'tasks'])
+
+        Task.objects.get(pk=1).delete()
+        self.assertEqual(self.cached(), [None, None, None])
+
+    def test_keys_are_not_shared_between_namespaces(self) -> None:
+        self.assertEqual(self.cached(), ['statuses', 'labels', 'tasks'])
+        self.assertEqual(Namespace('other').get('key', 'missing'), 'missing')
+
+    def test_invalidation_is_repeated_after_the_commit(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            label_cache.invalidate()
+            label_cache.set('key', 'read before the commit')
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(label_cache.get('key'))
+
+    def test_lost_versions_are_not_reused(self) -> None:
+        version: int = label_cache.version()
+        cache.delete(label_cache.version_key)
+        self.assertGreater(label_cache.version(), version)
+        self.assertIsNone(label_cache.get('key'))
+
+    def test_invalidation_is_seen_by_other_processes(self) -> None:
+        other_process: TieredCache = TieredCache('', {'OPTIONS': {'SHARED': 'shared'}})
+        in_other_process = patch.object(
+            Namespace, 'cache', new_callable=PropertyMock, return_value=other_process
+        )
+        with in_other_process:
+            self.assertEqual(label_cache.get('key'), 'labels')
+        label_cache.invalidate()
+        with in_other_process:
+            self.assertIsNone(label_cache.get('key'))
+
+    def test_get_or_set(self) -> None:
+        self.assertEqual(label_cache.get_or_set('computed', lambda: [1, 2]), [1, 2])
+        self.assertEqual(label_cache.get_or_set('computed', lambda: [3]), [1, 2])
+
+
+class RedisCacheTest(SimpleTestCase):
+    '''Django's RedisCache, as CACHE_BACKEND=redis configures it.'''
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.server = StandInRedis()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.server.password = None
+        self.server.data.clear()
+
+    def shared(self, location: str) -> Dict[str, Any]:
+        return {**settings.SHARED_CACHES['redis'], 'LOCATION': location}
+
+    def test_values_and_counts(self) -> None:
+        with override_settings(CACHES={'default': self.shared(self.server.url())}):
+            for value in (1, 'text', None, {'ids': [1, 2]}):
+                cache.set('key', value)
+                self.assertEqual(cache.get('key', 'missing'), value)
+            cache.set('count', 1)
+            self.assertEqual(cache.incr('count', 5), 6)
+            self.assertEqual(self.server.data[b':1:count'][0], b'6')
+
+    def test_credentials_are_sent(self) -> None:
+        self.server.password = b'secret'
+        with override_settings(CACHES={'default': self.shared(self.server.url())}):
+            with self.assertRaisesMessage(RedisError, 'Authentication required'):
+                cache.get('key')
+        with override_settings(CACHES={
+            'default': self.shared(self.server.url(':secret@')),
+        }):
+            cache.set('key', 'value')
+            self.assertEqual(cache.get('key'), 'value')
+
+    def test_as_the_shared_tier(self) -> None:
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'task_manager.cache.TieredCache'},
+            'shared': self.shared(self.server.url()),
+        }):
+            namespace = Namespace('labels')
+            namespace.set('choices', [(1, 'Development')])
+            caches['default'].local.clear()
+            self.assertEqual(namespace.get('choices'), [(1, 'Development')])
+            namespace.invalidate()
+            self.assertIsNone(namespace.get('choices'))
+        self.assertTrue(any(key.startswith(b':1:namespace:labels') for key in self.server.data))
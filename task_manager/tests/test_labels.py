@@ -3,12 +3,14 @@ from django.urls import reverse_lazy
 from django.http import HttpResponse
 from django.forms.utils import ErrorDict
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
 
 from http import HTTPStatus
 from typing import List, Dict
 
 from task_manager.labels.models import Label
 from task_manager.users.models import User
+from task_manager.tasks.filters import TasksFilter
 from task_manager.labels.constants import \
     TEMPLATE_CREATE, TEMPLATE_LIST, TEMPLATE_UPDATE, TEMPLATE_DELETE, \
     REVERSE_LABELS, REVERSE_CREATE, UPDATE_LABEL, DELETE_LABEL
@@ -164,3 +166,41 @@ class LabelsTest(TestCase):
         self.assertRedirects(response, REVERSE_LABELS)
         with self.assertRaises(ObjectDoesNotExist):
             Label.objects.get(id=self.label1.id)
+
+
+class LabelChoicesTest(TestCase):
+
+    fixtures = ['label.json']
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_filter_choices(self) -> List:
+        return list(TasksFilter().form.fields['labels'].choices)[1:]
+
+    def test_choices_are_cached(self) -> None:
+        with self.assertNumQueries(1):
+            choices: List = self.get_filter_choices()
+        self.assertEqual(
+            choices, [(1, 'Development'), (3, 'Optimization'), (2, 'Testing')]
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_filter_choices(), choices)
+
+    def test_choices_follow_label_changes(self) -> None:
+        self.get_filter_choices()
+
+        label: Label = Label.objects.create(name='Review')
+        self.assertIn((label.id, 'Review'), self.get_filter_choices())
+
+        label.name = 'Code review'
+        label.save()
+        choices: List = self.get_filter_choices()
+        self.assertIn((label.id, 'Code review'), choices)
+        self.assertNotIn((label.id, 'Review'), choices)
+
+        label.delete()
+        self.assertEqual(
+            self.get_filter_choices(),
+            [(1, 'Development'), (3, 'Optimization'), (2, 'Testing')]
+        )
@@ -0,0 +1,151 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import re
+from collections import Counter
+from contextlib import ExitStack
+from http import HTTPStatus
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+
+from task_manager.seeding import Profile, Seeder
+from task_manager.users.models import User
+from task_manager.users.views import UsersListView
+from task_manager.statuses.views import StatusesListView
+from task_manager.labels.views import LabelsListView
+from task_manager.tasks.views import TasksListView
+from task_manager.tasks.api import TaskListApiView
+from task_manager.constants import HOME
+from task_manager.users.constants import LIST_USERS, CREATE_USER, UPDATE_USER, DELETE_USER
+from task_manager.statuses.constants import \
+    LIST_STATUSES, CREATE_STATUS, UPDATE_STATUS, DELETE_STATUS
+from task_manager.labels.constants import \
+    LIST_LABELS, CREATE_LABEL, UPDATE_LABEL, DELETE_LABEL
+from task_manager.tasks.constants import \
+    LIST_TASKS, CREATE_TASK, DETAIL_TASK, UPDATE_TASK, DELETE_TASK, API_TASKS, API_TASK
+
+
+# The name, the arguments and the query string of every page checked.
+# The objects of the fixtures are shown to the author of task 1; the
+# filters pick the most used of the seeded ones (the fixtures hold 3 of each).
+PAGES: List[Tuple[str, List[int], Dict[str, str]]] = [
+    (HOME, [], {}),
+    (LIST_USERS, [], {}),
+    (LIST_USERS, [], {'q': 'user'}),
+    (CREATE_USER, [], {}),
+    (UPDATE_USER, [1], {}),
+    (DELETE_USER, [1], {}),
+    (LIST_STATUSES, [], {}),
+    (LIST_STATUSES, [], {'sort': 'usage'}),
+    (CREATE_STATUS, [], {}),
+    (UPDATE_STATUS, [1], {}),
+    (DELETE_STATUS, [1], {}),
+    (LIST_LABELS, [], {}),
+    (LIST_LABELS, [], {'sort': 'name'}),
+    (CREATE_LABEL, [], {}),
+    (UPDATE_LABEL, [1], {}),
+    (DELETE_LABEL, [1], {}),
+    (LIST_TASKS, [], {}),
+    (LIST_TASKS, [], {'status': '4'}),
+    (LIST_TASKS, [], {'labels': '4'}),
+    (LIST_TASKS, [], {'self_tasks': 'on'}),
+    (CREATE_TASK, [], {}),
+    (DETAIL_TASK, [1], {}),
+    (UPDATE_TASK, [1], {}),
+    (DELETE_TASK, [1], {}),
+    (API_TASKS, [], {}),
+    (API_TASK, [1], {}),
+]
+
+# The lists are compared between a few rows of a small dataset and many
+# rows of a large one. Both fill their pages: the paginators look for the
+# next page only after a full one.
+SMALL: Profile = Profile(users=60, statuses=60, labels=60, tasks=600, batch_size=200)
+GROWTH: Profile = Profile(users=150, statuses=100, labels=100, tasks=400, batch_size=100)
+SMALL_PAGE: int = 5
+LARGE_PAGE: int = 50
+PAGE_SIZES: List[Tuple[Any, str]] = [
+    (UsersListView, 'paginate_by'),
+    (StatusesListView, 'paginate_by'),
+    (LabelsListView, 'paginate_by'),
+    (TasksListView, 'paginate_by'),
+    (TaskListApiView, 'page_size'),
+]
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+VALUE_LISTS = re.compile(r'\((?:%s|\?)(?:, (?:%s|\?))*\)')
+
+
+def query_shape(sql: str) -> str:
+    '''The query with its values left out, the same for every row it is run for.'''
+    return VALUE_LISTS.sub('(...)', LITERALS.sub('?', sql))
+
+
+class QueryCountTest(TestCase):
+    '''Every page runs as many queries for a few rows as for many.'''
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Seeder(SMALL).run()
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def capture(self, page_size: int) -> Dict[str, List[str]]:
+        '''Renders every page, returning the queries of each.'''
+        captured: Dict[str, List[str]] = {}
+        with ExitStack() as stack:
+            for view, attribute in PAGE_SIZES:
+                stack.enter_context(patch.object(view, attribute, page_size))
+            for name, args, params in PAGES:
+                captured.update(self.capture_page(name, args, params))
+        return captured
+
+    def capture_page(self, name: str, args: List[int],
+                     params: Dict[str, str]) -> Dict[str, List[str]]:
+        url: str = reverse(name, args=args)
+        cache.clear()  # rendered rows would hide their queries
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK, url)
+        return {'{} {}'.format(url, params or ''): [
+            query['sql'] for query in queries.captured_queries
+        ]}
+
+    def assertSameQueries(self, page: str, small: List[str], large: List[str]) -> None:
+        if len(small) == len(large):
+            return
+        grown: Counter = Counter(map(query_shape, large))
+        grown.subtract(Counter(map(query_shape, small)))
+        repeated: List[str] = [
+            '{:+d} x {}'.format(count, shape) for shape, count in grown.most_common() if count
+        ]
+        self.fail('{} ran {} queries with few rows and {} with many:\n{}'.format(
+            page, len(small), len(large), '\n'.join(repeated)
+        ))
+
+    def test_query_counts_do_not_grow_with_rows(self) -> None:
+        small: Dict[str, List[str]] = self.capture(SMALL_PAGE)
+        Seeder(GROWTH, seed=1).run()
+        large: Dict[str, List[str]] = self.capture(LARGE_PAGE)
+
+        for page in small:
+            with self.subTest(page=page):
+                self.assertSameQueries(page, small[page], large[page])
+
+    def test_failures_name_the_repeated_query(self) -> None:
+        small: List[str] = ['SELECT * FROM "tasks_task" LIMIT 50']
+        large: List[str] = small + [
+            'SELECT * FROM "users_user" WHERE "users_user"."id" = {}'.format(pk)
+            for pk in range(3)
+        ]
+        with self.assertRaisesMessage(
+            AssertionError, '+3 x SELECT * FROM "users_user" WHERE "users_user"."id" = ?'
+        ):
+            self.assertSameQueries('/tasks/', small, large)
@@ -1,19 +1,46 @@
-from django.test import TestCase, Client
+from django.test import TestCase, SimpleTestCase, Client
 from django.contrib.auth import SESSION_KEY
-from django.core.exceptions import PermissionDenied
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
 from django.urls import reverse_lazy
 from django.http import HttpResponse
+from django.test import override_settings
+from django.core.management import call_command, CommandError
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+from asgiref.sync import async_to_sync
 
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import timedelta
 from http import HTTPStatus
+from io import StringIO
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from unittest.mock import patch
+from typing import Any, Dict, List, Tuple
 
+from task_manager import timing
+from task_manager.middleware import AsyncCapableMiddleware, StaticFilesMiddleware
+from task_manager.db.sqlite3.base import DatabaseWrapper
+from task_manager.tasks import counters
+from task_manager.tasks.models import Task, TaskLabel
 from task_manager.users.models import User
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
 from task_manager.constants import HOME, TEMPLATE_INDEX, \
-    REVERSE_HOME, REVERSE_LOGIN, REVERSE_LOGOUT, MSG_NO_PERMISSION
+    REVERSE_HOME, REVERSE_LOGIN, REVERSE_LOGOUT, MSG_NO_PERMISSION, REPLICA_PIN_COOKIE
 from task_manager.users.constants import UPDATE_USER, DELETE_USER
 from task_manager.statuses.constants import \
-    LIST_STATUSES, CREATE_STATUS, UPDATE_STATUS, DELETE_STATUS
+    LIST_STATUSES, CREATE_STATUS, UPDATE_STATUS, DELETE_STATUS, MSG_CREATED
 from task_manager.labels.constants import \
     LIST_LABELS, CREATE_LABEL, UPDATE_LABEL, DELETE_LABEL
 from task_manager.tasks.constants import \
@@ -66,6 +93,75 @@ class AuthenticationTest(TestCase):
         self.assertRedirects(response, REVERSE_HOME)
 
 
+class SessionStorageTest(TestCase):
+
+    fixtures = ['user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+
+    def session_queries(self, method: str, *args: Any) -> List[str]:
+        '''Sends the request and returns the queries reading or writing sessions.'''
+        with CaptureQueriesContext(connection) as queries:
+            getattr(self.client, method)(*args)
+        return [query['sql'].split()[0] for query in queries.captured_queries
+                if 'django_session' in query['sql']]
+
+    def test_messages_do_not_write_the_session(self) -> None:
+        self.client.force_login(User.objects.get(pk=1))
+        self.assertEqual(
+            self.session_queries('post', reverse_lazy(CREATE_STATUS), {'name': 'Reviewed'}),
+            ['SELECT']
+        )
+        response: HttpResponse = self.client.get(reverse_lazy(LIST_STATUSES))
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         [str(MSG_CREATED)])
+
+    def test_denied_visitors_get_no_session(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy(LIST_STATUSES))
+        self.assertRedirects(response, REVERSE_LOGIN, fetch_redirect_response=False)
+        self.assertIn('messages', response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_session_engines(self) -> None:
+        # the cached sessions are read from the cache, the signed ones from their cookie
+        for engine in ('cached_db', 'signed_cookies'):
+            with self.subTest(engine=engine), override_settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.' + engine
+            ):
+                self.client = Client()
+                self.client.force_login(User.objects.get(pk=1))
+                self.assertEqual(self.session_queries('get', reverse_lazy(LIST_STATUSES)), [])
+                response: HttpResponse = self.client.get(reverse_lazy(LIST_STATUSES))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_purge_sessions(self) -> None:
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(session_key='session{}'.format(number), session_data='',
+                    expire_date=now + timedelta(days=number - 5, hours=1))
+            for number in range(7)
+        )
+        output = StringIO()
+        call_command('purge_sessions', '--batch-size', '2', '--verbosity', '2', stdout=output)
+        self.assertEqual(
+            list(Session.objects.order_by('pk').values_list('pk', flat=True)),
+            ['session5', 'session6']
+        )
+        self.assertIn('2 sessions deleted...', output.getvalue())
+        self.assertIn('5 expired sessions deleted.', output.getvalue())
+
+        with self.assertRaisesMessage(CommandError, '--batch-size must be positive.'):
+            call_command('purge_sessions', '--batch-size', '0')
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_purge_sessions_without_rows(self) -> None:
+        output = StringIO()
+        call_command('purge_sessions', stdout=output)
+        self.assertIn('keeps no sessions in the database', output.getvalue())
+
+
 class PagesAccessibility(TestCase):
 
     fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
@@ -122,3 +218,335 @@ class PagesAccessibility(TestCase):
         )  # the task author must not be the same as the user's client under test
 
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ServerTimingTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def timing(self, response: HttpResponse) -> Dict[str, str]:
+        metrics: Dict[str, str] = {}
+        for metric in response.headers['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = ';'.join(params)
+        return metrics
+
+    def test_header(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy(LIST_TASKS))
+
+        metrics: Dict[str, str] = self.timing(response)
+        self.assertEqual(set(metrics), {'db', 'template', 'total'})
+        self.assertRegex(metrics['db'], r'^dur=[\d.]+;desc="\d+ queries"$')
+        self.assertNotEqual(metrics['template'], 'dur=0.0')
+
+    def test_query_count(self) -> None:
+        with self.assertNumQueries(5) as queries:
+            response: HttpResponse = self.client.get(reverse_lazy(DETAIL_TASK, args=[1]))
+        self.assertIn('desc="{} queries"'.format(len(queries.captured_queries)),
+                      response.headers['Server-Timing'])
+
+    def test_log_lines_carry_the_url_name(self) -> None:
+        with self.assertLogs('task_manager.timing', 'INFO') as logs:
+            self.client.get(reverse_lazy(LIST_STATUSES))
+        self.assertEqual(len(logs.records), 1)
+        fields: Dict = logs.records[0].timing
+        self.assertEqual(fields['view'], LIST_STATUSES)
+        self.assertEqual(fields['status'], HTTPStatus.OK)
+        self.assertIn('view=statuses method=GET status=200 queries=', logs.output[0])
+
+    @override_settings(PERFORMANCE_BUDGETS={'default': {'total': 1e6}, LIST_LABELS: {'queries': 0}})
+    def test_requests_over_budget_are_logged(self) -> None:
+        with self.assertLogs('task_manager.slow_requests') as logs:
+            self.client.get(reverse_lazy(LIST_STATUSES))
+            self.client.get(reverse_lazy(LIST_LABELS))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('view=labels', logs.output[0])
+        self.assertIn('over=queries', logs.output[0])
+
+    @override_settings(PERFORMANCE_BUDGETS={'default': {'queries': 0}},
+                       SLOW_REQUEST_SAMPLE_RATE=0)
+    def test_slow_requests_are_sampled(self) -> None:
+        with patch.object(timing.slow_logger, 'warning') as warning:
+            self.client.get(reverse_lazy(LIST_STATUSES))
+        warning.assert_not_called()
+
+    def test_changes_stay_within_the_query_budgets(self) -> None:
+        task: Dict[str, Any] = {
+            'name': 'Task', 'description': 'Description', 'status': 1, 'executor': 2,
+        }
+        requests: List[Tuple[str, Dict[str, Any]]] = [
+            (reverse_lazy(CREATE_TASK), {**task, 'labels': [1, 2]}),
+            (reverse_lazy(UPDATE_TASK, args=[1]), {**task, 'status': 2, 'labels': [2, 3]}),
+            (reverse_lazy(DELETE_TASK, args=[1]), {}),
+            (reverse_lazy(CREATE_STATUS), {'name': 'Status'}),
+            (reverse_lazy(UPDATE_STATUS, args=[2]), {'name': 'Renamed'}),
+            (reverse_lazy(DELETE_STATUS, args=[2]), {}),
+            (reverse_lazy(CREATE_LABEL), {'name': 'Label'}),
+            (reverse_lazy(UPDATE_LABEL, args=[2]), {'name': 'Renamed'}),
+            (reverse_lazy(DELETE_LABEL, args=[2]), {}),
+        ]
+        for url, data in requests:
+            with self.assertLogs('task_manager.timing', 'INFO') as logs:
+                response: HttpResponse = self.client.post(url, data)
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+            fields: Dict = logs.records[0].timing
+            self.assertLessEqual(fields['queries'], timing.get_budget(fields['view'])['queries'],
+                                 fields['view'])
+
+    def test_queries_outside_requests_are_not_timed(self) -> None:
+        User.objects.count()
+        self.assertIsNone(timing.current())
+
+
+class PerformanceToolsTest(TestCase):
+
+    PROFILE: Dict = {'profile': 'tiny', 'users': 5, 'statuses': 3, 'labels': 4,
+                     'tasks': 60, 'batch_size': 25}
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def seed(self, seed: int = 0, **profile: Any) -> None:
+        with open(self.path('profile.json'), 'w') as file:
+            json.dump({**self.PROFILE, **profile}, file)
+        call_command('seed_perf', '--config', self.path('profile.json'), '--seed', str(seed),
+                     stdout=StringIO())
+
+    def dataset(self) -> Tuple[List, List]:
+        tasks = list(Task.objects.order_by('id').values_list(
+            'name', 'status__name', 'author__username', 'executor__username'
+        ))
+        labels = list(TaskLabel.objects.order_by('task__name', 'label__name').values_list(
+            'task__name', 'label__name'
+        ))
+        return tasks, labels
+
+    def test_seed_perf(self) -> None:
+        self.seed()
+
+        self.assertEqual(Task.objects.count(), 60)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertTrue(TaskLabel.objects.exists())
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_seed_perf_is_reproducible(self) -> None:
+        self.seed()
+        first = self.dataset()
+        for model in (TaskLabel, Task, User, Label, Status):
+            model.objects.all().delete()
+        self.seed()
+        self.assertEqual(self.dataset(), first)
+
+        for model in (TaskLabel, Task, User, Label, Status):
+            model.objects.all().delete()
+        self.seed(seed=1)
+        self.assertNotEqual(self.dataset(), first)
+
+    def test_seed_perf_checks_the_profile(self) -> None:
+        with self.assertRaisesMessage(CommandError, 'Unknown profile fields: colour.'):
+            self.seed(colour='red')
+        self.seed()
+        with self.assertRaisesMessage(CommandError, 'seed an empty database'):
+            self.seed()
+        # The seeded users alone are enough to clash.
+        for model in (TaskLabel, Task, Label, Status):
+            model.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, 'seed an empty database'):
+            self.seed()
+
+    def test_benchmark_views(self) -> None:
+        self.seed()
+        output = StringIO()
+        call_command('benchmark_views', '--repeat', '2', '--warmup', '0',
+                     '--host', 'testserver', '--output', self.path('first.json'), stdout=output)
+        call_command('benchmark_views', '--repeat', '1', '--warmup', '0',
+                     '--host', 'testserver', '--output', self.path('second.json'),
+                     '--compare', self.path('first.json'), stdout=output)
+
+        with open(self.path('first.json')) as file:
+            results: Dict = json.load(file)['results']
+        self.assertEqual(results[LIST_TASKS]['status'], HTTPStatus.OK)
+        self.assertEqual(results[DETAIL_TASK]['status'], HTTPStatus.OK)
+        self.assertGreater(results[LIST_TASKS]['queries'], 0)
+        self.assertLessEqual(results[LIST_TASKS]['p50_ms'], results[LIST_TASKS]['p95_ms'])
+        self.assertNotIn('logout', results)
+        self.assertNotIn('api_tasks_export', results)
+        self.assertIn('Compared with', output.getvalue())
+
+    def test_load_test(self) -> None:
+        self.seed()
+        output = StringIO()
+        call_command('load_test', '--processes', '1', '--duration', '0.5',
+                     '--host', 'testserver', stdout=output)
+        self.assertIn('requests/s, 0 failed.', output.getvalue())
+        self.assertEqual(Task.objects.count(), 60)
+
+        call_command('load_test', '--processes', '1', '--duration', '0.5', '--list', '0',
+                     '--update', '0', '--host', 'testserver', '--keep', stdout=output)
+        self.assertGreater(Task.objects.count(), 60)
+        self.assertEqual(counters.stored(), counters.compute())
+
+        with self.assertRaisesMessage(CommandError, 'needs a weight'):
+            call_command('load_test', '--list', '0', '--create', '0', '--update', '0')
+
+
+class AsyncMiddlewareTest(SimpleTestCase):
+
+    def test_middleware_are_async_capable(self) -> None:
+        # One sync only middleware would run the async views on a thread.
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), path)
+
+    def test_both_modes_must_be_handled(self) -> None:
+        class SyncOnly(AsyncCapableMiddleware):
+            def call(self, request: Any) -> HttpResponse:
+                return self.get_response(request)
+
+        with self.assertRaises(TypeError):
+            SyncOnly(lambda request: HttpResponse())
+
+    def test_static_files_under_asgi(self) -> None:
+        async def get_response(request: Any) -> HttpResponse:
+            return HttpResponse('view')
+
+        middleware = StaticFilesMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        response: HttpResponse = async_to_sync(middleware)(RequestFactory().get('/tasks/'))
+        self.assertEqual(response.content, b'view')
+
+
+class SQLiteBackendTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path: str = os.path.join(directory.name, 'db.sqlite3')
+
+    def connect(self, **options: Any) -> DatabaseWrapper:
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': self.path, 'OPTIONS': options}, 'tuned'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper: DatabaseWrapper, name: str) -> Any:
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA {}'.format(name))
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self) -> None:
+        wrapper: DatabaseWrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'foreign_keys'), 1)
+
+        wrapper = self.connect(pragmas={'busy_timeout': 100, 'mmap_size': None})
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 100)
+        self.assertEqual(self.pragma(wrapper, 'mmap_size'), 0)
+
+    def test_transactions_take_the_write_lock(self) -> None:
+        for mode, locked in (('IMMEDIATE', True), ('deferred', False)):
+            with self.subTest(mode=mode):
+                wrapper: DatabaseWrapper = self.connect(transaction_mode=mode)
+                wrapper.ensure_connection()
+                other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+                self.addCleanup(other.close)
+
+                wrapper._start_transaction_under_autocommit()
+                if locked:
+                    with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+                        other.execute('BEGIN IMMEDIATE')
+                else:
+                    other.execute('BEGIN IMMEDIATE')
+                    other.execute('ROLLBACK')
+                wrapper.connection.execute('ROLLBACK')
+
+    def test_unknown_transaction_mode(self) -> None:
+        with self.assertRaisesMessage(ImproperlyConfigured, 'transaction_mode must be one of'):
+            self.connect(transaction_mode='LAZY').ensure_connection()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TestCase):
+    '''A second SQLite file stands in for a replica, holding the fixtures
+    with task 1 renamed, as if the rename had not reached the primary.'''
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Added here, not in DATABASES: the runner would create a test database for it.
+        cls.databases = {'default', 'replica'}
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+        }
+        cls.addClassCleanup(connections.settings.pop, 'replica')
+        cls.addClassCleanup(connections.__delitem__, 'replica')
+        cls.addClassCleanup(connections['replica'].close)
+        with override_settings(DATABASE_REPLICAS=['replica']):
+            call_command('migrate', database='replica', verbosity=0)
+        # The fixtures are loaded into both.
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Task.objects.using('replica').filter(pk=1).update(name='Read from the replica')
+        Status.objects.using('replica').filter(pk=3).update(name='Replica status')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_read_only_views_read_from_the_replica(self) -> None:
+        for url in (reverse_lazy(LIST_TASKS), reverse_lazy(DETAIL_TASK, args=[1])):
+            with self.subTest(url=url):
+                response: HttpResponse = self.client.get(url)
+                self.assertContains(response, 'Read from the replica')
+                self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_other_views_read_from_the_primary(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy(UPDATE_TASK, args=[1]))
+        self.assertContains(response, 'Get Terms of Reference')
+        self.assertNotContains(response, 'Read from the replica')
+
+    def test_writes_pin_the_client_to_the_primary(self) -> None:
+        response: HttpResponse = self.client.post(reverse_lazy(CREATE_TASK), {
+            'name': 'Written a moment ago', 'description': 'Not on the replica yet.', 'status': 1,
+        }, follow=True)
+        self.assertIn(REPLICA_PIN_COOKIE, response.client.cookies)
+        self.assertEqual(
+            response.client.cookies[REPLICA_PIN_COOKIE]['max-age'], settings.REPLICA_STICKINESS
+        )
+        self.assertContains(response, 'Written a moment ago')
+        self.assertContains(response, 'Get Terms of Reference')
+        self.assertFalse(Task.objects.using('replica').filter(name='Written a moment ago').exists())
+
+    def test_signing_out_pins_the_client(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_LOGOUT)
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_cached_data_is_read_from_the_primary(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy(LIST_TASKS))
+        self.assertContains(response, 'Replica status')
+        self.assertIn((3, Status.objects.get(pk=3).name), Status.objects.choices())
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self) -> None:
+        response: HttpResponse = self.client.post(reverse_lazy(CREATE_TASK), {
+            'name': 'Written a moment ago', 'description': 'Not on the replica yet.', 'status': 1,
+        })
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+        response = self.client.get(reverse_lazy(LIST_TASKS))
+        self.assertContains(response, 'Get Terms of Reference')
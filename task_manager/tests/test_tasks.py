@@ -1,21 +1,47 @@
-from django.test import TestCase, Client
-from django.urls import reverse_lazy
-from django.http import HttpResponse
+from django.test import TestCase, Client, AsyncClient, RequestFactory, override_settings
+from django.template.response import TemplateResponse
+from asgiref.sync import async_to_sync
+from django.urls import resolve, reverse, reverse_lazy
+from django.http import HttpRequest, HttpResponse
 from django.forms.utils import ErrorDict
 from django.db.models.deletion import ProtectedError
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
-
+from django.core.cache import cache
+from django.conf import settings
+from django.core.management import call_command, CommandError
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.signals import request_started
+from django.db import close_old_connections
+
+import csv
+import json
+import os
+import tempfile
 from http import HTTPStatus
-from typing import List, Dict
-
-from task_manager.tasks.models import Task
+from base64 import urlsafe_b64encode
+from io import StringIO
+from unittest.mock import patch
+from typing import Any, List, Dict
+
+from task_manager.tasks.models import Task, TaskLabel, TaskCounter
+from task_manager import identity
+from task_manager.mixins import AsyncConditionalGetMixin, AsyncViewMixin
+from task_manager.tasks import bulk, counters
+from task_manager.tasks.api import TaskExportApiView, TaskListApiView, TaskDetailApiView, \
+    AsyncTaskListApiView, AsyncTaskDetailApiView
+from task_manager.tasks.views import TasksListView, TaskDetailView, \
+    AsyncTasksListView, AsyncTaskDetailView
+from task_manager.asgi import ASGIHandler
 from task_manager.statuses.models import Status
 from task_manager.labels.models import Label
 from task_manager.users.models import User
 from task_manager.tasks.constants import \
     TEMPLATE_CREATE, TEMPLATE_LIST, TEMPLATE_UPDATE, TEMPLATE_DELETE, TEMPLATE_DETAIL, \
     REVERSE_TASKS, REVERSE_CREATE, UPDATE_TASK, DELETE_TASK, DETAIL_TASK, \
-    MSG_NOT_AUTHOR_FOR_DELETE_TASK
+    MSG_NOT_AUTHOR_FOR_DELETE_TASK, API_TASKS, API_TASK, API_EXPORT, REVERSE_BULK, REVERSE_LOGIN, \
+    LIST_TASKS
 from task_manager.statuses.constants import \
     REVERSE_STATUSES, DELETE_STATUS, STATUS_USED_IN_TASK
 from task_manager.labels.constants import \
@@ -24,6 +50,17 @@ from task_manager.users.constants import \
     REVERSE_USERS, DELETE_USER, USER_USED_IN_TASK
 
 
+def make_cursor(*payload: Any) -> str:
+    '''Encodes a cursor the way the paginator does, with any payload.'''
+    return urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+# Cursors of the search ordering whose rank can't be compared.
+BAD_RANK_CURSORS: List[str] = [
+    make_cursor('n', [rank, 1]) for rank in ('abc', None, [1], {'a': 1})
+]
+
+
 class TasksTest(TestCase):
 
     fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
@@ -68,7 +105,8 @@ class TasksTest(TestCase):
         tasks_list: List = list(response.context['tasks'])
         self.assertTrue(len(tasks_list) == 3)
 
-        task1, task2, task3 = tasks_list
+        # the most recently modified tasks come first
+        task3, task2, task1 = tasks_list
 
         self.assertEqual(task1.name, 'Get Terms of Reference')
         self.assertEqual(task1.status, self.status3)
@@ -102,7 +140,7 @@ class TasksTest(TestCase):
 
         tasks_list: List = list(response.context['tasks'])
 
-        task1, task2, task3 = tasks_list
+        task3, task2, task1 = tasks_list
         self.assertEqual(task1.__str__(), 'Get Terms of Reference')
         self.assertEqual(task2.__str__(), 'Implement functionality')
         self.assertEqual(task3.__str__(), 'Hand over the work to the customer')
@@ -129,7 +167,7 @@ class TasksTest(TestCase):
         # Отфильтровать задачи со статусом "New"
         response: HttpResponse = self.client.get(REVERSE_TASKS, {'status': self.status1.pk})
         tasks = response.context['tasks']
-        self.assertEqual(tasks.count(), 2)
+        self.assertEqual(len(tasks), 2)
         self.assertIn(self.task2, tasks)
         self.assertIn(self.task3, tasks)
         self.assertNotIn(self.task1, tasks)
@@ -138,7 +176,7 @@ class TasksTest(TestCase):
         # Отфильтровать задачи, выполняемые пользователем 2
         response: HttpResponse = self.client.get(REVERSE_TASKS, {'executor': self.user2.pk})
         tasks = response.context['tasks']
-        self.assertEqual(tasks.count(), 2)
+        self.assertEqual(len(tasks), 2)
         self.assertIn(self.task1, tasks)
         self.assertIn(self.task2, tasks)
         self.assertNotIn(self.task3, tasks)
@@ -148,7 +186,7 @@ class TasksTest(TestCase):
         label = Label.objects.get(name='Development')
         response: HttpResponse = self.client.get(REVERSE_TASKS, {'labels': label.pk})
         tasks = response.context['tasks']
-        self.assertEqual(tasks.count(), 2)
+        self.assertEqual(len(tasks), 2)
         self.assertIn(self.task1, tasks)
         self.assertIn(self.task2, tasks)
         self.assertNotIn(self.task3, tasks)
@@ -157,7 +195,7 @@ class TasksTest(TestCase):
         # Отфильтровать задачи текущего пользователя (определен в "setUp")
         response: HttpResponse = self.client.get(REVERSE_TASKS, {'self_tasks': 'on'})
         tasks = response.context['tasks']
-        self.assertEqual(tasks.count(), 2)
+        self.assertEqual(len(tasks), 2)
         self.assertIn(self.task1, tasks)
         self.assertIn(self.task2, tasks)
         self.assertNotIn(self.task3, tasks)
@@ -317,6 +355,30 @@ class TasksTest(TestCase):
         with self.assertRaises(ObjectDoesNotExist):
             Task.objects.get(id=self.task3.id)
 
+    def test_task_delete_loads_the_task_once(self) -> None:
+        ROUTE = reverse_lazy(DELETE_TASK, args=[self.task1.id])
+        # The session, its user and the task; the author is not loaded.
+        with self.assertNumQueries(3):
+            self.client.get(ROUTE)
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy(DELETE_TASK, args=[self.task3.id]))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(ROUTE)
+        # Besides the locked read of the counted columns (see signals).
+        task_selects: List[str] = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "tasks_task"' in query['sql']
+            and not query['sql'].startswith(
+                'SELECT "tasks_task"."status_id", "tasks_task"."executor_id" FROM'
+            )
+        ]
+        self.assertEqual(len(task_selects), 1)
+        user_selects: List[str] = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "users_user"' in query['sql']
+        ]
+        self.assertEqual(len(user_selects), 1)  # the session user, not the author
+
     def test_not_self_task_delete(self) -> None:
         ROUTE = reverse_lazy(DELETE_TASK, args=[self.task3.id])
         original_objs_count: int = len(Task.objects.all())
@@ -351,6 +413,822 @@ class TasksTest(TestCase):
         self.assertTemplateUsed(response, template_name=TEMPLATE_DETAIL)
 
 
+class TasksListQueriesTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    # session, user, executor choices (read once for the filter and the bulk
+    # action form), tasks with their status, author and executor, task labels
+    LIST_QUERIES: int = 5
+    # a full page also checks whether a next page exists
+    FULL_PAGE_QUERIES: int = LIST_QUERIES + 1
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        cache.clear()
+        # status and label choices are served from the cache
+        Status.objects.choices()
+        Label.objects.choices()
+
+    def create_tasks(self, count: int) -> None:
+        tasks: List[Task] = Task.objects.bulk_create(
+            Task(
+                name='Task {}'.format(number),
+                description='Generated task',
+                status_id=number % 3 + 1,
+                author_id=number % 3 + 1,
+                executor_id=(number + 1) % 3 + 1,
+            ) for number in range(count)
+        )
+        TaskLabel.objects.bulk_create(
+            TaskLabel(task=task, label_id=label_id)
+            for task in tasks for label_id in (1, 2)
+        )
+
+    def test_tasks_list_queries_count(self) -> None:
+        with self.assertNumQueries(self.LIST_QUERIES):
+            self.client.get(REVERSE_TASKS)
+
+    def test_tasks_list_queries_count_does_not_depend_on_rows(self) -> None:
+        self.create_tasks(60)
+        with self.assertNumQueries(self.FULL_PAGE_QUERIES):
+            response: HttpResponse = self.client.get(REVERSE_TASKS)
+        self.assertEqual(len(response.context['tasks']), 50)
+
+        self.create_tasks(300)
+        with self.assertNumQueries(self.FULL_PAGE_QUERIES):
+            response: HttpResponse = self.client.get(REVERSE_TASKS)
+        self.assertEqual(len(response.context['tasks']), 50)
+
+    def test_tasks_list_queries_count_with_filters(self) -> None:
+        self.create_tasks(50)
+        # the executor is looked up while cleaning the filter form
+        with self.assertNumQueries(self.LIST_QUERIES + 1):
+            self.client.get(REVERSE_TASKS, {
+                'status': 1, 'executor': 2, 'labels': 1, 'self_tasks': 'on'
+            })
+
+
+class TasksPaginationTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        Task.objects.bulk_create(
+            Task(
+                name='Task {}'.format(number), description='Generated task',
+                status_id=1, author_id=1,
+            ) for number in range(117)
+        )  # 120 tasks with the fixtures, modified within the same instant
+
+    def walk(self, params: Dict[str, str] = None) -> List[int]:
+        seen: List[int] = []
+        params = dict(params or {})
+        while True:
+            response: HttpResponse = self.client.get(REVERSE_TASKS, params)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            seen.extend(task.id for task in response.context['tasks'])
+            page = response.context['page_obj']
+            if not page.has_next():
+                return seen
+            params['cursor'] = page.next_cursor
+
+    def test_pages_cover_every_task_once(self) -> None:
+        expected: List[int] = list(Task.objects.values_list('id', flat=True))
+        self.assertEqual(self.walk(), expected)
+
+    def test_pages_keep_filters(self) -> None:
+        expected: List[int] = list(
+            Task.objects.filter(status=1).values_list('id', flat=True)
+        )
+        self.assertEqual(len(expected), 119)
+        self.assertEqual(self.walk({'status': '1'}), expected)
+
+    def test_previous_page(self) -> None:
+        first: HttpResponse = self.client.get(REVERSE_TASKS)
+        second: HttpResponse = self.client.get(
+            REVERSE_TASKS, {'cursor': first.context['page_obj'].next_cursor}
+        )
+        self.assertTrue(second.context['page_obj'].has_previous())
+        previous: HttpResponse = self.client.get(
+            REVERSE_TASKS, {'cursor': second.context['page_obj'].previous_cursor}
+        )
+        self.assertEqual(
+            list(previous.context['tasks']), list(first.context['tasks'])
+        )
+        self.assertFalse(previous.context['page_obj'].has_previous())
+        self.assertContains(first, '?cursor={}'.format(first.context['page_obj'].next_cursor))
+
+    def test_changes_between_page_loads(self) -> None:
+        first: HttpResponse = self.client.get(REVERSE_TASKS)
+        first_ids: List[int] = [task.id for task in first.context['tasks']]
+        # a task from the first page is edited and a new one is created
+        Task.objects.get(id=first_ids[-1]).save()
+        Task.objects.create(
+            name='New task', description='Created meanwhile', status_id=1, author_id=1
+        )
+        second: HttpResponse = self.client.get(
+            REVERSE_TASKS, {'cursor': first.context['page_obj'].next_cursor}
+        )
+        second_ids: List[int] = [task.id for task in second.context['tasks']]
+        self.assertFalse(set(first_ids) & set(second_ids))
+        self.assertEqual(
+            second_ids,
+            list(Task.objects.exclude(id__in=first_ids).values_list('id', flat=True)[1:51])
+        )
+
+    def test_deep_page_queries_count(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_TASKS)
+        cursor: str = response.context['page_obj'].next_cursor
+        with self.assertNumQueries(TasksListQueriesTest.FULL_PAGE_QUERIES):
+            self.client.get(REVERSE_TASKS, {'cursor': cursor})
+
+    def test_invalid_cursor(self) -> None:
+        for cursor in ('garbage', 'WyJuIiwgWzFdXQ', 'WyJ4IiwgWyJhIiwgMV1d',
+                       make_cursor('n', ['2022-01-01T00:00:00', 99999999999999999999999]),
+                       make_cursor('n', [{'a': 1}, 1])):
+            response: HttpResponse = self.client.get(REVERSE_TASKS, {'cursor': cursor})
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class TasksSearchTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def search(self, text: str, **params: str) -> List[int]:
+        response: HttpResponse = self.client.get(REVERSE_TASKS, {'q': text, **params})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return [task.id for task in response.context['tasks']]
+
+    def test_search_by_name_and_description(self) -> None:
+        self.assertEqual(self.search('customer'), [3])
+        self.assertEqual(self.search('cleanest code'), [2])
+        self.assertCountEqual(self.search('cloud'), [1, 3])
+        self.assertEqual(self.search('nothing like this'), [])
+
+    def test_search_by_word_prefix(self) -> None:
+        self.assertEqual(self.search('Impl'), [2])
+
+    def test_search_combines_with_filters(self) -> None:
+        self.assertEqual(self.search('cloud', status='3'), [1])
+
+    def test_search_ranks_by_relevance(self) -> None:
+        relevant: Task = Task.objects.create(
+            name='Deploy deploy', description='Deploy the deploy script',
+            status_id=1, author_id=1,
+        )
+        Task.objects.create(
+            name='Write docs', description='Mention how to deploy the service and '
+            'everything else about its configuration, monitoring and support',
+            status_id=1, author_id=1,
+        )
+        self.assertEqual(self.search('deploy')[0], relevant.id)
+
+    def test_search_index_follows_changes(self) -> None:
+        task: Task = Task.objects.get(pk=2)
+        task.name = 'Refactor module'
+        task.save()
+        self.assertEqual(self.search('Refactor'), [2])
+        self.assertEqual(self.search('functionality'), [])
+
+        task.delete()
+        self.assertEqual(self.search('Refactor'), [])
+
+        Task.objects.filter(pk=1).update(description='Reviewed by the team lead')
+        self.assertEqual(self.search('lead'), [1])
+
+    def test_search_results_are_paginated(self) -> None:
+        Task.objects.bulk_create(
+            Task(name='Report {}'.format(number), description='Weekly report',
+                 status_id=1, author_id=1)
+            for number in range(70)
+        )
+        response: HttpResponse = self.client.get(REVERSE_TASKS, {'q': 'report'})
+        first: List[int] = [task.id for task in response.context['tasks']]
+        response = self.client.get(REVERSE_TASKS, {
+            'q': 'report', 'cursor': response.context['page_obj'].next_cursor
+        })
+        second: List[int] = [task.id for task in response.context['tasks']]
+        self.assertEqual((len(first), len(second)), (50, 20))
+        self.assertFalse(set(first) & set(second))
+
+    def test_invalid_rank_cursor(self) -> None:
+        for cursor in BAD_RANK_CURSORS + [make_cursor('n', [float('nan'), 1])]:
+            response: HttpResponse = self.client.get(REVERSE_TASKS, {'q': 'task', 'cursor': cursor})
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+            response = self.client.get(reverse(API_TASKS), {'q': 'task', 'cursor': cursor})
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class TaskCountersTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def assertCountersCorrect(self) -> None:
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_fixtures_are_counted(self) -> None:
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_counts(TaskCounter.STATUS), {1: 2, 3: 1})
+        self.assertEqual(TaskCounter.objects.get_counts(TaskCounter.EXECUTOR), {1: 1, 2: 2})
+        self.assertEqual(TaskCounter.objects.get_counts(TaskCounter.LABEL), {1: 2, 3: 1})
+
+    def test_task_create_update_and_delete(self) -> None:
+        self.client.post(REVERSE_CREATE, {
+            'name': 'Counted', 'status': 2, 'description': 'Task', 'executor': 3,
+            'labels': [1, 2],
+        })
+        task: Task = Task.objects.get(name='Counted')
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.STATUS, 2), 1)
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.LABEL, 2), 1)
+
+        self.client.post(reverse_lazy(UPDATE_TASK, args=[task.id]), {
+            'name': 'Counted', 'status': 3, 'description': 'Task', 'executor': '',
+            'labels': [3],
+        })
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.STATUS, 2), 0)
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.EXECUTOR, 3), 0)
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.LABEL, 3), 2)
+
+        self.client.post(reverse_lazy(DELETE_TASK, args=[task.id]))
+        self.assertFalse(Task.objects.filter(id=task.id).exists())
+        self.assertCountersCorrect()
+
+    def test_label_set_changes(self) -> None:
+        task: Task = Task.objects.get(pk=3)
+        label: Label = Label.objects.get(pk=2)
+        task.labels.add(1, 2)
+        self.assertCountersCorrect()
+        task.labels.remove(2, 3)  # label 3 is not set on the task
+        self.assertCountersCorrect()
+        label.task_set.add(1, 2)
+        self.assertCountersCorrect()
+        label.task_set.remove(1)
+        self.assertCountersCorrect()
+        label.task_set.clear()
+        task.labels.clear()
+        self.assertCountersCorrect()
+        Task.objects.get(pk=1).labels.set([2])
+        self.assertCountersCorrect()
+
+    def test_stale_copies(self) -> None:
+        # Two requests loading the same task before either saves it.
+        first, second = Task.objects.get(pk=1), Task.objects.get(pk=1)
+        first.status_id = 1
+        first.save()
+        second.status_id = 2
+        second.executor_id = None
+        second.save()
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.STATUS, 2), 1)
+
+        first.delete()
+        second.delete()
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.STATUS, 2), 0)
+
+    def test_rebuild_and_verify_commands(self) -> None:
+        call_command('rebuild_task_counters', '--verify', stdout=StringIO())
+        TaskCounter.objects.filter(kind=TaskCounter.STATUS, object_id=1).update(count=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_counters', '--verify',
+                         stdout=StringIO(), stderr=StringIO())
+        call_command('rebuild_task_counters', stdout=StringIO())
+        self.assertCountersCorrect()
+        self.assertEqual(TaskCounter.objects.get_count(TaskCounter.STATUS, 1), 2)
+
+
+class UsageListTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def usage(self, url: str, **params: str) -> List:
+        response: HttpResponse = self.client.get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return [(obj.id, obj.usage) for obj in response.context['object_list']]
+
+    def test_lists_show_usage(self) -> None:
+        self.assertEqual(self.usage(REVERSE_STATUSES), [(1, 2), (2, 0), (3, 1)])
+        self.assertEqual(self.usage(REVERSE_LABELS), [(1, 2), (2, 0), (3, 1)])
+
+    def test_lists_follow_task_changes(self) -> None:
+        task: Task = Task.objects.get(pk=1)
+        task.status_id = 2
+        task.save()
+        task.labels.set([2])
+        self.assertEqual(self.usage(REVERSE_STATUSES), [(1, 2), (2, 1), (3, 0)])
+        self.assertEqual(self.usage(REVERSE_LABELS), [(1, 1), (2, 1), (3, 0)])
+
+    def test_sorting(self) -> None:
+        self.assertEqual(self.usage(REVERSE_STATUSES, sort='usage'), [(1, 2), (3, 1), (2, 0)])
+        self.assertEqual(
+            [status.name for status in
+             self.client.get(REVERSE_STATUSES, {'sort': 'name'}).context['statuses']],
+            sorted(Status.objects.values_list('name', flat=True))
+        )
+        self.assertEqual(self.usage(REVERSE_LABELS, sort='nonsense'), self.usage(REVERSE_LABELS))
+
+    def test_pages_sorted_by_usage(self) -> None:
+        Status.objects.bulk_create(Status(name='status {}'.format(number)) for number in range(60))
+        first: HttpResponse = self.client.get(REVERSE_STATUSES, {'sort': 'usage'})
+        second: HttpResponse = self.client.get(REVERSE_STATUSES, {
+            'sort': 'usage', 'cursor': first.context['page_obj'].next_cursor
+        })
+        rows: List = [(status.usage, status.id) for status in
+                      list(first.context['statuses']) + list(second.context['statuses'])]
+        self.assertEqual(len(first.context['statuses']), 50)
+        self.assertEqual(len(rows), 63)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (-row[0], row[1])))
+
+    def test_invalid_usage_cursor(self) -> None:
+        for usage in ('abc', None, [1], 99999999999999999999999):
+            response: HttpResponse = self.client.get(REVERSE_STATUSES, {
+                'sort': 'usage', 'cursor': make_cursor('n', [usage, 1])
+            })
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_query_count_does_not_grow(self) -> None:
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(REVERSE_LABELS, {'sort': 'usage'})
+        Label.objects.bulk_create(Label(name='label {}'.format(number)) for number in range(20))
+        with self.assertNumQueries(len(few.captured_queries)):
+            self.client.get(REVERSE_LABELS, {'sort': 'usage'})
+
+
+class TaskRowCacheTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        cache.clear()
+
+    def count_reverses(self) -> int:
+        with patch('django.urls.reverse', wraps=reverse) as reversed_urls:
+            self.client.get(REVERSE_TASKS)
+        return reversed_urls.call_count
+
+    def test_rows_are_served_from_cache(self) -> None:
+        rendered: int = self.count_reverses()
+        self.assertEqual(self.count_reverses(), rendered - 3 * 3)
+
+    def test_changed_task_renders_one_row(self) -> None:
+        rendered: int = self.count_reverses()
+        self.count_reverses()
+        task: Task = Task.objects.get(pk=2)
+        task.name = 'Renamed task'
+        task.save()
+        self.assertEqual(self.count_reverses(), rendered - 2 * 3)
+        self.assertContains(self.client.get(REVERSE_TASKS), 'Renamed task')
+
+    def test_rows_follow_related_names(self) -> None:
+        self.client.get(REVERSE_TASKS)
+        Status.objects.filter(pk=3).update(name='Finished')
+        User.objects.filter(pk=2).update(first_name='Ron')
+        response: HttpResponse = self.client.get(REVERSE_TASKS)
+        self.assertContains(response, 'Finished')
+        self.assertNotContains(response, 'Ronald Weasley')
+
+    def test_rows_vary_on_viewer_and_language(self) -> None:
+        self.client.get(REVERSE_TASKS)
+        self.client.force_login(User.objects.get(pk=2))
+        response: HttpResponse = self.client.get(REVERSE_TASKS)
+        self.assertContains(response, 'btn btn-danger btn-sm disabled', count=2)
+        response = self.client.get(REVERSE_TASKS, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertContains(response, '>\n                            Update</button>', count=3)
+        response = self.client.get(REVERSE_TASKS, HTTP_ACCEPT_LANGUAGE='ru')
+        self.assertNotContains(response, '>\n                            Update</button>')
+
+
+class TasksBulkTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def post(self, task_ids: List[int], **data) -> HttpResponse:
+        return self.client.post(REVERSE_BULK, {'tasks': task_ids, **data})
+
+    def modified(self) -> Dict[int, Any]:
+        return dict(Task.objects.values_list('id', 'date_modified'))
+
+    def test_set_status(self) -> None:
+        before = self.modified()
+        response: HttpResponse = self.post([1, 2, 3], action='set_status', status=1)
+        self.assertRedirects(response, REVERSE_TASKS)
+        self.assertEqual(list(Task.objects.values_list('status', flat=True)), [1, 1, 1])
+        after = self.modified()
+        self.assertGreater(after[1], before[1])
+        self.assertEqual(after[2], before[2])  # it had the status already
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_set_executor(self) -> None:
+        self.post([1, 3], action='set_executor', executor=3)
+        self.assertEqual(dict(Task.objects.values_list('id', 'executor')), {1: 3, 2: 2, 3: 3})
+        self.post([1, 2], action='set_executor', executor='')
+        self.assertEqual(dict(Task.objects.values_list('id', 'executor')),
+                         {1: None, 2: None, 3: 3})
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_labels(self) -> None:
+        before = self.modified()
+        self.post([1, 2, 3], action='add_labels', labels=[1, 2])
+        self.assertEqual(set(Task.objects.get(pk=3).labels.values_list('id', flat=True)), {1, 2})
+        self.assertEqual(TaskLabel.objects.filter(task=1).count(), 3)
+        self.assertGreater(self.modified()[1], before[1])
+        self.assertEqual(counters.stored(), counters.compute())
+
+        before = self.modified()
+        self.post([2, 3], action='remove_labels', labels=[2, 3])
+        self.assertFalse(TaskLabel.objects.filter(task__in=[2, 3], label=2).exists())
+        self.assertEqual(TaskLabel.objects.filter(task=1).count(), 3)
+        self.assertEqual(self.modified()[1], before[1])
+        self.assertGreater(self.modified()[2], before[2])
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_link_deletes_fit_the_query_parameters(self) -> None:
+        self.post([1, 2, 3], action='add_labels', labels=[1, 2])
+        with patch.object(connection.features, 'max_query_params', 3), \
+                CaptureQueriesContext(connection) as queries:
+            bulk.remove_labels([1, 2, 3], [1, 2])
+        deletes: List[str] = [
+            query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE')
+        ]
+        self.assertEqual(len(deletes), 3)
+        self.assertFalse(TaskLabel.objects.filter(label__in=[1, 2]).exists())
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_queries_do_not_depend_on_batch_size(self) -> None:
+        Task.objects.bulk_create(
+            Task(name='Task {}'.format(number), description='Generated task',
+                 status_id=1, author_id=1) for number in range(200)
+        )
+        counters.rebuild()
+        task_ids: List[int] = list(Task.objects.values_list('id', flat=True))
+        for action in ({'action': 'set_status', 'status': 2},
+                       {'action': 'add_labels', 'labels': [1, 2]},
+                       {'action': 'remove_labels', 'labels': [1, 2]}):
+            bulk.set_status(task_ids, 1)
+            with CaptureQueriesContext(connection) as small:
+                self.post([1, 2], **action)
+            bulk.set_status(task_ids, 1)
+            with CaptureQueriesContext(connection) as large:
+                self.post(task_ids, **action)
+            self.assertEqual(len(large), len(small))
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_invalid_data(self) -> None:
+        response: HttpResponse = self.post([1, 2], action='set_status')
+        self.assertRedirects(response, REVERSE_TASKS)
+        self.assertEqual(Task.objects.get(pk=1).status_id, 3)
+        self.assertEqual(len(list(get_messages(response.wsgi_request))), 1)
+        response = self.post([1, 100], action='set_status', status=1)
+        self.assertEqual(Task.objects.get(pk=1).status_id, 3)
+
+    def test_redirects_back(self) -> None:
+        url: str = '{}?status=1&cursor=abc'.format(REVERSE_TASKS)
+        response: HttpResponse = self.post([1], action='set_status', status=2, next=url)
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        response = self.post([1], action='set_status', status=2, next='https://example.com/')
+        self.assertRedirects(response, REVERSE_TASKS)
+
+    def test_list_has_selection(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_TASKS)
+        self.assertContains(response, 'name="tasks" value="1" form="bulk-form"')
+
+    def test_not_authorized(self) -> None:
+        self.client.logout()
+        response: HttpResponse = self.post([1], action='set_status', status=1)
+        self.assertRedirects(response, REVERSE_LOGIN)
+        self.assertEqual(Task.objects.get(pk=1).status_id, 3)
+
+
+class TasksApiTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        self.list_url: str = reverse_lazy(API_TASKS)
+        self.detail_url: str = reverse_lazy(API_TASK, args=[1])
+
+    def test_list(self) -> None:
+        response: HttpResponse = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()
+        self.assertEqual([task['id'] for task in data['results']], [3, 2, 1])
+        self.assertIsNone(data['next'])
+        task = data['results'][2]
+        self.assertEqual(task['status'], {'id': 3, 'name': 'Completed'})
+        self.assertEqual(task['executor'], {'id': 2, 'name': 'Ronald Weasley'})
+        self.assertEqual(task['labels'], [
+            {'id': 1, 'name': 'Development'}, {'id': 3, 'name': 'Optimization'},
+        ])
+
+    def test_list_filters(self) -> None:
+        response: HttpResponse = self.client.get(
+            self.list_url, {'status': 1, 'executor': 2, 'fields': 'id'}
+        )
+        self.assertEqual(response.json()['results'], [{'id': 2}])
+        response = self.client.get(self.list_url, {'labels': 3, 'fields': 'id'})
+        self.assertEqual(response.json()['results'], [{'id': 1}])
+        response = self.client.get(self.list_url, {'status': 100})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('status', response.json()['errors'])
+
+    def test_list_pages(self) -> None:
+        Task.objects.bulk_create(
+            Task(name='Task {}'.format(number), description='Generated task',
+                 status_id=1, author_id=1) for number in range(60)
+        )
+        first = self.client.get(self.list_url, {'fields': 'id'}).json()
+        self.assertEqual(len(first['results']), 50)
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 13)
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            [task['id'] for task in first['results'] + second['results']],
+            list(Task.objects.values_list('id', flat=True)),
+        )
+        response: HttpResponse = self.client.get(self.list_url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_sparse_fields(self) -> None:
+        response: HttpResponse = self.client.get(self.detail_url, {'fields': 'name,status'})
+        self.assertEqual(response.json(), {
+            'name': 'Get Terms of Reference', 'status': {'id': 3, 'name': 'Completed'},
+        })
+        with self.assertNumQueries(4):  # session, user, validators, the task
+            self.client.get(self.list_url, {'fields': 'id,name'})
+        response = self.client.get(self.detail_url, {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_detail(self) -> None:
+        response: HttpResponse = self.client.get(self.detail_url)
+        self.assertEqual(response.json()['description'],
+                         'Get cloud disk access from Galya and open the document.')
+        response = self.client.get(reverse_lazy(API_TASK, args=[100]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_get(self) -> None:
+        for url in (self.list_url, self.detail_url):
+            response: HttpResponse = self.client.get(url)
+            self.assertIn('Last-Modified', response)
+            etag: str = response['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        etag = self.client.get(self.list_url)['ETag']
+        Task.objects.get(pk=1).save()
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         HTTPStatus.OK)
+        etag = self.client.get(self.detail_url)['ETag']
+        Status.objects.get(pk=3).save()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         HTTPStatus.OK)
+        self.assertEqual(
+            self.client.get(self.detail_url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+            .status_code, HTTPStatus.OK
+        )
+
+    def test_renamed_users_invalidate_the_tasks(self) -> None:
+        for url in (self.list_url, self.detail_url):
+            for fields in ('author', 'executor'):
+                etag: str = self.client.get(url, {'fields': fields})['ETag']
+                user: User = User.objects.get(pk=Task.objects.get(pk=1).author_id)
+                user.first_name = 'Renamed {}'.format(fields)
+                user.save()
+                response: HttpResponse = self.client.get(
+                    url, {'fields': fields}, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+        etag = self.client.get(self.detail_url, {'fields': 'author,executor'})['ETag']
+        with self.assertNumQueries(4):  # the session, its user, the task and the users once
+            response = self.client.get(
+                self.detail_url, {'fields': 'author,executor'}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_not_authorized(self) -> None:
+        self.client.logout()
+        for url in (self.list_url, self.detail_url):
+            response: HttpResponse = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+            self.assertIn('detail', response.json())
+
+
+class TasksExportTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        self.url: str = reverse_lazy(API_EXPORT)
+
+    def export(self, params: Dict[str, Any]) -> str:
+        response: HttpResponse = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self) -> None:
+        rows: List[List[str]] = list(csv.reader(StringIO(self.export({'format': 'csv'}))))
+        self.assertEqual(rows[0][:7], [
+            'id', 'name', 'description', 'status', 'author', 'executor', 'labels'
+        ])
+        self.assertEqual([row[0] for row in rows[1:]], ['3', '2', '1'])
+        self.assertEqual(rows[3][3:7], [
+            'Completed', 'Hary Poter', 'Ronald Weasley', 'Development, Optimization'
+        ])
+
+    def test_ndjson_with_filter_and_fields(self) -> None:
+        lines: List[str] = self.export(
+            {'format': 'ndjson', 'status': 1, 'fields': 'id,labels'}
+        ).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'id': 3, 'labels': []},
+            {'id': 2, 'labels': [{'id': 1, 'name': 'Development'}]},
+        ])
+
+    def test_streams_in_chunks(self) -> None:
+        Task.objects.bulk_create(
+            Task(name='Task {}'.format(number), description='Generated task',
+                 status_id=1, author_id=1) for number in range(7)
+        )
+        with patch.object(TaskExportApiView, 'chunk_size', 4):
+            response: HttpResponse = self.client.get(self.url, {'format': 'csv'})
+            content = iter(response.streaming_content)
+            with self.assertNumQueries(0):
+                self.assertEqual(next(content), b'id,name,description,status,author,executor,'
+                                                b'labels,date_created,date_modified\r\n')
+            # the tasks, read as they are written, and the labels of each chunk
+            with self.assertNumQueries(4):
+                chunks: List[bytes] = list(content)
+        self.assertEqual([chunk.count(b'\r\n') for chunk in chunks], [4, 4, 2])
+
+    def test_invalid_parameters(self) -> None:
+        for params in ({'format': 'xml'}, {'status': 100}, {'fields': 'secret'}):
+            response: HttpResponse = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_list_links(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_TASKS, {'status': 1})
+        self.assertContains(response, '{}?status=1&amp;format=csv'.format(self.url))
+
+    async def test_streams_under_asgi(self) -> None:
+        # As the test client does, leave the connection in the test transaction.
+        request_started.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        messages: List[Dict[str, Any]] = []
+
+        async def receive() -> Dict[str, Any]:
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message: Dict[str, Any]) -> None:
+            messages.append(message)
+
+        cookie: str = '{}={}'.format(
+            settings.SESSION_COOKIE_NAME, self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        )
+        await ASGIHandler()({
+            'type': 'http', 'method': 'GET', 'path': str(self.url),
+            'query_string': b'format=ndjson&fields=id',
+            'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        }, receive, send)
+        self.assertEqual(messages[0]['status'], HTTPStatus.OK)
+        body: bytes = b''.join(message.get('body', b'') for message in messages[1:])
+        self.assertEqual(body.decode().splitlines(), ['{"id": 3}', '{"id": 2}', '{"id": 1}'])
+
+
+class TasksImportTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.rejects: str = os.path.join(self.directory.name, 'rejects.jsonl')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def import_file(self, name: str, content: str, *args: str) -> str:
+        path: str = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        output = StringIO()
+        call_command('import_tasks', path, '--rejects', self.rejects, *args, stdout=output)
+        return output.getvalue()
+
+    def read_rejects(self) -> List[Dict[str, Any]]:
+        with open(self.rejects, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_csv(self) -> None:
+        output: str = self.import_file('tasks.csv', (
+            'name,description,status,author,executor,labels\n'
+            'First,Imported task,New,Hary Poter,,"Testing, Development"\n'
+            'Second,Imported task,Unknown,Hary Poter,,\n'
+            ',No name,New,Hary Poter,,\n'
+            'Third,Imported task,Completed,{},Ronald Weasley,\n'
+        ).format(User.objects.get(pk=2).username), '--batch-size', '1')
+        self.assertIn('2 tasks imported, 2 rejected', output)
+        first: Task = Task.objects.get(name='First')
+        self.assertEqual((first.status_id, first.author_id, first.executor_id), (1, 1, None))
+        self.assertEqual(set(first.labels.values_list('name', flat=True)),
+                         {'Testing', 'Development'})
+        third: Task = Task.objects.get(name='Third')
+        self.assertEqual((third.status_id, third.author_id, third.executor_id), (3, 2, 2))
+        self.assertEqual(
+            [(reject['line'], reject['error']) for reject in self.read_rejects()],
+            [(3, 'Unknown status: Unknown.'), (4, 'name is required.')],
+        )
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_json_lines(self) -> None:
+        self.import_file('tasks.jsonl', '\n'.join([
+            json.dumps({'name': 'First', 'description': 'Imported', 'status': 'Blocked',
+                        'author': 'Hary Poter', 'labels': ['Support', 'Testing']}),
+            '{"name": "Broken"',
+            json.dumps({'name': 'x' * 51, 'description': 'Too long', 'status': 'New',
+                        'author': 'Hary Poter'}),
+        ]), '--create-missing')
+        task: Task = Task.objects.get(name='First')
+        self.assertEqual(task.status.name, 'Blocked')
+        self.assertEqual(set(task.labels.values_list('name', flat=True)), {'Support', 'Testing'})
+        self.assertEqual([reject['line'] for reject in self.read_rejects()], [2, 3])
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_rejected_rows_create_nothing(self) -> None:
+        self.import_file('tasks.jsonl', '\n'.join([
+            json.dumps({'name': 'Orphan', 'description': 'Imported', 'status': 'Blocked',
+                        'author': 'Nobody', 'labels': ['Support']}),
+            json.dumps({'name': 'Kept', 'description': 'Imported', 'status': 'Review',
+                        'author': 'Hary Poter', 'labels': ['Review', 'Review']}),
+        ]), '--create-missing')
+        self.assertEqual([reject['error'] for reject in self.read_rejects()],
+                         ['Unknown author: Nobody.'])
+        self.assertFalse(Status.objects.filter(name='Blocked').exists())
+        self.assertFalse(Label.objects.filter(name='Support').exists())
+        task: Task = Task.objects.get(name='Kept')
+        self.assertEqual(task.status.name, 'Review')
+        self.assertEqual(list(task.labels.values_list('name', flat=True)), ['Review'])
+        self.assertEqual(counters.stored(), counters.compute())
+
+    def test_batches(self) -> None:
+        rows: str = ''.join(
+            'Task {},Imported,New,Hary Poter,,Testing\n'.format(number) for number in range(10)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            output: str = self.import_file(
+                'tasks.csv', 'name,description,status,author,executor,labels\n' + rows,
+                '--batch-size', '4',
+            )
+        inserts: List[str] = [
+            query['sql'] for query in queries if query['sql'].startswith('INSERT INTO')
+        ]
+        self.assertEqual(
+            [sql.split()[2] for sql in inserts if 'taskcounter' not in sql],
+            ['"tasks_task"', '"tasks_tasklabel"'] * 3,
+        )
+        self.assertEqual(output.count('rows/s'), 4)
+        self.assertEqual(Task.objects.filter(name__startswith='Task ').count(), 10)
+        self.assertFalse(os.path.exists(self.rejects))
+
+    def test_exported_tasks_import_back(self) -> None:
+        client: Client = Client()
+        client.force_login(User.objects.get(pk=1))
+        response: HttpResponse = client.get(reverse_lazy(API_EXPORT))
+        self.import_file('tasks.csv', b''.join(response.streaming_content).decode())
+        self.assertEqual(Task.objects.count(), 6)
+        self.assertEqual(counters.stored(), counters.compute())
+
+
 class TestDeleteRelatedEntities(TestCase):
 
     fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
@@ -471,3 +1349,288 @@ class TestDeleteRelatedEntities(TestCase):
         )
         self.assertEqual(Label.objects.count(), 2)
         self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    # PRE-FLIGHT CHECK
+
+    def test_protected_delete_does_not_collect_tasks(self):
+        # the session, its user, the status and one EXISTS query
+        with self.assertNumQueries(4):
+            response: HttpResponse = self.client.post(
+                reverse_lazy(DELETE_STATUS, args=[self.status1.id])
+            )
+        self.assertRedirects(response, REVERSE_STATUSES, fetch_redirect_response=False)
+        self.assertEqual(Status.objects.count(), 3)
+
+    def test_confirm_pages_show_reference_count(self):
+        pages = [
+            (reverse_lazy(DELETE_STATUS, args=[self.status1.id]), 2),
+            (reverse_lazy(DELETE_LABEL, args=[self.label1.id]), 2),
+            # author of two tasks and executor of a third
+            (reverse_lazy(DELETE_USER, args=[self.user1.id]), 3),
+        ]
+        for url, count in pages:
+            response: HttpResponse = self.client.get(url)
+            self.assertEqual(response.context['reference_count'], count)
+            self.assertContains(response, 'Используется в {} задачах.'.format(count))
+
+        response = self.client.get(reverse_lazy(DELETE_STATUS, args=[self.status2.id]))
+        self.assertEqual(response.context['reference_count'], 0)
+        self.assertNotContains(response, 'Используется')
+
+
+class ConditionalGetTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        self.detail_url: str = reverse(DETAIL_TASK, args=[1])
+        cache.clear()
+
+    def revalidate(self, url: str, response: HttpResponse) -> HttpResponse:
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+
+    def test_unchanged_pages_are_not_modified(self) -> None:
+        # the session, its user and the validators; the lists showing task
+        # counts also check the task counters (the users list has them cached)
+        pages = [(self.detail_url, 3), (REVERSE_STATUSES, 4), (REVERSE_LABELS, 4),
+                 (REVERSE_USERS, 3)]
+        for url, queries in pages:
+            response: HttpResponse = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertIn('Last-Modified', response.headers)
+            self.assertIn('no-cache', response.headers['Cache-Control'])
+
+            with self.assertNumQueries(queries):
+                not_modified: HttpResponse = self.revalidate(url, response)
+            self.assertEqual(not_modified.status_code, HTTPStatus.NOT_MODIFIED)
+            self.assertEqual(not_modified.headers['ETag'], response.headers['ETag'])
+
+            since: HttpResponse = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified']
+            )
+            self.assertEqual(since.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_of_related_objects_invalidate_the_task(self) -> None:
+        changes = [
+            lambda: Status.objects.get(pk=3).save(),
+            lambda: Label.objects.get(pk=1).save(),
+            lambda: User.objects.get(pk=2).save(),
+            lambda: Task.objects.get(pk=1).labels.remove(1),
+        ]
+        for change in changes:
+            response: HttpResponse = self.client.get(self.detail_url)
+            change()
+            self.assertEqual(self.revalidate(self.detail_url, response).status_code,
+                             HTTPStatus.OK)
+
+    def test_task_changes_invalidate_the_users_list(self) -> None:
+        changes = [
+            lambda: Task.objects.get(pk=1).save(),
+            lambda: Task.objects.get(pk=1).delete(),
+        ]
+        for change in changes:
+            response: HttpResponse = self.client.get(REVERSE_USERS)
+            change()
+            self.assertEqual(self.revalidate(REVERSE_USERS, response).status_code,
+                             HTTPStatus.OK)
+
+    def test_task_changes_invalidate_the_usage_lists(self) -> None:
+        statuses: HttpResponse = self.client.get(REVERSE_STATUSES)
+        labels: HttpResponse = self.client.get(REVERSE_LABELS)
+        task: Task = Task.objects.get(pk=1)
+        task.status_id = 2
+        task.save()
+        self.assertEqual(self.revalidate(REVERSE_STATUSES, statuses).status_code, HTTPStatus.OK)
+        self.assertEqual(self.revalidate(REVERSE_LABELS, labels).status_code,
+                         HTTPStatus.NOT_MODIFIED)
+        task.labels.remove(1)
+        self.assertEqual(self.revalidate(REVERSE_LABELS, labels).status_code, HTTPStatus.OK)
+
+    def test_usage_validators_do_not_load_the_counters(self) -> None:
+        labels: List[Label] = Label.objects.bulk_create(
+            Label(name='label {}'.format(number)) for number in range(100)
+        )
+        Task.objects.get(pk=1).labels.add(*labels)
+        response: HttpResponse = self.client.get(REVERSE_LABELS)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.revalidate(REVERSE_LABELS, response).status_code,
+                             HTTPStatus.NOT_MODIFIED)
+        counter_queries: List[str] = [
+            query['sql'] for query in queries.captured_queries
+            if 'tasks_taskcounter' in query['sql']
+        ]
+        self.assertEqual(len(counter_queries), 1)
+        self.assertIn('MAX("tasks_taskcounter"."date_modified")', counter_queries[0])
+
+    def test_deletion_invalidates_the_list(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_LABELS)
+        Label.objects.create(name='Temporary').delete()
+        self.assertEqual(self.revalidate(REVERSE_LABELS, response).status_code,
+                         HTTPStatus.NOT_MODIFIED)
+        Label.objects.filter(task=None).delete()
+        self.assertEqual(self.revalidate(REVERSE_LABELS, response).status_code,
+                         HTTPStatus.OK)
+
+    def test_viewer_and_language_are_part_of_the_validator(self) -> None:
+        response: HttpResponse = self.client.get(self.detail_url)
+        self.client.force_login(User.objects.get(pk=2))
+        self.assertEqual(self.revalidate(self.detail_url, response).status_code,
+                         HTTPStatus.OK)
+
+        response = self.client.get(self.detail_url)
+        english: HttpResponse = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=response.headers['ETag'],
+            HTTP_ACCEPT_LANGUAGE='en',
+        )
+        self.assertEqual(english.status_code, HTTPStatus.OK)
+
+    def test_pending_messages_are_rendered(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_STATUSES)
+        self.client.post(reverse(DELETE_STATUS, args=[1]))  # protected: sets an error
+        messages_page: HttpResponse = self.revalidate(REVERSE_STATUSES, response)
+        self.assertEqual(messages_page.status_code, HTTPStatus.OK)
+        self.assertContains(messages_page, STATUS_USED_IN_TASK)
+
+    def test_missing_task_is_not_found(self) -> None:
+        response: HttpResponse = self.client.get(reverse(DETAIL_TASK, args=[100]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class IdentityMapTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    VALID_DATA: Dict[str, Any] = {
+        'name': 'Read once', 'status': 1, 'description': 'Task', 'executor': 2, 'labels': [1, 2],
+    }
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def selects(self, queries: CaptureQueriesContext) -> List[str]:
+        return [query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith('SELECT')]
+
+    def test_create_reads_each_row_once(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(REVERSE_CREATE, self.VALID_DATA)
+        selects: List[str] = self.selects(queries)
+        self.assertEqual(len(selects), len(set(selects)))
+        # the signed in user is the author, the status and executor are not checked again
+        self.assertFalse([sql for sql in selects if sql.startswith('SELECT 1 AS')])
+        self.assertEqual(len([sql for sql in selects if 'FROM "users_user"' in sql]), 2)
+        self.assertEqual(Task.objects.get(name='Read once').author_id, 1)
+
+    def test_invalid_form_lists_each_table_once(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            response: HttpResponse = self.client.post(
+                reverse_lazy(UPDATE_TASK, args=[1]), {**self.VALID_DATA, 'name': ''}
+            )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        selects: List[str] = self.selects(queries)
+        self.assertEqual(len(selects), len(set(selects)))
+        self.assertFalse([sql for sql in selects if sql.startswith('SELECT 1 AS')])
+
+    def test_no_map_outside_requests(self) -> None:
+        self.assertIsNone(identity.current())
+        self.assertIsNone(identity.lookup(Status.objects.all(), 1))
+        identity.add(Status.objects.get(pk=1))
+        self.assertIsNone(identity.lookup(Status.objects.all(), 1))
+        with self.assertNumQueries(2):
+            identity.rows(Status.objects.all())
+            identity.rows(Status.objects.all())
+
+    def test_filtered_querysets_bypass_the_map(self) -> None:
+        identity_map = identity.IdentityMap()
+        token = identity._current.set(identity_map)
+        try:
+            identity.rows(Status.objects.all())
+            self.assertEqual(identity.lookup(Status.objects.all(), '1'),
+                             Status.objects.get(pk=1))
+            self.assertIsNone(identity.lookup(Status.objects.filter(name='New'), 1))
+        finally:
+            identity._current.reset(token)
+
+
+@override_settings(ROOT_URLCONF=settings.ASGI_URLCONF)
+class TasksAsyncViewsTest(TestCase):
+    '''The views the ASGI application serves; the test client does not
+    route with ASGI_URLCONF, so it is made the root URLconf.'''
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.async_client.force_login(User.objects.get(pk=1))
+        cache.clear()
+
+    def test_views_are_coroutines_under_asgi_only(self) -> None:
+        views = [
+            (LIST_TASKS, [], TasksListView, AsyncTasksListView),
+            (DETAIL_TASK, [1], TaskDetailView, AsyncTaskDetailView),
+            (API_TASKS, [], TaskListApiView, AsyncTaskListApiView),
+            (API_TASK, [1], TaskDetailApiView, AsyncTaskDetailApiView),
+        ]
+        for name, args, sync_view, async_view in views:
+            path: str = reverse(name, args=args)
+            self.assertIs(resolve(path, urlconf='task_manager.urls').func.view_class, sync_view)
+            self.assertIs(resolve(path).func.view_class, async_view)
+            self.assertFalse(sync_view.view_is_async)
+            self.assertTrue(async_view.view_is_async)
+        # Django 4.1 streams from sync iterators only.
+        self.assertIs(resolve(reverse(API_EXPORT)).func.view_class, TaskExportApiView)
+
+    def test_default_page_is_rendered_by_the_sync_get(self) -> None:
+        class DetailView(AsyncViewMixin, AsyncConditionalGetMixin, TaskDetailView):
+            pass
+
+        request: HttpRequest = RequestFactory().get('/')
+        request.user = User.objects.get(pk=1)
+        response: TemplateResponse = async_to_sync(DetailView.as_view())(request, pk=1)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('ETag', response.headers)
+        self.assertEqual(response.context_data['task'].name, 'Get Terms of Reference')
+
+    async def test_pages(self) -> None:
+        response: HttpResponse = await self.async_client.get(REVERSE_TASKS, {'status': 1})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([task.id for task in response.context['tasks']], [3, 2])
+        response = await self.async_client.get(reverse(DETAIL_TASK, args=[1]))
+        self.assertContains(response, 'Get Terms of Reference')
+        response = await self.async_client.get(reverse(API_TASKS), {'fields': 'id'})
+        self.assertEqual(response.json()['results'], [{'id': 3}, {'id': 2}, {'id': 1}])
+        response = await self.async_client.get(reverse(API_TASK, args=[1]), {'fields': 'name'})
+        self.assertEqual(response.json(), {'name': 'Get Terms of Reference'})
+
+    async def test_conditional_get(self) -> None:
+        for url in (reverse(DETAIL_TASK, args=[1]), reverse(API_TASK, args=[1])):
+            response: HttpResponse = await self.async_client.get(url)
+            # Django 4.1's AsyncClient takes the headers by their names.
+            response = await self.async_client.get(
+                url, **{'if-none-match': response.headers['ETag']}
+            )
+            self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    async def test_errors(self) -> None:
+        response: HttpResponse = await self.async_client.get(reverse(DETAIL_TASK, args=[100]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = await self.async_client.get(reverse(API_TASK, args=[100]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = await self.async_client.get(reverse(API_TASKS), {'cursor': 'broken'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        for cursor in BAD_RANK_CURSORS:
+            response = await self.async_client.get(
+                reverse(API_TASKS), {'q': 'task', 'cursor': cursor}
+            )
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = await self.async_client.get(reverse(API_TASKS), {'status': 100})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_not_authorized(self) -> None:
+        client = AsyncClient()
+        response: HttpResponse = await client.get(REVERSE_TASKS)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = await client.get(reverse(API_TASKS))
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
@@ -1,4 +1,5 @@
 from django.test import TestCase, Client
+from django.core.cache import cache
 from django.urls import reverse_lazy
 from django.http import HttpResponse
 from django.forms.utils import ErrorDict
@@ -10,7 +11,7 @@ from typing import List, Dict
 from task_manager.users.models import User
 from task_manager.users.constants import UPDATE_USER, DELETE_USER, \
     TEMPLATE_CREATE, TEMPLATE_LIST, TEMPLATE_UPDATE, TEMPLATE_DELETE, \
-    REVERSE_USERS, REVERSE_CREATE, REVERSE_LOGIN
+    REVERSE_USERS, REVERSE_CREATE, REVERSE_LOGIN, USERS_PAGE_SIZE
 
 
 class UsersTest(TestCase):
@@ -242,3 +243,63 @@ class UsersTest(TestCase):
         self.assertRedirects(response, REVERSE_USERS)
         with self.assertRaises(ObjectDoesNotExist):
             User.objects.get(id=self.user1.id)
+
+    def test_profile_pages_load_the_user_once(self) -> None:
+        self.client.force_login(self.user1)
+        # The session, its user and the profile.
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy(UPDATE_USER, args=[self.user1.id]))
+        with self.assertNumQueries(4):  # and the tasks referencing it
+            self.client.get(reverse_lazy(DELETE_USER, args=[self.user1.id]))
+        with self.assertNumQueries(3):
+            response: HttpResponse = self.client.get(
+                reverse_lazy(UPDATE_USER, args=[self.user2.id])
+            )
+        self.assertRedirects(response, REVERSE_USERS)
+
+
+class UsersListTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        cache.clear()
+
+    def test_users_have_task_counts(self) -> None:
+        response: HttpResponse = self.client.get(REVERSE_USERS)
+
+        counts: List = [(user.id, user.authored_count, user.assigned_count)
+                        for user in response.context['users']]
+        self.assertEqual(counts, [(1, 2, 1), (2, 1, 2), (3, 0, 0)])
+
+    def test_users_search(self) -> None:
+        for query, expected in (('granger', [3]), ('ron weasley', [2]),
+                                ('seeker', [1]), ('nobody', [])):
+            response: HttpResponse = self.client.get(REVERSE_USERS, {'q': query})
+            self.assertEqual([user.id for user in response.context['users']], expected)
+
+    def test_users_pages(self) -> None:
+        User.objects.bulk_create(
+            User(username='user{}'.format(number)) for number in range(USERS_PAGE_SIZE)
+        )
+        first: HttpResponse = self.client.get(REVERSE_USERS)
+        self.assertEqual(len(first.context['users']), USERS_PAGE_SIZE)
+
+        second: HttpResponse = self.client.get(
+            REVERSE_USERS, {'cursor': first.context['page_obj'].next_cursor}
+        )
+        self.assertEqual(len(second.context['users']), 3)
+        self.assertFalse(second.context['page_obj'].has_next())
+
+    def test_users_list_query_count_does_not_grow(self) -> None:
+        # the validators, the task ones read once, and the page, counts included
+        with self.assertNumQueries(4):
+            self.client.get(REVERSE_USERS)
+        with self.assertNumQueries(2) as small:
+            self.client.get(REVERSE_USERS)
+        User.objects.bulk_create(
+            User(username='user{}'.format(number)) for number in range(30)
+        )
+        with self.assertNumQueries(len(small.captured_queries)):
+            self.client.get(REVERSE_USERS)
@@ -0,0 +1,173 @@
+"""Per-request performance instrumentation.
+
+Every request is timed: the number and the duration of its database
+queries, the rendering of its template and the whole of it. The figures
+are sent in the ``Server-Timing`` header, shown by the browser developer
+tools, and logged on ``task_manager.timing`` with the URL name of the view.
+Requests going over the budgets of their view (``PERFORMANCE_BUDGETS``)
+are logged on ``task_manager.slow_requests``, a sample of them if
+``SLOW_REQUEST_SAMPLE_RATE`` is below 1.
+
+Queries are timed by a wrapper every connection gets, on any thread, so
+those an async view runs on the threads of the ORM count too. Queries run
+while the template renders count in both the database and the template
+time. A streamed response is timed until the view returns it, before any
+of it is sent: what its iterator queries while streaming is not counted.
+
+The per-request lines are logged at INFO, which the project settings
+leave off unless ``TIMING_LOG_LEVEL=INFO``.
+"""
+
+import logging
+import random
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+
+from .middleware import AsyncCapableMiddleware
+
+
+logger = logging.getLogger('task_manager.timing')
+slow_logger = logging.getLogger('task_manager.slow_requests')
+
+DEFAULT_BUDGET: str = 'default'
+
+
+class RequestTimings:
+    '''The figures of a request; durations in milliseconds.'''
+
+    def __init__(self) -> None:
+        self.started: float = perf_counter()
+        self.queries: int = 0
+        self.db: float = 0.0
+        self.template: float = 0.0
+        self.total: float = 0.0
+
+    def finish(self) -> None:
+        self.total = (perf_counter() - self.started) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'db': round(self.db, 1),
+            'template': round(self.template, 1),
+            'total': round(self.total, 1),
+        }
+
+    def header(self) -> str:
+        return 'db;dur={:.1f};desc="{} queries", template;dur={:.1f}, total;dur={:.1f}'.format(
+            self.db, self.queries, self.template, self.total
+        )
+
+    def over_budget(self, budget: Dict[str, float]) -> List[str]:
+        '''Returns the figures going over the budget.'''
+        figures: Dict[str, Any] = self.as_dict()
+        return [name for name, limit in budget.items()
+                if name in figures and figures[name] > limit]
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def current() -> Optional[RequestTimings]:
+    '''Returns the figures of the running request, if any.'''
+    return _current.get()
+
+
+def time_query(execute: Callable, sql: str, params: Any, many: bool, context: Dict) -> Any:
+    '''A database execute wrapper adding the query to the request figures.'''
+    timings: Optional[RequestTimings] = current()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started: float = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += (perf_counter() - started) * 1000
+
+
+@receiver(connection_created)
+def install(sender: Any = None, connection: BaseDatabaseWrapper = None, **kwargs: Any) -> None:
+    '''Makes the connection time its queries.'''
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def get_budget(url_name: Optional[str]) -> Dict[str, float]:
+    budgets: Dict[str, Dict[str, float]] = getattr(settings, 'PERFORMANCE_BUDGETS', {})
+    return budgets.get(url_name or '', budgets.get(DEFAULT_BUDGET, {}))
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    '''Times each request, reports the figures and logs the slow ones.'''
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        super().__init__(get_response)
+        # Those opened from now on are set up as they connect.
+        for connection in connections.all():
+            install(connection=connection)
+
+    def call(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response: HttpResponse = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response: HttpResponse = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    def report(self, request: HttpRequest, response: HttpResponse,
+               timings: RequestTimings) -> HttpResponse:
+        timings.finish()
+        response.headers['Server-Timing'] = timings.header()
+        self.log(request, response, timings)
+        return response
+
+    def process_template_response(self, request: HttpRequest,
+                                  response: TemplateResponse) -> TemplateResponse:
+        '''Rendering starts right after the template response middleware.'''
+        timings: Optional[RequestTimings] = current()
+        if timings is not None:
+            started: float = perf_counter()
+
+            def rendered(response: TemplateResponse) -> None:
+                timings.template += (perf_counter() - started) * 1000
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def log(self, request: HttpRequest, response: HttpResponse,
+            timings: RequestTimings) -> None:
+        match = request.resolver_match
+        url_name: Optional[str] = match.url_name if match else None
+        figures: Dict[str, Any] = timings.as_dict()
+        fields: Dict[str, Any] = {
+            'view': url_name or '-', 'method': request.method,
+            'status': response.status_code, **figures,
+        }
+        line: str = ' '.join('{}={}'.format(key, value) for key, value in fields.items())
+        logger.info(line, extra={'timing': fields})
+
+        over: List[str] = timings.over_budget(get_budget(url_name))
+        rate: float = getattr(settings, 'SLOW_REQUEST_SAMPLE_RATE', 1.0)
+        if over and random.random() < rate:
+            slow_logger.warning('%s path=%s over=%s', line, request.get_full_path(),
+                                ','.join(over), extra={'timing': fields})
@@ -36,5 +36,8 @@ urlpatterns: List[URLPattern] = [
     path('users/', include('task_manager.users.urls')),
     path('statuses/', include('task_manager.statuses.urls')),
     path('tasks/', include('task_manager.tasks.urls')),
-    path('labels/', include('task_manager.labels.urls'))
+    path('labels/', include('task_manager.labels.urls')),
+
+    # API:
+    path('api/tasks/', include('task_manager.tasks.api_urls')),
 ]
@@ -62,6 +62,12 @@ MSG_UNPERMISSION_TO_MODIFY: str = gettext_lazy('You do not have permission to mo
 USER_USED_IN_TASK: str = gettext_lazy('Cannot delete user because it is in use')
 
 
+# List
+USERS_PAGE_SIZE: int = 50
+# The task figures of the list validators, in the task cache namespace.
+VALIDATORS_CACHE_KEY: Final[str] = 'users:validators'
+
+
 # Forms
 # Fields
 USERNAME: Final[str] = 'username'
@@ -80,6 +86,7 @@ LAST_NAME_HELP_TEXT: str = gettext_lazy('Required. Please enter your real surnam
 
 
 # Buttons
+SEARCH_BUTTON: str = gettext_lazy('Search')
 REGISTER_BUTTON: str = gettext_lazy('Register')
 UPDATE_BUTTON: str = gettext_lazy('Change')
 DELETE_BUTTON: str = gettext_lazy('Yes, delete')
@@ -89,7 +96,8 @@ DELETE_BUTTON: str = gettext_lazy('Yes, delete')
 CONTEXT_LIST: Dict = {
     PAGE_TITLE: LIST_TITLE,
     PAGE_DESCRIPTION: LIST_DESCRIPTION,
-    PAGE_H1: LIST_H1
+    PAGE_H1: LIST_H1,
+    BUTTON_TEXT: SEARCH_BUTTON
 }
 CONTEXT_CREATE: Dict = {
     PAGE_TITLE: CREATE_TITLE,
@@ -0,0 +1,27 @@
+"""Filters for users list view."""
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy
+
+from django_filters import FilterSet, CharFilter
+
+from task_manager.users.models import User
+
+
+class UsersFilter(FilterSet):
+    """Define filters for users list."""
+    q = CharFilter(label=gettext_lazy('Text search'), method='search')
+
+    class Meta:
+        model = User
+        fields = []
+
+    def search(self, queryset, name, value):
+        """Match every word in the username, first or last name."""
+        for word in value.split():
+            queryset = queryset.filter(
+                Q(username__icontains=word)
+                | Q(first_name__icontains=word)
+                | Q(last_name__icontains=word)
+            )
+        return queryset
@@ -1,10 +1,15 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.translation import gettext_lazy
 
 
 class User(AbstractUser):
     first_name = models.CharField(max_length=150)
     last_name = models.CharField(max_length=150)
+    date_modified = models.DateTimeField(
+        verbose_name=gettext_lazy('modified at'),
+        auto_now=True
+    )
 
     def __str__(self) -> str:
         return self.get_full_name()
@@ -1,23 +1,68 @@
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.views.generic import CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import Count, IntegerField, Max, OuterRef, QuerySet, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.forms import BaseForm
-from typing import Dict, Any, Union, Callable, Type
+from typing import Dict, Any, Tuple, Union, Callable, Type
 
+from django_filters.views import FilterView
+
+from task_manager.tasks.models import Task, TaskCounter, cache_namespace as task_cache
+from .filters import UsersFilter
 from .models import User
 from .forms import UserRegistrationForm, UserEditingForm
-from .constants import REVERSE_USERS, REVERSE_LOGIN, \
+from .constants import REVERSE_USERS, REVERSE_LOGIN, TEMPLATE_LIST, USERS_PAGE_SIZE, \
     CONTEXT_LIST, CONTEXT_CREATE, CONTEXT_UPDATE, CONTEXT_DELETE, \
     MSG_REGISTERED, MSG_UPDATED, MSG_DELETED, MSG_UNPERMISSION_TO_MODIFY, \
-    USER_USED_IN_TASK
-from ..mixins import ModifyPermissionMixin, DeletionProtectionMixin
+    USER_USED_IN_TASK, VALIDATORS_CACHE_KEY
+from ..mixins import ConditionalGetMixin, KeysetPaginationMixin, \
+    ModifyPermissionMixin, DeletionProtectionMixin, ReplicaReadMixin
+
 
+def task_count(field: str) -> Coalesce:
+    '''Counts the tasks whose field is the user, on the index of the field.'''
+    tasks: QuerySet = Task.objects.filter(**{field: OuterRef('pk')}).order_by() \
+        .values(field).annotate(count=Count('*')).values('count')
+    return Coalesce(Subquery(tasks, output_field=IntegerField()), 0)
 
-class UsersListView(ListView):
-    '''Show the list of users.'''
+
+class UsersListView(ReplicaReadMixin, ConditionalGetMixin, KeysetPaginationMixin, FilterView):
+    '''Show the users matching the search, a page at a time,
+    with the numbers of tasks they wrote and are assigned.'''
     model: Type[User] = User
     context_object_name: str = 'users'
     extra_context: Dict = CONTEXT_LIST
+    template_name: str = TEMPLATE_LIST
+    filterset_class: Type[UsersFilter] = UsersFilter
+    paginate_by: int = USERS_PAGE_SIZE
+    keyset_ordering: Tuple[str, ...] = ('id',)
+
+    def get_queryset(self) -> QuerySet:
+        return User.objects.only('id', 'username', 'first_name', 'last_name', 'date_joined')
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> Any:
+        '''The counts are computed in the page query, for the rows of the page only.'''
+        return super().paginate_queryset(
+            queryset.annotate(authored_count=task_count('author'),
+                              assigned_count=task_count('executor')),
+            page_size,
+        )
+
+    def get_validators(self) -> Dict[str, Any]:
+        '''Any task change may change the counts: the latest change
+        and the number of tasks, cached till the next task change.'''
+        validators: Dict[str, Any] = super().get_validators()
+        validators.update(task_cache.get_or_set(VALIDATORS_CACHE_KEY, self.get_task_validators))
+        return validators
+
+    def get_task_validators(self) -> Dict[str, Any]:
+        '''The latest change and the number of tasks, from the status counters.'''
+        return {
+            'stamp_tasks': Task.objects.aggregate(stamp=Max('date_modified'))['stamp'],
+            'tasks': TaskCounter.objects.filter(kind=TaskCounter.STATUS)
+            .aggregate(count=Sum('count'))['count'],
+        }
 
 
 class UserCreateView(SuccessMessageMixin, CreateView):
@@ -41,8 +86,8 @@ class UserUpdateView(ModifyPermissionMixin, LoginRequiredMixin,
     unpermission_message: str = MSG_UNPERMISSION_TO_MODIFY
 
 
-class UserDeleteView(ModifyPermissionMixin, LoginRequiredMixin,
-                     DeletionProtectionMixin, SuccessMessageMixin, DeleteView):
+class UserDeleteView(ModifyPermissionMixin, DeletionProtectionMixin,
+                     LoginRequiredMixin, SuccessMessageMixin, DeleteView):
     '''Delete a user.'''
     model: Type[User] = User
     context_object_name: str = 'user'